@@ -11,6 +11,38 @@ from urllib.parse import urljoin
 import json
 import base64
 import argparse
+
+# 선택: URL 변형(_640x640, _Q90, .webp) 통합 + 지각 해시 중복 제거
+try:
+    from image_rank import collapse_variants
+    from image_dedup import dedup_folder
+    HAS_DEDUP = True
+except Exception:
+    HAS_DEDUP = False
+
+# 선택: 연결 재사용 + 동시 다운로드 (downloader.py)
+try:
+    from downloader import download_many, DEFAULT_HEADERS
+    from media_store import MediaStore
+    HAS_DOWNLOADER = True
+except Exception:
+    HAS_DOWNLOADER = False
+
+# 고정 대기(sleep) 대신 페이지 상태(DOM 변경 종료·이미지 로딩·네트워크 유휴)를 기다림
+try:
+    from waits import WaitLog, settle as wait_settle
+    HAS_WAITS = True
+except Exception:
+    HAS_WAITS = False
+WAIT_LOG = WaitLog(verbose=True) if HAS_WAITS else None
+
+
+def settle(driver, stage, ceiling, kind="dom"):
+    """조건이 충족되면 바로 반환 (최대 ceiling초 = 기존 고정 대기 시간), waits.py가 없으면 sleep"""
+    if HAS_WAITS:
+        wait_settle(driver, stage, ceiling, kind, log=WAIT_LOG)
+    else:
+        time.sleep(ceiling)
 #mov3_10
 
 # 전역 설정: '더보기' 최대 클릭 횟수 제한
@@ -90,7 +122,7 @@ def save_product_details(driver, folder_path):
             
             # 윈도우 크기 설정
             driver.set_window_size(1200, total_height)
-            time.sleep(2)  # 렌더링 대기
+            settle(driver, "pdf-resize", 2, "images")  # 렌더링 대기
             
             # PDF 인쇄 설정
             pdf_params = {
@@ -141,7 +173,7 @@ def save_product_details(driver, folder_path):
                     if desc_section:
                         # 섹션으로 스크롤
                         driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", desc_section)
-                        time.sleep(2)
+                        settle(driver, "desc-pdf-scroll", 2, "images")
                         
                         # Description 섹션 준비
                         driver.execute_script("""
@@ -232,7 +264,7 @@ def save_product_details(driver, folder_path):
                         section_found = True
                         # 섹션으로 스크롤
                         driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", specific_section)
-                        time.sleep(3)
+                        settle(driver, "info-scroll", 3, "images")
                         
                         # 더보기 버튼 클릭 시도
                         click_show_more_buttons(driver)
@@ -273,7 +305,7 @@ def save_product_details(driver, folder_path):
                     spec_section = driver.find_element(By.XPATH, selector)
                     if spec_section:
                         driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", spec_section)
-                        time.sleep(3)
+                        settle(driver, "spec-scroll", 3, "images")
                         
                         # 더보기 버튼 클릭 시도
                         click_show_more_buttons(driver)
@@ -315,7 +347,7 @@ def save_product_details(driver, folder_path):
                     desc_section = driver.find_element(By.XPATH, selector)
                     if desc_section:
                         driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", desc_section)
-                        time.sleep(3)
+                        settle(driver, "desc-scroll", 3, "images")
                         
                         # 더보기 버튼 클릭 시도
                         click_show_more_buttons(driver)
@@ -508,7 +540,7 @@ def remove_image_verify_popup(driver):
                 try:
                     driver.execute_script("arguments[0].click();", button)
                     print("이미지 검사 팝업 닫기 성공")
-                    time.sleep(1)
+                    settle(driver, "popup-close", 1, "dom")
                     return True
                 except:
                     continue
@@ -580,7 +612,7 @@ def click_show_more_buttons(driver):
                                     
                                     # 버튼이 클릭 가능한 위치로 스크롤
                                     driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button)
-                                    time.sleep(2)
+                                    settle(driver, "show-more-scroll", 2, "dom")
                                     
                                     # 이미지 검사 팝업 다시 한번 체크
                                     remove_image_verify_popup(driver)
@@ -594,7 +626,7 @@ def click_show_more_buttons(driver):
                                     # 클릭 카운트 증가 및 로그
                                     SHOW_MORE_CLICKS += 1
                                     print(f"'더보기' 버튼 클릭됨: {text} (총 {SHOW_MORE_CLICKS}/{MAX_SHOW_MORE_CLICKS})")
-                                    time.sleep(3)  # 콘텐츠 로딩 대기
+                                    settle(driver, "show-more-click", 3, "dom")  # 콘텐츠 로딩 대기
                                     return True
                             except:
                                 continue
@@ -652,7 +684,7 @@ try:
     wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
     
     # 초기 로딩 대기
-    time.sleep(10)  # 초기 대기 시간 증가
+    settle(driver, "load", 10, "network")  # 초기 대기 시간 증가
     
     # 초기 이미지 검사 팝업 제거
     remove_image_verify_popup(driver)
@@ -661,7 +693,7 @@ try:
     print("페이지 스크롤 중...")
     for i in range(8):  # 스크롤 횟수 증가
         driver.execute_script(f"window.scrollTo(0, document.body.scrollHeight * {(i + 1) / 8});")
-        time.sleep(3)  # 각 스크롤 후 대기 시간 증가
+        settle(driver, f"scroll {i + 1}/8", 3, "images")  # 각 스크롤 후 대기 시간 증가
         remove_image_verify_popup(driver)
         # '더보기' 버튼은 최대 2번까지만 클릭
         if SHOW_MORE_CLICKS < MAX_SHOW_MORE_CLICKS:
@@ -669,7 +701,7 @@ try:
     
     # 페이지 최상단으로 스크롤
     driver.execute_script("window.scrollTo(0, 0);")
-    time.sleep(3)
+    settle(driver, "scroll-top", 3, "dom")
     
     # 페이지 소스 파싱
     print("페이지 소스 파싱 중...")
@@ -737,16 +769,41 @@ try:
     # JavaScript로 찾은 이미지 추가 (이미 필터링됨)
     image_urls.update(page_data.get('images', []))
     
+    # 같은 사진의 크기/포맷 변형 URL은 하나만 받기
+    image_urls = [u for u in image_urls if u]
+    if HAS_DEDUP:
+        image_urls = collapse_variants(image_urls)
+
     # 이미지 다운로드
+    image_urls = [u if u.startswith(('http://', 'https://')) else urljoin(search_url, u)
+                  for u in image_urls if not u.startswith("data:")]
     print(f"발견된 이미지 수: {len(image_urls)}")
-    for i, img_url in enumerate(image_urls):
-        if img_url and not img_url.startswith("data:"):
-            if not img_url.startswith(('http://', 'https://')):
-                img_url = urljoin(search_url, img_url)
+    if HAS_DOWNLOADER:
+        # 고정 대기 대신 호스트당 동시 요청 수 제한 + 재시도(백오프)
+        # 미디어 저장소: 이전에 받은 URL은 조건부 요청(304)으로 재사용, 폴더에는 하드 링크
+        media_store = MediaStore()
+        results = download_many(image_urls, product_folder, lambda i, ext: f"image_{i}{ext}",
+                                per_host=4, max_bytes=50 * 1024 * 1024, store=media_store,
+                                headers=dict(DEFAULT_HEADERS, Referer="https://www.aliexpress.com/"))
+        media_store.gc()
+        for r in results:
+            if not r.ok:
+                print(f"다운로드 실패: {r.url} ({r.error})")
+        print(f"이미지 다운로드 완료: {sum(r.ok for r in results)}/{len(results)}")
+    else:
+        for i, img_url in enumerate(image_urls):
             print(f"이미지 다운로드 중 ({i+1}/{len(image_urls)}): {img_url}")
             download_file(img_url, product_folder, f"image_{i+1}.jpg")
             # 과도한 요청 방지를 위한 대기
             time.sleep(0.5)
+
+    # 다운로드 후 지각 해시로 거의 같은 이미지 제거 (가장 큰 해상도만 유지)
+    if HAS_DEDUP:
+        try:
+            before, after = dedup_folder(product_folder)
+            print(f"중복 이미지 제거: {before} -> {after}")
+        except Exception as e:
+            print(f"중복 제거 중 오류: {e}")
     
     # 비디오 URL 수집
     video_urls = set()
@@ -882,4 +939,6 @@ except Exception as e:
     print(traceback.format_exc())
 
 finally:
+    if WAIT_LOG is not None:
+        print(f"[wait] {WAIT_LOG.summary()}")
     driver.quit() 
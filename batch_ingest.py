@@ -0,0 +1,417 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+from browser_pool import HAS_PLAYWRIGHT, Profile
+from downloader import DEFAULT_HEADERS, download_many, make_session
+from fetch_strategy import FetchStats, fetch_adaptive, missing_fields
+from html_stream import fetch_html
+from http_cache import MODES as CACHE_MODES, cached_get, set_mode
+from image_rank import rank_images
+from media_store import MediaStore
+from parse_cache import ParseCache
+from product_extract import PageParser
+from site_adapters import adapter_for_url
+from page_extract import visit
+
+DEFAULT_OUT = os.path.join(os.getcwd(), "batch_outputs")
+HTML_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
+}
+STAGES = ("fetch", "parse", "download", "render")
+
+
+@dataclass
+class RenderOptions:
+    """shorts_maker2.py arguments shared by every product of a batch."""
+    duration: int = 24
+    min_slide: float = 2.0
+    max_slide: float = 5.0
+    no_tts: bool = False
+    cta: str = ""
+    template_json: str = ""
+    font_path: str = ""
+
+
+@dataclass
+class BatchItem:
+    url: str
+    index: int
+    site: str = "auto"
+    status: str = "queued"  # queued | fetch | parse | download | render-queued | render | done | failed | skipped
+    timings: Dict[str, float] = field(default_factory=dict)
+    title: str = ""
+    price: str = ""
+    features: List[str] = field(default_factory=list)
+    images: List[str] = field(default_factory=list)  # downloaded paths
+    folder: str = ""
+    out_path: str = ""
+    cached: bool = False
+    strategy: str = ""  # fetch strategy that produced the page (requests / playwright)
+    html_kb: float = 0.0  # HTML transferred by requests (streamed pages stop early)
+    html_cut: bool = False  # reading stopped once the product metadata was in
+    error: str = ""
+
+    def row(self) -> dict:
+        """Flat dict for the progress table."""
+        r = {"#": self.index, "status": self.status, "site": self.site, "via": self.strategy or ("cache" if self.cached else ""),
+             "title": self.title[:40],
+             "images": len(self.images), "html KB": round(self.html_kb) if self.html_kb else None}
+        for s in STAGES:
+            r[s] = round(self.timings[s], 2) if s in self.timings else None
+        r["error"] = self.error[:80]
+        r["url"] = self.url
+        return r
+
+
+def read_urls(text: str) -> List[str]:
+    """http(s) URLs from pasted text or a file (one per line / whitespace separated), de-duplicated."""
+    urls = re.findall(r"https?://[^\s<>\"']+", text or "")
+    return list(dict.fromkeys(u.rstrip(").,;") for u in urls))
+
+
+def _slug(text: str, n: int = 40) -> str:
+    s = re.sub(r"[^\w가-힣]+", "_", text or "").strip("_")
+    return s[:n] or "product"
+
+
+def _features(rec) -> List[str]:
+    out = []
+    for f in rec.features or []:
+        f = " ".join(f.split())
+        if 6 <= len(f) <= 90 and f not in out:
+            out.append(f)
+        if len(out) >= 5:
+            break
+    return out
+
+
+class HostLimiter:
+    """Per-host concurrency cap plus a politeness gap between request starts (with jitter)."""
+
+    def __init__(self, per_host: int = 2, delay: float = 1.0):
+        self.per_host = max(1, per_host)
+        self.delay = max(0.0, delay)
+        self.sems: Dict[str, asyncio.Semaphore] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+        self.last: Dict[str, float] = {}
+
+    def _host(self, url: str) -> str:
+        return (urlparse(url).hostname or "").lower()
+
+    async def acquire(self, url: str) -> asyncio.Semaphore:
+        host = self._host(url)
+        sem = self.sems.setdefault(host, asyncio.Semaphore(self.per_host))
+        await sem.acquire()
+        lock = self.locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            gap = self.last.get(host, 0.0) + self.delay * (0.75 + random.random() / 2) - time.monotonic()
+            if gap > 0:
+                await asyncio.sleep(gap)
+            self.last[host] = time.monotonic()
+        return sem
+
+
+class BatchRunner:
+    """Ingest many product URLs at once.
+
+    - fetch: asyncio tasks (blocking requests calls run in threads), bounded overall by
+      `concurrency` and per host by HostLimiter; with `browser`, pages without product data
+      (or domains where requests is known not to work) go through the Playwright pool
+    - parse + image ranking + download: thread pool of `workers`
+    - render: products with 2+ images are queued for shorts_maker2.py as soon as they are
+      ready (`render_workers` subprocesses at a time), while other URLs are still fetching
+    - on_update(items) is called from the event loop after every stage change
+    """
+
+    def __init__(self, urls: Sequence[str], out_dir: str = DEFAULT_OUT, max_images: int = 6,
+                 concurrency: int = 8, per_host: int = 2, delay: float = 1.0, workers: int = 4,
+                 timeout: int = 30, rank: bool = True, render: Optional[RenderOptions] = None,
+                 render_workers: int = 1, use_cache: bool = True, browser: bool = False, stream: bool = True,
+                 on_update: Optional[Callable[[List[BatchItem]], None]] = None):
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        self.out_dir = os.path.join(out_dir, f"batch_{stamp}")
+        self.items = [BatchItem(u, i) for i, u in enumerate(urls, 1)]
+        self.max_images = max_images
+        self.concurrency = concurrency
+        self.limiter = HostLimiter(per_host, delay)
+        self.workers = workers
+        self.timeout = timeout
+        self.rank = rank
+        self.render = render
+        self.render_workers = max(1, render_workers)
+        self.cache = ParseCache() if use_cache else None
+        self.browser = browser and HAS_PLAYWRIGHT
+        self.stream = stream
+        self.stats = FetchStats()
+        self.on_update = on_update
+        self.session = make_session(pool_size=max(concurrency, 8), headers=HTML_HEADERS)
+        self.store = MediaStore()
+
+    def _changed(self, item: BatchItem, status: Optional[str] = None) -> None:
+        if status:
+            item.status = status
+        if self.on_update is not None:
+            self.on_update(self.items)
+
+    # -- stages (blocking; run in threads) ---------------------------------
+
+    def _fetch(self, url: str, referer: str, item: Optional[BatchItem] = None,
+               usable: Optional[Callable[[str], bool]] = None) -> str:
+        headers = {"Referer": referer} if referer else None
+        if self.stream:
+            res = fetch_html(url, self.session, usable=usable, min_images=min(3, self.max_images),
+                             timeout=self.timeout, headers=headers)
+            if item is not None:
+                item.html_kb, item.html_cut = res.bytes_read / 1024, res.truncated
+            return res.html
+        r = cached_get(url, self.session, timeout=self.timeout, headers=headers)
+        r.raise_for_status()
+        if hasattr(r, "apparent_encoding") and "charset" not in r.headers.get("content-type", "").lower():
+            r.encoding = r.apparent_encoding or "utf-8"
+        return r.text
+
+    def _fetch_browser(self, url: str) -> str:
+        adapter = adapter_for_url(url)
+        prof = Profile(referer=adapter.referer)
+        return visit(url, ("html",), prof, timeout=self.timeout, policy=adapter.policy).html or ""
+
+    def _fetch_parse(self, item: BatchItem):
+        """Fetch with escalation (fetch_strategy) and parse; fills fetch/parse timings."""
+        adapter = adapter_for_url(item.url)
+        min_images = min(3, self.max_images)
+        parse = PageParser(item.url, site=adapter.name, max_images=max(self.max_images * 3, 20), cache=self.cache)
+        usable = lambda html: not missing_fields(parse.check(html), min_images)
+        fetchers = {"requests": lambda u: self._fetch(u, adapter.referer, item, usable)}
+        if self.browser:
+            fetchers["playwright"] = self._fetch_browser
+        out = fetch_adaptive(item.url, fetchers, parse, prefer=adapter.fetch,
+                             min_images=min_images, stats=self.stats)
+        if out.ok:  # an incomplete page is not cached, so the next run escalates again
+            parse.store(out.html)
+        item.timings["fetch"] = sum(a.fetch_seconds for a in out.attempts)
+        item.timings["parse"] = sum(a.parse_seconds for a in out.attempts)
+        item.strategy = out.strategy
+        if out.record is None:
+            raise RuntimeError(next((a.error for a in reversed(out.attempts) if a.error), "no HTML"))
+        return out.record
+
+    def _prepare(self, item: BatchItem, rec):
+        """Rank images of the parsed (or cached) record and create the product folder."""
+        adapter = adapter_for_url(item.url)
+        t = time.perf_counter()
+        urls = adapter.normalize_images(rec.image_urls)
+        if self.rank:
+            refs = rank_images([r for r in rec.images if r.url], top_n=self.max_images)
+            urls = adapter.normalize_images([r.url for r in refs]) or urls
+        urls = urls[:self.max_images]
+        item.timings["parse"] = item.timings.get("parse", 0.0) + time.perf_counter() - t
+        item.title, item.price, item.features = rec.title or "", rec.price_text or "", _features(rec)
+        item.folder = os.path.join(self.out_dir, f"{item.index:03d}_{_slug(item.title)}")
+        os.makedirs(item.folder, exist_ok=True)
+        with open(os.path.join(item.folder, "product.json"), "w", encoding="utf-8") as f:
+            f.write(rec.to_json(indent=2))
+        return urls, adapter.referer
+
+    def _download(self, item: BatchItem, urls: List[str], referer: str) -> None:
+        t = time.perf_counter()
+        headers = dict(DEFAULT_HEADERS, Referer=referer) if referer else None
+        results = download_many(urls, item.folder, lambda i, ext: f"image_{i}{ext}",
+                                store=self.store, headers=headers)
+        item.images = [r.path for r in results if r.ok]
+        item.timings["download"] = time.perf_counter() - t
+
+    # -- pipeline ----------------------------------------------------------
+
+    async def _ingest(self, item: BatchItem, gate: asyncio.Semaphore, pool: ThreadPoolExecutor,
+                      renders: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        adapter = adapter_for_url(item.url)
+        item.site = adapter.name
+        try:
+            rec = self.cache.get(item.url, adapter.name) if self.cache is not None else None
+            if rec is not None:
+                item.cached = True
+            else:
+                async with gate:
+                    sem = await self.limiter.acquire(item.url)
+                    try:
+                        self._changed(item, "fetch")
+                        rec = await asyncio.to_thread(self._fetch_parse, item)
+                    finally:
+                        sem.release()
+            self._changed(item, "parse")
+            urls, referer = await loop.run_in_executor(pool, self._prepare, item, rec)
+            self._changed(item, "download")
+            await loop.run_in_executor(pool, self._download, item, urls, referer)
+        except Exception as e:
+            item.error = f"{type(e).__name__}: {e}"
+            self._changed(item, "failed")
+            return
+        if self.render is None:
+            self._changed(item, "done")
+        elif len(item.images) < 2:
+            item.error = "fewer than 2 images"
+            self._changed(item, "skipped")
+        else:
+            self._changed(item, "render-queued")
+            await renders.put(item)
+
+    def render_cmd(self, item: BatchItem) -> List[str]:
+        o = self.render
+        item.out_path = os.path.join(item.folder, "shorts.mp4")
+        cmd = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "shorts_maker2.py"),
+               "--images", *item.images, "--out", item.out_path, "--duration", str(o.duration),
+               "--min_slide", str(o.min_slide), "--max_slide", str(o.max_slide)]
+        if item.title:
+            cmd += ["--title", item.title]
+        if item.price:
+            cmd += ["--price", item.price]
+        for line in item.features:
+            cmd += ["--feature", line]
+        if o.no_tts:
+            cmd.append("--no_tts")
+        if o.cta:
+            cmd += ["--cta", o.cta]
+        if o.template_json:
+            cmd += ["--template_json", o.template_json]
+        if o.font_path:
+            cmd += ["--font_path", o.font_path]
+        return cmd
+
+    async def _render_worker(self, renders: asyncio.Queue) -> None:
+        while True:
+            item = await renders.get()
+            if item is None:
+                return
+            self._changed(item, "render")
+            t = time.perf_counter()
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *self.render_cmd(item), stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+                out, _ = await proc.communicate()
+                with open(os.path.join(item.folder, "render.log"), "wb") as f:
+                    f.write(out or b"")
+                ok = proc.returncode == 0 and os.path.exists(item.out_path)
+                if not ok:
+                    item.error = f"render exit {proc.returncode} (render.log)"
+            except Exception as e:
+                ok = False
+                item.error = f"{type(e).__name__}: {e}"
+            item.timings["render"] = time.perf_counter() - t
+            self._changed(item, "done" if ok else "failed")
+
+    async def run_async(self) -> List[BatchItem]:
+        os.makedirs(self.out_dir, exist_ok=True)
+        gate = asyncio.Semaphore(max(1, self.concurrency))
+        renders: asyncio.Queue = asyncio.Queue()
+        render_tasks = [asyncio.create_task(self._render_worker(renders))
+                        for _ in range(self.render_workers if self.render else 0)]
+        if self.on_update is not None:
+            self.on_update(self.items)
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+                await asyncio.gather(*(self._ingest(it, gate, pool, renders) for it in self.items))
+            for _ in render_tasks:
+                await renders.put(None)
+            await asyncio.gather(*render_tasks)
+        finally:
+            self.session.close()
+            self.store.gc()
+        self.write_report()
+        return self.items
+
+    def run(self) -> List[BatchItem]:
+        return asyncio.run(self.run_async())
+
+    def write_report(self) -> str:
+        path = os.path.join(self.out_dir, "batch_report.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([it.row() | {"folder": it.folder, "out": it.out_path} for it in self.items],
+                      f, ensure_ascii=False, indent=2)
+        return path
+
+
+def progress_printer() -> Callable[[List[BatchItem]], None]:
+    """on_update for the CLI: one line per status change."""
+    last: Dict[int, str] = {}
+
+    def show(items: List[BatchItem]) -> None:
+        for it in items:
+            if last.get(it.index) != it.status:
+                last[it.index] = it.status
+                took = ", ".join(f"{s} {it.timings[s]:.1f}s" for s in STAGES if s in it.timings)
+                print(f"[{it.index:3d}] {it.status:<13} {it.site:<10} {took}  {it.error or it.url}")
+
+    return show
+
+
+def main():
+    ap = argparse.ArgumentParser(description="여러 상품 URL을 한 번에 수집(동시 fetch·파싱·이미지 다운로드)하고 쇼츠 렌더링을 대기열로 실행")
+    ap.add_argument("inputs", nargs="*", help="URL 또는 URL 목록 파일(한 줄에 하나)")
+    ap.add_argument("--out", default=DEFAULT_OUT, help="결과 폴더 (batch_<시각>/ 하위에 상품별 폴더)")
+    ap.add_argument("--images", type=int, default=6, help="상품당 다운로드할 이미지 수")
+    ap.add_argument("--concurrency", type=int, default=8, help="동시 HTML 요청 수(전체)")
+    ap.add_argument("--per-host", type=int, default=2, help="도메인당 동시 요청 수")
+    ap.add_argument("--delay", type=float, default=1.0, help="같은 도메인 요청 시작 간 최소 간격(초)")
+    ap.add_argument("--workers", type=int, default=4, help="파싱·이미지 순위·다운로드 작업 스레드 수")
+    ap.add_argument("--timeout", type=int, default=30)
+    ap.add_argument("--no-rank", action="store_true", help="이미지 크기 확인(순위) 생략")
+    ap.add_argument("--no-cache", action="store_true", help="파싱 캐시 사용 안 함")
+    ap.add_argument("--browser", action="store_true", help="상품 정보가 부족한 페이지는 Playwright로 다시 받기(도메인별 성공률 학습)")
+    ap.add_argument("--no-stream", action="store_true", help="HTML을 항상 끝까지 받기(기본: og/JSON-LD 상품 정보가 나오면 수신 중단)")
+    ap.add_argument("--cache-mode", choices=CACHE_MODES, default=None,
+                    help="HTTP 응답 녹화/재생(http_cache): record=받은 응답 저장, replay=네트워크 없이 저장된 응답만 사용 (기본: $HTTP_CACHE_MODE)")
+    ap.add_argument("--render", action="store_true", help="준비된 상품부터 shorts_maker2.py로 MP4 렌더링")
+    ap.add_argument("--render-workers", type=int, default=1, help="동시 렌더링 수")
+    ap.add_argument("--duration", type=int, default=24)
+    ap.add_argument("--no_tts", action="store_true")
+    ap.add_argument("--cta", default="")
+    ap.add_argument("--template_json", default="")
+    args = ap.parse_args()
+    if args.cache_mode:
+        set_mode(args.cache_mode)
+
+    text = ""
+    for p in args.inputs or ["-"]:
+        if p == "-":
+            text += sys.stdin.read() + "\n"
+        elif os.path.exists(p):
+            with open(p, "r", encoding="utf-8") as f:
+                text += f.read() + "\n"
+        else:
+            text += p + "\n"
+    urls = read_urls(text)
+    if not urls:
+        print("[warn] no URLs given")
+        return 1
+    render = RenderOptions(duration=args.duration, no_tts=args.no_tts, cta=args.cta,
+                           template_json=args.template_json) if args.render else None
+    runner = BatchRunner(urls, out_dir=args.out, max_images=args.images, concurrency=args.concurrency,
+                         per_host=args.per_host, delay=args.delay, workers=args.workers, timeout=args.timeout,
+                         rank=not args.no_rank, render=render, render_workers=args.render_workers,
+                         use_cache=not args.no_cache, browser=args.browser, stream=not args.no_stream,
+                         on_update=progress_printer())
+    t0 = time.perf_counter()
+    items = runner.run()
+    ok = sum(it.status == "done" for it in items)
+    print(f"[info] {ok}/{len(items)} done in {time.perf_counter() - t0:.1f}s; report: {runner.write_report()}")
+    cut = sum(it.html_cut for it in items)
+    if cut:
+        print(f"[info] HTML: {sum(it.html_kb for it in items):.0f} KB read, {cut} page(s) stopped after the metadata")
+    return 0 if ok == len(items) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
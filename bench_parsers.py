@@ -0,0 +1,185 @@
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from html_context import ParseContext
+from product_extract import extract_product
+from parser_parity import sites_for
+import parser_coupang as pc
+import parser_aliexpress as pa
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parity_corpus")
+GOLDEN_SUFFIX = ".golden.json"
+FIELDS = ("title", "price", "features", "images", "specs")
+# --update-golden takes the expected record from the first of these that ran on the file
+GOLDEN_FROM = ("extract:site", "extract:generic")
+
+# name -> (site it applies to, fn(html) -> ProductRecord); "*" = every file
+PARSERS: Dict[str, tuple] = {
+    "coupang:lxml": ("coupang", lambda html: pc.parse(html, ctx=ParseContext(html), backend="lxml")),
+    "coupang:bs4": ("coupang", lambda html: pc.parse(html, ctx=ParseContext(html), backend="bs4")),
+    "aliexpress:lxml": ("aliexpress", lambda html: pa.parse(html, ctx=ParseContext(html), backend="lxml")),
+    "aliexpress:bs4": ("aliexpress", lambda html: pa.parse(html, ctx=ParseContext(html), backend="bs4")),
+    "extract:site": (None, None),  # extract_product with the file's site, filled per file
+    "extract:generic": ("*", lambda html: extract_product(html, site="auto")),
+}
+
+
+def snapshot(rec) -> dict:
+    """Comparable field values of a ProductRecord (price as its display string)."""
+    return {
+        "title": rec.title,
+        "price": rec.price_text,
+        "features": list(rec.features),
+        "images": rec.image_urls,
+        "specs": dict(rec.specs),
+    }
+
+
+def field_score(expected, got) -> float:
+    """1.0/0.0 for scalars; F1 over items for lists/dicts (order-insensitive)."""
+    if isinstance(expected, (list, dict)) or isinstance(got, (list, dict)):
+        e = set(expected.items() if isinstance(expected, dict) else expected or [])
+        g = set(got.items() if isinstance(got, dict) else got or [])
+        if not e and not g:
+            return 1.0
+        hit = len(e & g)
+        if not hit:
+            return 0.0
+        p, r = hit / len(g), hit / len(e)
+        return 2 * p * r / (p + r)
+    return 1.0 if (expected or None) == (got or None) else 0.0
+
+
+def measure(fn: Callable[[str], object], html: str, repeat: int):
+    """(best wall seconds, peak traced bytes, result) for one parser on one page."""
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn(html)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        out = fn(html)
+        _cur, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak, out
+
+
+def parsers_for(path: str) -> Dict[str, Callable[[str], object]]:
+    sites = sites_for(path)
+    out = {}
+    for name, (site, fn) in PARSERS.items():
+        if name == "extract:site":
+            if len(sites) == 1:
+                out[name] = lambda html, s=sites[0]: extract_product(html, site=s)
+        elif site == "*" or site in sites:
+            out[name] = fn
+    return out
+
+
+def load_golden(path: str) -> Optional[dict]:
+    g = os.path.splitext(path)[0] + GOLDEN_SUFFIX
+    if not os.path.exists(g):
+        return None
+    with open(g, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run(files: List[str], repeat: int, update_golden: bool = False) -> dict:
+    """Report: {file: {parser: {ms, peak_kb, accuracy, fields}}}.
+
+    Every parser is scored against the file's one golden record (the expected product),
+    so a parser that fills defaults or picks up stray images loses accuracy.
+    """
+    report = {}
+    for path in files:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            html = f.read()
+        results = {}
+        rows = {}
+        for name, fn in parsers_for(path).items():
+            sec, peak, rec = measure(fn, html, repeat)
+            results[name] = snapshot(rec)
+            rows[name] = {"ms": round(sec * 1000, 3), "peak_kb": round(peak / 1024, 1)}
+        golden = load_golden(path)
+        if update_golden:
+            golden = next((results[n] for n in GOLDEN_FROM if n in results), None)
+            with open(os.path.splitext(path)[0] + GOLDEN_SUFFIX, "w", encoding="utf-8") as f:
+                json.dump(golden, f, ensure_ascii=False, indent=2, sort_keys=True)
+        if golden is not None:
+            for name, row in rows.items():
+                scores = {k: field_score(golden.get(k), results[name][k]) for k in FIELDS}
+                row["fields"] = scores
+                row["accuracy"] = round(sum(scores.values()) / len(scores), 3)
+        report[os.path.basename(path)] = rows
+    return report
+
+
+def print_report(report: dict, baseline: Optional[dict] = None) -> int:
+    """Table per file; with a baseline, time deltas and accuracy drops. Returns #accuracy regressions."""
+    regressions = 0
+    totals: Dict[str, List[float]] = {}
+    for fname, rows in report.items():
+        print(fname)
+        for name, row in rows.items():
+            acc = row.get("accuracy")
+            line = f"    {name:<16} {row['ms']:8.2f} ms  {row['peak_kb']:8.1f} KB  acc={acc if acc is not None else '-'}"
+            base = ((baseline or {}).get(fname) or {}).get(name)
+            if base:
+                if base.get("ms"):
+                    line += f"  ({(row['ms'] / base['ms'] - 1) * 100:+.0f}% time)"
+                if acc is not None and base.get("accuracy") is not None and acc < base["accuracy"]:
+                    line += f"  ACCURACY {base['accuracy']} -> {acc}"
+                    regressions += 1
+            if acc is not None and acc < 1.0:
+                bad = [k for k, v in row["fields"].items() if v < 1.0]
+                line += f"  [{', '.join(bad)}]"
+            print(line)
+            t = totals.setdefault(name, [0.0, 0.0, 0])
+            t[0] += row["ms"]
+            if acc is not None:
+                t[1] += acc
+                t[2] += 1
+    print("summary")
+    for name, (ms, acc, n) in totals.items():
+        print(f"    {name:<16} total {ms:8.2f} ms  mean acc={acc / n:.3f}" if n else f"    {name:<16} total {ms:8.2f} ms")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="저장된 상품 HTML로 파서별 속도·메모리·정확도(골든 JSON) 측정 (오프라인)")
+    ap.add_argument("paths", nargs="*", help="HTML 파일 또는 폴더 (기본: parity_corpus/)")
+    ap.add_argument("--repeat", type=int, default=10, help="파서당 반복 횟수 (최솟값 사용)")
+    ap.add_argument("--json", dest="json_out", default="", help="리포트를 JSON으로 저장 (다음 비교 기준)")
+    ap.add_argument("--baseline", default="", help="이전 --json 리포트와 비교")
+    ap.add_argument("--update-golden", action="store_true", help="현재 결과(extract_product)로 <파일>.golden.json 갱신 — 저장 후 직접 검토")
+    args = ap.parse_args()
+
+    files = []
+    for p in (args.paths or [DEFAULT_CORPUS]):
+        files.extend(sorted(glob.glob(os.path.join(p, "*.htm*"))) if os.path.isdir(p) else [p])
+    if not files:
+        print("[warn] no HTML files found")
+        return 1
+    report = run(files, args.repeat, update_golden=args.update_golden)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = print_report(report, baseline)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"[info] report saved: {args.json_out}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import os
+import sys
+import glob
+import timeit
+import argparse
+
+from bs4 import BeautifulSoup
+
+from html_context import ParseContext
+from price import find_price, parse_price_text, scan_text
+import parser_coupang as pc
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parity_corpus")
+
+
+def legacy_scan(html: str):
+    # previous behaviour: whole-page get_text() + uncompiled regex on every call
+    import re
+    text = BeautifulSoup(html, "lxml").get_text("\n", strip=True)
+    m = re.search(r"(?:₩|\b)[\s]*([0-9]{1,3}(?:,[0-9]{3})+)\s*원?", text)
+    return m.group(0) if m else None
+
+
+def regions_first(html: str):
+    p = find_price(ParseContext(html), pc.PRICE_REGIONS, pc.ORIGINAL_PRICE_REGIONS)
+    return p.display if p else None
+
+
+def text_only(html: str):
+    p = scan_text(ParseContext(html).text)
+    return p.display if p else None
+
+
+CASES = {"legacy(bs4 text+re)": legacy_scan, "regions-first": regions_first, "text-only(lxml)": text_only}
+
+# (function, input, expected amount, expected currency): quantity prefixes, 만원, suffix symbols
+TEXT_CASES = [
+    (parse_price_text, "2개 묶음 12,900원", 12900.0, "KRW"),
+    (parse_price_text, "약 3만원", 30000.0, "KRW"),
+    (parse_price_text, "1+1 ₩49,900", 49900.0, "KRW"),
+    (parse_price_text, "12,49 €", 12.49, "EUR"),
+    (parse_price_text, "3 pcs US $19.99", 19.99, "USD"),
+    (parse_price_text, "19900", 19900.0, None),
+    (scan_text, "가격 12,49 € 배송", 12.49, "EUR"),
+    (scan_text, "2개 묶음 12,900원 무료배송", 12900.0, "KRW"),
+    (scan_text, "Only 19.99 USD today", 19.99, "USD"),
+]
+
+
+def check_text_cases() -> int:
+    """Print one line per TEXT_CASES entry; returns the number of wrong results."""
+    bad = 0
+    for fn, text, amount, currency in TEXT_CASES:
+        p = fn(text)
+        got = (p.amount, p.currency) if p else None
+        ok = got == (amount, currency)
+        bad += not ok
+        print(f"[{'OK  ' if ok else 'FAIL'}] {fn.__name__}({text!r}) -> {got}")
+    return bad
+
+
+def main():
+    ap = argparse.ArgumentParser(description="가격 추출 마이크로 벤치마크 (저장된 페이지)")
+    ap.add_argument("paths", nargs="*", help="HTML 파일 또는 폴더 (기본: parity_corpus/)")
+    ap.add_argument("--repeat", type=int, default=20, help="파일당 반복 횟수")
+    args = ap.parse_args()
+    bad = check_text_cases()
+
+    files = []
+    for p in (args.paths or [DEFAULT_CORPUS]):
+        files.extend(sorted(glob.glob(os.path.join(p, "*.htm*"))) if os.path.isdir(p) else [p])
+    if not files:
+        print("[warn] no HTML files found")
+        return 1
+    for path in files:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            html = f.read()
+        print(f"{os.path.basename(path)} ({len(html) // 1024} KB)")
+        for name, fn in CASES.items():
+            sec = min(timeit.repeat(lambda: fn(html), number=1, repeat=args.repeat))
+            print(f"    {name:<22} {sec * 1000:8.2f} ms  -> {fn(html)!r}")
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
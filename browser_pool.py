@@ -0,0 +1,214 @@
+import atexit
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Optional: Playwright (+ playwright-stealth)
+try:
+    from playwright.sync_api import sync_playwright
+    HAS_PLAYWRIGHT = True
+except Exception:
+    HAS_PLAYWRIGHT = False
+try:
+    from playwright.sync_api import TargetClosedError
+except Exception:  # older Playwright raises plain Error("Target ... has been closed")
+    TargetClosedError = None
+try:
+    from playwright_stealth import stealth_sync
+except Exception:
+    stealth_sync = None
+
+UA_MOBILE = "Mozilla/5.0 (Linux; Android 13; SM-G998N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36"
+UA_DESKTOP = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+DEFAULT_SIZE = 2
+# Recycle a context after this many pages so cookies/cache/memory do not grow forever
+PAGES_PER_CONTEXT = 40
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Browser context settings; every distinct profile gets its own warm context per worker."""
+    mobile: bool = True
+    locale: str = "ko-KR"
+    stealth: bool = True
+    referer: str = ""
+
+    def context_args(self) -> dict:
+        headers = {"Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7"}
+        if self.referer:
+            headers["Referer"] = self.referer
+        args = {
+            "locale": self.locale,
+            "ignore_https_errors": True,
+            "user_agent": UA_MOBILE if self.mobile else UA_DESKTOP,
+            "extra_http_headers": headers,
+        }
+        if self.mobile:
+            args.update({"viewport": {"width": 375, "height": 667}, "is_mobile": True, "device_scale_factor": 2})
+        return args
+
+
+def _target_closed(e: BaseException) -> bool:
+    if TargetClosedError is not None and isinstance(e, TargetClosedError):
+        return True
+    msg = str(e).lower()
+    return "target closed" in msg or "has been closed" in msg
+
+
+class _Worker(threading.Thread):
+    """Owns one Playwright driver + Chromium; Playwright sync objects never leave this thread."""
+
+    def __init__(self, pool: "BrowserPool", idx: int):
+        super().__init__(name=f"browser-pool-{idx}", daemon=True)
+        self.pool = pool
+        self.pw = None
+        self.browser = None
+        self.contexts: Dict[Profile, list] = {}  # profile -> [context, pages served, init scripts added]
+
+    def _browser(self):
+        if self.browser is None or not self.browser.is_connected():
+            self.contexts.clear()
+            if self.pw is None:
+                self.pw = sync_playwright().start()
+            self.browser = self.pw.chromium.launch(headless=self.pool.headless)
+            self.pool.launches += 1
+        return self.browser
+
+    def _context(self, profile: Profile):
+        browser = self._browser()  # a crashed/disconnected browser drops every cached context
+        entry = self.contexts.get(profile)
+        if entry is not None and entry[1] >= PAGES_PER_CONTEXT:
+            try:
+                entry[0].close()
+            except Exception:
+                pass
+            entry = None
+        if entry is None:
+            entry = [browser.new_context(**profile.context_args()), 0, 0]
+            self.contexts[profile] = entry
+        scripts = list(self.pool.init_scripts)
+        for js in scripts[entry[2]:]:
+            entry[0].add_init_script(js)
+        entry[2] = len(scripts)
+        entry[1] += 1
+        return entry[0]
+
+    def _page(self, profile: Profile):
+        """New page in the profile's context; a closed context or browser is replaced once."""
+        try:
+            return self._context(profile).new_page()
+        except Exception as e:
+            if not _target_closed(e):
+                raise
+        self.contexts.pop(profile, None)
+        if self.browser is not None and not self.browser.is_connected():
+            self.browser = None
+        return self._context(profile).new_page()
+
+    def run(self):
+        while True:
+            job = self.pool.jobs.get()
+            if job is None:
+                break
+            kind, profile, fn, fut = job
+            if not fut.set_running_or_notify_cancel():
+                continue
+            page = None
+            try:
+                if kind == "warm":
+                    self._context(profile)
+                    self.contexts[profile][1] -= 1
+                    fut.set_result(None)
+                    continue
+                page = self._page(profile)
+                if profile.stealth and stealth_sync is not None:
+                    stealth_sync(page)
+                fut.set_result(fn(page))
+            except BaseException as e:
+                # A browser that crashed mid-job is relaunched on the next one (see _context)
+                fut.set_exception(e)
+            finally:
+                if page is not None:
+                    try:
+                        page.close()
+                    except Exception:
+                        pass
+        for ctx, *_ in self.contexts.values():
+            try:
+                ctx.close()
+            except Exception:
+                pass
+        try:
+            if self.browser is not None:
+                self.browser.close()
+            if self.pw is not None:
+                self.pw.stop()
+        except Exception:
+            pass
+
+
+class BrowserPool:
+    """Warm Chromium instances shared by all Playwright fetchers.
+
+    - size worker threads, each with its own browser; jobs go to whichever is free
+    - run(profile, fn): fn(page) runs on a fresh page of that profile's warm context
+    - warm(profiles): pre-create contexts before the first request
+    - add_init_script(js): JS every page runs before its own scripts, added once per context
+    """
+
+    def __init__(self, size: int = DEFAULT_SIZE, headless: bool = True):
+        if not HAS_PLAYWRIGHT:
+            raise RuntimeError("Playwright not installed")
+        self.size = max(1, int(size))
+        self.headless = headless
+        self.jobs: "queue.Queue" = queue.Queue()
+        self.launches = 0
+        self.init_scripts: List[str] = []
+        self.workers = [_Worker(self, i) for i in range(self.size)]
+        for w in self.workers:
+            w.start()
+
+    def add_init_script(self, js: str) -> None:
+        """Register JS for all contexts (new ones at creation, warm ones before their next page)."""
+        if js not in self.init_scripts:
+            self.init_scripts.append(js)
+
+    def submit(self, profile: Profile, fn: Callable) -> Future:
+        fut: Future = Future()
+        self.jobs.put(("page", profile, fn, fut))
+        return fut
+
+    def run(self, profile: Profile, fn: Callable, timeout: Optional[float] = None):
+        return self.submit(profile, fn).result(timeout)
+
+    def warm(self, profiles: Iterable[Profile]) -> None:
+        futs = []
+        for prof in profiles:
+            for _ in range(self.size):
+                fut: Future = Future()
+                self.jobs.put(("warm", prof, None, fut))
+                futs.append(fut)
+        for f in futs:
+            f.result()
+
+    def shutdown(self) -> None:
+        for _ in self.workers:
+            self.jobs.put(None)
+        for w in self.workers:
+            w.join(timeout=10)
+
+
+_POOL: Optional[BrowserPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool(size: int = DEFAULT_SIZE) -> BrowserPool:
+    """Process-wide pool (survives Streamlit reruns), started on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = BrowserPool(size=size)
+            atexit.register(_POOL.shutdown)
+        return _POOL
@@ -0,0 +1,224 @@
+import os
+import time
+import hashlib
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import get_cache
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "image/avif,image/webp,image/*,*/*;q=0.8",
+    "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
+}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+CHUNK = 64 * 1024
+EXT_BY_TYPE = {"image/png": ".png", "image/webp": ".webp", "image/gif": ".gif", "image/avif": ".avif",
+               "video/mp4": ".mp4", "application/pdf": ".pdf"}
+
+
+class _Retry(Exception):
+    pass
+
+
+@dataclass
+class DownloadResult:
+    url: str
+    path: Optional[str] = None
+    status: int = 0
+    content_type: str = ""
+    nbytes: int = 0
+    attempts: int = 0
+    seconds: float = 0.0
+    error: str = ""
+    sha256: str = ""
+    etag: str = ""
+    last_modified: str = ""
+    cache: str = ""  # media store: "miss" (downloaded) | "revalidated" (304, blob reused)
+
+    @property
+    def ok(self) -> bool:
+        return self.path is not None
+
+
+def make_session(pool_size: int = 16, headers: Optional[dict] = None) -> requests.Session:
+    """Session whose connection pool is large enough for concurrent workers (keep-alive reuse)."""
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    s.headers.update(headers or DEFAULT_HEADERS)
+    return s
+
+
+def ext_for(content_type: str, url: str = "", default: str = ".jpg") -> str:
+    ct = (content_type or "").split(";")[0].strip().lower()
+    if ct in EXT_BY_TYPE:
+        return EXT_BY_TYPE[ct]
+    if ct in ("image/jpeg", "image/jpg"):
+        return ".jpg"
+    tail = os.path.splitext(urlparse(url).path)[1].lower()
+    return tail if tail in (".jpg", ".jpeg", ".png", ".webp", ".gif", ".mp4") else default
+
+
+def _retry_after(r: requests.Response) -> Optional[float]:
+    v = r.headers.get("Retry-After")
+    try:
+        return min(30.0, float(v)) if v else None
+    except ValueError:
+        return None
+
+
+def fetch_to_file(session: requests.Session, url: str, path_for: Callable[[str], str],
+                  timeout=(5, 20), retries: int = 2, backoff: float = 0.5,
+                  max_bytes: Optional[int] = None, headers: Optional[dict] = None) -> DownloadResult:
+    """Stream one URL to disk (via a .part file, renamed when complete).
+
+    - path_for(ext) gives the final path once the content type is known
+    - retries with exponential backoff + jitter on connection errors, timeouts, 429 and 5xx
+      (Retry-After is honoured)
+    - max_bytes: skip files whose Content-Length (or streamed size) exceeds it
+    - headers may carry If-None-Match/If-Modified-Since; a 304 returns status 304, no path
+    - the SHA-256 of the body is computed while streaming
+    - http_cache replay mode serves the recorded body instead; record mode stores it
+    """
+    cache = get_cache()
+    if cache.replaying:
+        return _replay_to_file(cache, url, path_for)
+    if cache.recording and headers:
+        # a 304 would leave nothing to record
+        headers = {k: v for k, v in headers.items() if k.lower() not in ("if-none-match", "if-modified-since")}
+    res = DownloadResult(url)
+    part = None
+    t0 = time.perf_counter()
+    for attempt in range(retries + 1):
+        res.attempts = attempt + 1
+        wait = backoff * (2 ** attempt) * (0.5 + random.random())
+        try:
+            with session.get(url, stream=True, timeout=timeout, headers=headers) as r:
+                res.status = r.status_code
+                if r.status_code == 304:
+                    res.error = ""
+                    break
+                if r.status_code in RETRY_STATUS:
+                    res.error = f"HTTP {r.status_code}"
+                    wait = _retry_after(r) or wait
+                    raise _Retry()
+                if r.status_code != 200:
+                    res.error = f"HTTP {r.status_code}"
+                    break
+                size = int(r.headers.get("content-length") or 0)
+                if max_bytes and size > max_bytes:
+                    res.error = f"too large ({size} bytes)"
+                    break
+                res.content_type = r.headers.get("content-type", "")
+                res.etag = r.headers.get("etag", "")
+                res.last_modified = r.headers.get("last-modified", "")
+                final = path_for(ext_for(res.content_type, url))
+                part = final + ".part"
+                n = 0
+                digest = hashlib.sha256()
+                with open(part, "wb") as f:
+                    for chunk in r.iter_content(chunk_size=CHUNK):
+                        if chunk:
+                            f.write(chunk)
+                            digest.update(chunk)
+                            n += len(chunk)
+                            if max_bytes and n > max_bytes:
+                                break
+                if max_bytes and n > max_bytes:
+                    os.remove(part)
+                    res.error = f"too large (>{max_bytes} bytes)"
+                    break
+                os.replace(part, final)
+                res.path, res.nbytes, res.error, res.sha256 = final, n, "", digest.hexdigest()
+                break
+        except _Retry:
+            pass
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            res.error = f"{type(e).__name__}: {e}"
+        except Exception as e:
+            res.error = f"{type(e).__name__}: {e}"
+            break
+        if attempt < retries:
+            time.sleep(wait)
+    if res.path is None and part and os.path.exists(part):
+        os.remove(part)  # interrupted stream
+    if cache.recording and res.path:
+        with open(res.path, "rb") as f:
+            cache.put(f"GET {url}", url, res.status, {"content-type": res.content_type, "etag": res.etag,
+                                                      "last-modified": res.last_modified}, f.read())
+    res.seconds = time.perf_counter() - t0
+    return res
+
+
+def _replay_to_file(cache, url: str, path_for: Callable[[str], str]) -> DownloadResult:
+    t0 = time.perf_counter()
+    hit = cache.get(f"GET {url}")
+    if hit is None:
+        return DownloadResult(url, error="not recorded (replay mode)", attempts=1)
+    res = DownloadResult(url, status=hit.status, content_type=hit.content_type, attempts=1,
+                         etag=hit.headers.get("etag", ""), last_modified=hit.headers.get("last-modified", ""))
+    if hit.status != 200:
+        res.error = f"HTTP {hit.status}"
+        return res
+    final = path_for(ext_for(res.content_type, url))
+    with open(final + ".part", "wb") as f:
+        f.write(hit.body)
+    os.replace(final + ".part", final)
+    res.path, res.nbytes, res.sha256 = final, len(hit.body), hashlib.sha256(hit.body).hexdigest()
+    res.seconds = time.perf_counter() - t0
+    return res
+
+
+def download_many(urls: Sequence[str], dest_dir: str, name: Callable[[int, str], str],
+                  workers: int = 8, per_host: int = 4, retries: int = 2, backoff: float = 0.5,
+                  timeout=(5, 20), max_bytes: Optional[int] = None, headers: Optional[dict] = None,
+                  session: Optional[requests.Session] = None, store=None) -> List[DownloadResult]:
+    """Download URLs concurrently over one pooled session; results are in input order.
+
+    - name(i, ext) -> file name inside dest_dir (i starts at 1)
+    - per_host bounds simultaneous requests to one CDN host; workers bounds the total
+    - store: media_store.MediaStore; files are revalidated/deduplicated there and
+      hard-linked into dest_dir
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    own = session is None
+    session = session or make_session(pool_size=max(workers, per_host), headers=headers)
+    locks: Dict[str, threading.BoundedSemaphore] = {}
+    guard = threading.Lock()
+
+    def host_lock(url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with guard:
+            if host not in locks:
+                locks[host] = threading.BoundedSemaphore(per_host)
+            return locks[host]
+
+    def one(item):
+        i, url = item
+        if not url or not url.startswith(("http://", "https://")):
+            return DownloadResult(url or "", error="not an http(s) URL")
+        dest = lambda ext: os.path.join(dest_dir, name(i, ext))
+        with host_lock(url):
+            if store is not None:
+                return store.fetch(session, url, dest, timeout=timeout, retries=retries,
+                                   backoff=backoff, max_bytes=max_bytes)
+            return fetch_to_file(session, url, dest, timeout=timeout, retries=retries,
+                                 backoff=backoff, max_bytes=max_bytes)
+
+    try:
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls)))) as ex:
+            return list(ex.map(one, enumerate(urls, 1)))
+    finally:
+        if own:
+            session.close()
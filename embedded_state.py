@@ -0,0 +1,213 @@
+import re
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Inline-script assignments that carry the page state on AliExpress-like sites
+STATE_MARKERS = ("window.runParams", "__INITIAL_STATE__", "_init_data_")
+
+_RE_IDENT = re.compile(r"[A-Za-z_$][A-Za-z0-9_$]*")
+_BARE_WORDS = {"undefined": "null", "NaN": "null", "Infinity": "null"}
+_OPENERS = {"{": "}", "[": "]"}
+_RE_STRUCT = re.compile(r"[\"'`{}\[\]]")
+_RE_STRING_END = {q: re.compile(r"[\\" + q + "]") for q in "\"'`"}
+
+
+def balanced_span(text: str, start: int) -> Optional[Tuple[int, int]]:
+    """Return (start, end) of the {...} / [...] literal opening at `start`.
+
+    Single forward pass that jumps between structural characters with a regex:
+    quotes ("..", '..', `..`) and escapes are tracked so braces inside strings
+    do not count. Returns None when the literal never closes.
+    """
+    if start >= len(text) or text[start] not in _OPENERS:
+        return None
+    stack = [_OPENERS[text[start]]]
+    pos = start + 1
+    while True:
+        m = _RE_STRUCT.search(text, pos)
+        if not m:
+            return None
+        ch = m.group(0)
+        pos = m.end()
+        if ch in "\"'`":
+            # skip to the matching unescaped quote
+            close = _RE_STRING_END[ch]
+            while True:
+                q = close.search(text, pos)
+                if not q:
+                    return None
+                pos = q.end()
+                if q.group(0) == ch:
+                    break
+                pos += 1  # backslash: skip the escaped char
+        elif ch in _OPENERS:
+            stack.append(_OPENERS[ch])
+        else:
+            if ch != stack[-1]:
+                return None
+            stack.pop()
+            if not stack:
+                return start, pos
+
+
+def _normalize_js(txt: str) -> str:
+    """Turn a JS object literal into JSON in one pass.
+
+    - single/back-quoted strings -> double-quoted
+    - bare keys quoted; undefined/NaN/Infinity -> null
+    - // and /* */ comments and trailing commas dropped
+    """
+    out: List[str] = []
+    i = 0
+    n = len(txt)
+    while i < n:
+        ch = txt[i]
+        if ch == '"':
+            j = i + 1
+            while j < n and txt[j] != '"':
+                j += 2 if txt[j] == "\\" else 1
+            out.append(txt[i:j + 1])
+            i = j + 1
+        elif ch in "'`":
+            j = i + 1
+            buf = []
+            while j < n and txt[j] != ch:
+                c = txt[j]
+                if c == "\\" and j + 1 < n:
+                    nxt = txt[j + 1]
+                    buf.append(nxt if nxt in "'`" else c + nxt)
+                    j += 2
+                    continue
+                buf.append('\\"' if c == '"' else c)
+                j += 1
+            out.append('"' + "".join(buf) + '"')
+            i = j + 1
+        elif ch == "/" and txt.startswith("//", i):
+            j = txt.find("\n", i)
+            i = n if j < 0 else j
+        elif ch == "/" and txt.startswith("/*", i):
+            j = txt.find("*/", i + 2)
+            i = n if j < 0 else j + 2
+        elif ch in "}]":
+            # drop a trailing comma (possibly followed by whitespace/comments)
+            k = len(out) - 1
+            while k >= 0 and out[k].isspace():
+                k -= 1
+            if k >= 0 and out[k] == ",":
+                del out[k]
+            out.append(ch)
+            i += 1
+        elif ch == "!" and i + 1 < n and txt[i + 1] in "01":
+            out.append("true" if txt[i + 1] == "0" else "false")  # minified booleans
+            i += 2
+        else:
+            m = _RE_IDENT.match(txt, i) if (ch.isalpha() or ch in "_$") else None
+            if not m:
+                out.append(ch)
+                i += 1
+                continue
+            word = m.group(0)
+            j = m.end()
+            k = j
+            while k < n and txt[k] in " \t\r\n":
+                k += 1
+            if k < n and txt[k] == ":":
+                out.append(f'"{word}"')
+            elif word in _BARE_WORDS:
+                if out and out[-1] == "-":
+                    out.pop()  # -Infinity
+                out.append(_BARE_WORDS[word])
+            else:
+                out.append(word)
+            i = j
+    return "".join(out)
+
+
+def loads_tolerant(txt: str) -> Optional[Any]:
+    """json.loads, then retry after normalizing JS-literal syntax. None if both fail."""
+    try:
+        return json.loads(txt)
+    except Exception:
+        pass
+    try:
+        return json.loads(_normalize_js(txt), strict=False)
+    except Exception:
+        return None
+
+
+def find_state_blobs(html: str, markers: Iterable[str] = STATE_MARKERS) -> Dict[str, Any]:
+    """Locate `<marker> = {...}` (or `<marker>: {...}`) assignments and parse their objects.
+
+    Uses str.find + brace balancing, so cost is linear in the page size.
+    The first occurrence of each marker that parses wins.
+    """
+    found: Dict[str, Any] = {}
+    for marker in markers:
+        pos = html.find(marker)
+        while pos >= 0 and marker not in found:
+            i = pos + len(marker)
+            # skip closing quote/bracket of forms like window["__INITIAL_STATE__"]
+            while i < len(html) and html[i] in "\"'] \t\r\n":
+                i += 1
+            if i < len(html) and html[i] in "=:":
+                i += 1
+                while i < len(html) and html[i] in " \t\r\n":
+                    i += 1
+                # JSON.parse("...") wrappers carry a JSON string literal
+                if html.startswith("JSON.parse(", i):
+                    q = i + len("JSON.parse(")
+                    if q < len(html) and html[q] in "\"'":
+                        end = q + 1
+                        while end < len(html) and html[end] != html[q]:
+                            end += 2 if html[end] == "\\" else 1
+                        inner = loads_tolerant(html[q:end + 1])
+                        if isinstance(inner, str):
+                            data = loads_tolerant(inner)
+                            if data is not None:
+                                found[marker] = data
+                                break
+                span = balanced_span(html, i)
+                if span:
+                    data = loads_tolerant(html[span[0]:span[1]])
+                    if data is not None:
+                        found[marker] = data
+                        break
+            pos = html.find(marker, pos + len(marker))
+    return found
+
+
+def find_key(obj: Any, names: Iterable[str], max_nodes: int = 200000) -> Optional[Any]:
+    """Breadth-first search for the first non-empty value under any of `names`."""
+    names = set(names)
+    queue = [obj]
+    seen = 0
+    while queue and seen < max_nodes:
+        nxt = []
+        for node in queue:
+            seen += 1
+            if isinstance(node, dict):
+                for k, v in node.items():
+                    if k in names and v not in (None, "", [], {}):
+                        return v
+                    if isinstance(v, (dict, list)):
+                        nxt.append(v)
+            elif isinstance(node, list):
+                nxt.extend(v for v in node if isinstance(v, (dict, list)))
+        queue = nxt
+    return None
+
+
+def json_ld_products(blocks):
+    """Yield Product objects from JSON-LD script bodies (strings or bs4 tags)."""
+    for tag in blocks:
+        body = tag if isinstance(tag, str) or tag is None else tag.string
+        try:
+            data = json.loads(body or "{}")
+        except Exception:
+            continue
+        if isinstance(data, list):
+            for item in data:
+                if isinstance(item, dict) and item.get("@type") == "Product":
+                    yield item
+        elif isinstance(data, dict) and data.get("@type") == "Product":
+            yield data
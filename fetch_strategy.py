@@ -0,0 +1,186 @@
+import os
+import time
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+from product_record import ProductRecord
+
+DEFAULT_PATH = os.path.join(os.getcwd(), ".fetch_stats.sqlite")
+# Cheapest first; the browser is only used when plain HTTP does not yield product data
+STRATEGIES = ("requests", "playwright")
+MIN_IMAGES = 3
+# Older outcomes fade (sites change their bot protection); counts are decayed per record
+DECAY = 0.9
+# A strategy with at least this many (decayed) attempts and a lower success rate is tried last
+MIN_SAMPLES = 3.0
+ESCALATE_BELOW = 0.5
+
+
+def domain_of(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    for p in ("www.", "m."):
+        if host.startswith(p):
+            return host[len(p):]
+    return host
+
+
+def missing_fields(rec: Optional[ProductRecord], min_images: int = MIN_IMAGES) -> List[str]:
+    """What a fetched page lacks to count as a product page (title, price, min_images images)."""
+    if rec is None:
+        return ["title", "price", "images"]
+    miss = []
+    if not rec.title:
+        miss.append("title")
+    if rec.price is None:
+        miss.append("price")
+    if len(rec.images) < min_images:
+        miss.append("images")
+    return miss
+
+
+class FetchStats:
+    """Per-domain success rate and latency of each fetch strategy (SQLite, survives restarts)."""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        with self._conn() as c:
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute(
+                "CREATE TABLE IF NOT EXISTS fetch_stats ("
+                " domain TEXT NOT NULL, strategy TEXT NOT NULL, attempts REAL NOT NULL,"
+                " successes REAL NOT NULL, avg_seconds REAL NOT NULL, updated REAL NOT NULL,"
+                " PRIMARY KEY (domain, strategy))"
+            )
+
+    @contextmanager
+    def _conn(self):
+        c = sqlite3.connect(self.path, timeout=10)
+        try:
+            with c:
+                yield c
+        finally:
+            c.close()
+
+    def record(self, domain: str, strategy: str, ok: bool, seconds: float) -> None:
+        with self._conn() as c:
+            row = c.execute("SELECT attempts, successes, avg_seconds FROM fetch_stats WHERE domain=? AND strategy=?",
+                            (domain, strategy)).fetchone()
+            att, succ, avg = row or (0.0, 0.0, seconds)
+            att, succ = att * DECAY + 1, succ * DECAY + (1 if ok else 0)
+            avg = avg + (seconds - avg) * 0.3
+            c.execute("INSERT OR REPLACE INTO fetch_stats VALUES (?,?,?,?,?,?)",
+                      (domain, strategy, att, succ, avg, time.time()))
+
+    def get(self, domain: str) -> Dict[str, tuple]:
+        """strategy -> (attempts, successes, avg seconds)"""
+        with self._conn() as c:
+            rows = c.execute("SELECT strategy, attempts, successes, avg_seconds FROM fetch_stats WHERE domain=?",
+                             (domain,)).fetchall()
+        return {r[0]: tuple(r[1:]) for r in rows}
+
+    def order(self, domain: str, available: Sequence[str], prefer: str = "requests") -> List[str]:
+        """Strategies to try for the domain.
+
+        - no history: the adapter's preference, then the rest cheapest first
+        - a strategy that proved unreliable here (success < ESCALATE_BELOW) moves to the end,
+          so a site that always needs the browser goes straight to it
+        - requests that proved reliable goes first even if the adapter prefers the browser
+        """
+        hist = self.get(domain)
+        base = [s for s in [prefer, *STRATEGIES] if s in available]
+        base = list(dict.fromkeys(base + [s for s in available if s not in base]))
+
+        def rate(s):
+            att, succ, _avg = hist.get(s, (0.0, 0.0, 0.0))
+            return (succ / att) if att else None
+
+        def proven(s, good):
+            att = hist.get(s, (0.0,))[0]
+            r = rate(s)
+            return att >= MIN_SAMPLES and r is not None and ((r >= ESCALATE_BELOW) == good)
+
+        if "requests" in base and proven("requests", True):
+            base.remove("requests")
+            base.insert(0, "requests")
+        poor = sorted([s for s in base if proven(s, False)], key=lambda s: -(rate(s) or 0))
+        return [s for s in base if s not in poor] + poor
+
+    def rows(self) -> List[tuple]:
+        """(domain, strategy, attempts, success rate, avg seconds) for display."""
+        with self._conn() as c:
+            rows = c.execute("SELECT domain, strategy, attempts, successes, avg_seconds FROM fetch_stats"
+                             " ORDER BY domain, strategy").fetchall()
+        return [(d, s, a, (sc / a if a else 0.0), avg) for d, s, a, sc, avg in rows]
+
+
+@dataclass
+class FetchAttempt:
+    strategy: str
+    ok: bool
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    missing: List[str] = field(default_factory=list)
+    error: str = ""
+
+
+@dataclass
+class FetchOutcome:
+    html: Optional[str] = None
+    record: Optional[ProductRecord] = None
+    strategy: str = ""
+    attempts: List[FetchAttempt] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return any(a.ok for a in self.attempts)
+
+    def summary(self) -> str:
+        parts = []
+        for a in self.attempts:
+            state = "ok" if a.ok else (a.error or "missing " + "/".join(a.missing))
+            parts.append(f"{a.strategy} {a.fetch_seconds:.1f}s ({state})")
+        return " → ".join(parts)
+
+
+def fetch_adaptive(url: str, fetchers: Dict[str, Callable[[str], str]], parse: Callable[[str], ProductRecord],
+                   prefer: str = "requests", min_images: int = MIN_IMAGES,
+                   stats: Optional[FetchStats] = None) -> FetchOutcome:
+    """Try strategies in the learned order until a page with product data comes back.
+
+    fetchers: strategy -> fn(url) -> html; parse: fn(html) -> ProductRecord.
+    Each attempt is recorded in stats. When no strategy yields a complete page, the most
+    complete one is returned (outcome.ok is False).
+    """
+    domain = domain_of(url)
+    order = stats.order(domain, list(fetchers), prefer) if stats is not None else list(fetchers)
+    out = FetchOutcome()
+    best_missing = None
+    for name in order:
+        att = FetchAttempt(name, False)
+        out.attempts.append(att)
+        t = time.perf_counter()
+        try:
+            html = fetchers[name](url)
+        except Exception as e:
+            att.fetch_seconds = time.perf_counter() - t
+            att.error = f"{type(e).__name__}: {e}"
+            if stats is not None:
+                stats.record(domain, name, False, att.fetch_seconds)
+            continue
+        att.fetch_seconds = time.perf_counter() - t
+        t = time.perf_counter()
+        rec = parse(html) if html else None
+        att.parse_seconds = time.perf_counter() - t
+        att.missing = missing_fields(rec, min_images)
+        att.ok = not att.missing
+        if stats is not None:
+            stats.record(domain, name, att.ok, att.fetch_seconds)
+        if best_missing is None or len(att.missing) < best_missing:
+            best_missing = len(att.missing)
+            out.html, out.record, out.strategy = html, rec, name
+        if att.ok:
+            break
+    return out
@@ -0,0 +1,101 @@
+from typing import List, Optional
+from bs4 import BeautifulSoup
+
+# lxml is already required by the BeautifulSoup "lxml" builder; the raw tree is the fast path
+try:
+    import lxml.html
+    HAS_LXML = True
+except Exception:
+    HAS_LXML = False
+
+# Same strings BeautifulSoup.get_text() skips (script/style/template bodies)
+_SKIP_TEXT_TAGS = {"script", "style", "template"}
+
+
+def has_class(name: str) -> str:
+    """XPath predicate equivalent to the CSS `.name` class selector."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def node_text(el, sep: str = " ") -> str:
+    """lxml counterpart of bs4 `get_text(sep, strip=True)`.
+
+    - Strings are stripped and empty ones dropped.
+    - Comments and script/style/template bodies are skipped (tails are kept).
+    """
+    parts: List[str] = []
+
+    def add(s):
+        s = (s or "").strip()
+        if s:
+            parts.append(s)
+
+    def own_text(node):
+        if isinstance(node.tag, str) and node.tag.lower() not in _SKIP_TEXT_TAGS:
+            add(node.text)
+
+    # explicit stack: deep product pages overflow Python recursion; comment tails must survive
+    own_text(el)
+    stack = [(el, iter(el))]
+    while stack:
+        node, it = stack[-1]
+        child = next(it, None)
+        if child is None:
+            stack.pop()
+            if node is not el:
+                add(node.tail)
+            continue
+        own_text(child)
+        stack.append((child, iter(child)))
+    return sep.join(parts)
+
+
+class ParseContext:
+    """One product page, parsed once and shared by every extractor.
+
+    - soup: BeautifulSoup tree (lxml), built on first access.
+    - tree: raw lxml.html document for XPath fast paths (None if lxml is missing or parsing fails).
+    - text: page text (get_text("\\n", strip=True)); taken from the lxml tree when no soup was built.
+    """
+
+    def __init__(self, html: str, base_url: str = ""):
+        self.html = html or ""
+        self.base_url = base_url or ""
+        self._soup: Optional[BeautifulSoup] = None
+        self._text: Optional[str] = None
+        self._tree = None
+        self._tree_failed = False
+
+    @classmethod
+    def ensure(cls, html: str, ctx: Optional["ParseContext"] = None, base_url: str = "") -> "ParseContext":
+        """Reuse `ctx` when given, otherwise wrap `html` in a new context."""
+        if ctx is not None:
+            return ctx
+        return cls(html, base_url=base_url)
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.html, "lxml")
+        return self._soup
+
+    @property
+    def tree(self):
+        if self._tree is None and not self._tree_failed:
+            if not HAS_LXML or not self.html.strip():
+                self._tree_failed = True
+            else:
+                try:
+                    self._tree = lxml.html.document_fromstring(self.html)
+                except Exception:
+                    self._tree_failed = True
+        return self._tree
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            if self._soup is None and self.tree is not None:
+                self._text = node_text(self.tree, "\n")
+            else:
+                self._text = self.soup.get_text("\n", strip=True)
+        return self._text
@@ -0,0 +1,239 @@
+import re
+import time
+import codecs
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Callable, Iterable, List, Optional
+
+import requests
+
+from embedded_state import json_ld_products
+from http_cache import cached_get, get_cache
+from price import META_AMOUNT, price_from_offers, to_number
+
+CHUNK_SIZE = 16 * 1024
+# Read at most this much when the metadata never shows up (the rest is script/JSON state)
+MAX_BYTES = 8 * 1024 * 1024
+# Fields the head of a product page usually carries (og/meta tags, JSON-LD Product)
+NEED = ("title", "price", "images")
+MIN_IMAGES = 3
+TITLE_KEYS = ("og:title", "twitter:title")
+TRUNCATED_HEADER = "x-stream-truncated"
+# http_cache key for a body read only in part; "GET <url>" always holds a complete body
+HEAD_KEY = "head {}"
+_PRICE_KEYS = {v for _attr, v in META_AMOUNT}
+_RE_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w-]+)""", re.I)
+# Without a charset header, chunks are held back (not decoded) until <meta charset>, </head>
+# or this many bytes have arrived
+SNIFF_BYTES = 64 * 1024
+
+
+class MetaScanner(HTMLParser):
+    """Incremental tokenizer that notes product metadata as chunks arrive (feed() per chunk)."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title: Optional[str] = None
+        self.price: Optional[float] = None
+        self.description: Optional[str] = None
+        self.images: List[str] = []
+        self.json_ld = 0
+        self._ld: Optional[List[str]] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta":
+            a = dict(attrs)
+            key = (a.get("property") or a.get("name") or a.get("itemprop") or "").lower()
+            content = (a.get("content") or "").strip()
+            if not content:
+                return
+            if key in TITLE_KEYS and not self.title:
+                self.title = content
+            elif key == "og:image":
+                self._add_images([content])
+            elif key in _PRICE_KEYS and self.price is None:
+                self.price = to_number(content)
+            elif key in ("og:description", "description") and not self.description:
+                self.description = content
+        elif tag == "script" and (dict(attrs).get("type") or "").lower() == "application/ld+json":
+            self._ld = []
+
+    def handle_data(self, data):
+        if self._ld is not None:
+            self._ld.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._ld is not None:
+            body, self._ld = "".join(self._ld), None
+            self.json_ld += 1
+            for prod in json_ld_products([body]):
+                self.title = self.title or (str(prod.get("name") or "").strip() or None)
+                if self.price is None:
+                    p = price_from_offers(prod.get("offers"))
+                    self.price = p.amount if p else None
+                imgs = prod.get("image")
+                self._add_images([imgs] if isinstance(imgs, str) else [i for i in imgs or [] if isinstance(i, str)])
+
+    def _add_images(self, urls: Iterable[str]) -> None:
+        for u in urls:
+            if u and u not in self.images:
+                self.images.append(u)
+
+    def found(self, min_images: int = MIN_IMAGES) -> List[str]:
+        out = []
+        if self.title:
+            out.append("title")
+        if self.price is not None:
+            out.append("price")
+        if len(self.images) >= min_images:
+            out.append("images")
+        if self.description:
+            out.append("description")
+        return out
+
+    def has(self, need: Iterable[str] = NEED, min_images: int = MIN_IMAGES) -> bool:
+        got = self.found(min_images)
+        return all(n in got for n in need)
+
+
+@dataclass
+class StreamResult:
+    url: str
+    html: str = ""
+    truncated: bool = False  # reading stopped once the metadata was found
+    bytes_read: int = 0  # transferred (compressed) bytes
+    content_length: Optional[int] = None  # as announced by the server (None: chunked)
+    seconds: float = 0.0
+    found: List[str] = field(default_factory=list)
+    refetched: bool = False  # the truncated page did not parse and the full body was read
+
+    def summary(self) -> str:
+        total = f"/{self.content_length / 1024:.0f}" if self.content_length else ""
+        state = "stopped early" if self.truncated else ("full (refetched)" if self.refetched else "full")
+        return f"{self.bytes_read / 1024:.0f}{total} KB in {self.seconds:.2f}s, {state} [{', '.join(self.found) or '-'}]"
+
+
+def _encoding(r: requests.Response, head: bytes, final: bool = True) -> Optional[str]:
+    """Charset from the header or a <meta> in `head`; None while more bytes could still
+    bring the meta tag (not final), else a utf-8/chardet guess."""
+    ct = r.headers.get("content-type", "").lower()
+    if "charset=" in ct:
+        return ct.split("charset=", 1)[1].split(";")[0].strip()
+    m = _RE_META_CHARSET.search(head, 0, SNIFF_BYTES)
+    if m:
+        return m.group(1).decode("ascii").lower()
+    if not final and len(head) < SNIFF_BYTES and b"</head" not in head.lower():
+        return None
+    try:
+        head[:-4].decode("utf-8")  # a multi-byte character may be cut at the chunk end
+        return "utf-8"
+    except UnicodeDecodeError:
+        return requests.compat.chardet.detect(head).get("encoding") or "utf-8"
+
+
+def _wire_bytes(r: requests.Response, fallback: int) -> int:
+    try:
+        return int(r.raw.tell())
+    except Exception:
+        return fallback
+
+
+def stream_html(url: str, session: Optional[requests.Session] = None, need: Iterable[str] = NEED,
+                min_images: int = MIN_IMAGES, chunk_size: int = CHUNK_SIZE, max_bytes: int = MAX_BYTES,
+                **kw) -> StreamResult:
+    """GET a page chunk by chunk and stop reading once `need` is present in what arrived.
+
+    The tokenizer sees every chunk as it arrives, so a page with og/JSON-LD metadata near
+    the top is cut after a few chunks; otherwise (or with an empty `need`) the whole body,
+    up to max_bytes, is read. Without a charset in the Content-Type header, decoding starts
+    once <meta charset>, </head> or SNIFF_BYTES has arrived.
+    http_cache: a complete body is recorded under "GET <url>" (shared with cached_get); a body
+    cut short is recorded under "head <url>" so it is never replayed as the full page. Replay
+    serves the head entry when `need` is set and one exists, else the full entry.
+    """
+    res = StreamResult(url)
+    t0 = time.perf_counter()
+    cache = get_cache()
+    need = tuple(need)
+    if cache.replaying:
+        hit = (cache.get(HEAD_KEY.format(url)) if need else None) or cached_get(url, session, **kw)
+        hit.raise_for_status()
+        try:  # same charset sniffing as a live read (CachedResponse.text only knows the header)
+            html = hit.body.decode(_encoding(hit, hit.body[:SNIFF_BYTES]), "replace")
+        except LookupError:
+            html = hit.text
+        scan = MetaScanner()
+        scan.feed(html)
+        res.html, res.bytes_read, res.found = html, len(hit.body), scan.found(min_images)
+        res.truncated = hit.headers.get(TRUNCATED_HEADER) == "1"
+        res.seconds = time.perf_counter() - t0
+        return res
+    scan = MetaScanner()
+    parts, raw, cut = [], [], False
+
+    def start_decoder(enc):
+        try:
+            return codecs.getincrementaldecoder(enc)("replace")
+        except LookupError:
+            return codecs.getincrementaldecoder("utf-8")("replace")
+
+    with (session or requests).get(url, stream=True, **kw) as r:
+        r.raise_for_status()
+        cl = r.headers.get("content-length")
+        res.content_length = int(cl) if cl and cl.isdigit() else None
+        decoder = None
+        for chunk in r.iter_content(chunk_size=chunk_size):
+            if not chunk:
+                continue
+            raw.append(chunk)
+            res.bytes_read = _wire_bytes(r, res.bytes_read + len(chunk))
+            if decoder is None:
+                enc = _encoding(r, b"".join(raw), final=res.bytes_read >= max_bytes)
+                if enc is None:
+                    continue  # charset still unknown: keep the bytes, decode them all at once
+                decoder = start_decoder(enc)
+                chunk = b"".join(raw)
+            text = decoder.decode(chunk)
+            parts.append(text)
+            scan.feed(text)
+            if need and scan.has(need, min_images):
+                res.truncated = res.content_length is None or res.bytes_read < res.content_length
+                cut = res.truncated
+                break
+            if res.bytes_read >= max_bytes:
+                cut = True
+                break
+        if decoder is None and raw:  # short page without charset information
+            decoder = start_decoder(_encoding(r, b"".join(raw)))
+            text = decoder.decode(b"".join(raw))
+            parts.append(text)
+            scan.feed(text)
+        if decoder is not None and not res.truncated:
+            parts.append(decoder.decode(b"", final=True))
+        headers = dict(r.headers)
+        status = r.status_code
+    res.html = "".join(parts)
+    res.found = scan.found(min_images)
+    res.seconds = time.perf_counter() - t0
+    if cache.recording:
+        if cut:
+            headers[TRUNCATED_HEADER] = "1" if res.truncated else "0"
+        cache.put(HEAD_KEY.format(url) if cut else f"GET {url}", url, status, headers, b"".join(raw))
+    return res
+
+
+def fetch_html(url: str, session: Optional[requests.Session] = None,
+               usable: Optional[Callable[[str], bool]] = None, need: Iterable[str] = NEED,
+               min_images: int = MIN_IMAGES, **kw) -> StreamResult:
+    """stream_html, falling back to the full body when the cut-off page is not usable.
+
+    usable: fn(html) -> bool run on a truncated page (e.g. "the parser finds title, price and
+    enough images"); a False answer re-requests the page and reads all of it.
+    """
+    res = stream_html(url, session, need=need, min_images=min_images, **kw)
+    if res.truncated and usable is not None and not usable(res.html):
+        full = stream_html(url, session, need=(), min_images=min_images, **kw)
+        full.seconds += res.seconds
+        full.refetched = True
+        return full
+    return res
@@ -0,0 +1,256 @@
+import os
+import sys
+import json
+import time
+import base64
+import hashlib
+import sqlite3
+import argparse
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+DEFAULT_ROOT = os.path.join(os.getcwd(), ".http_cache")
+MODES = ("off", "record", "replay")
+# Default mode for every process (CLI scripts); the UI can switch it with set_mode()
+ENV_MODE = "HTTP_CACHE_MODE"
+
+
+class ReplayMiss(Exception):
+    """Replay mode and nothing was recorded for this request."""
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    status: int = 200
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    recorded: float = 0.0
+
+    @property
+    def status_code(self) -> int:
+        return self.status
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("content-type", "")
+
+    @property
+    def text(self) -> str:
+        ct = self.content_type.lower()
+        enc = ct.split("charset=", 1)[1].split(";")[0].strip() if "charset=" in ct else "utf-8"
+        try:
+            return self.body.decode(enc, "replace")
+        except LookupError:
+            return self.body.decode("utf-8", "replace")
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise requests.HTTPError(f"{self.status} (recorded) for url: {self.url}")
+
+
+class HttpCache:
+    """Recorded responses for offline development and deterministic benchmarks.
+
+    - record: fetchers store every response (bodies content-addressed under bodies/)
+    - replay: fetchers serve only recorded responses and never touch the network
+      (a missing entry raises ReplayMiss)
+    - keys: "GET <url>" for complete HTTP bodies, "head <url>" for pages html_stream read only
+      in part, "probe <url>" for image-size Range probes,
+      "visit <steps> <mobile|desktop> <url>" for Playwright page visits (JSON results)
+    - export_har(): the recorded HTTP entries as a HAR 1.2 file
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT, mode: str = "off"):
+        if mode not in MODES:
+            raise ValueError(f"unknown cache mode: {mode}")
+        self.root = root
+        self.mode = mode
+        self._ready = False  # the directory/index is created on first use (mode "off" never touches disk)
+
+    def _setup(self) -> None:
+        os.makedirs(os.path.join(self.root, "bodies"), exist_ok=True)
+        c = sqlite3.connect(os.path.join(self.root, "index.sqlite"), timeout=10)
+        try:
+            with c:
+                c.execute("PRAGMA journal_mode=WAL")
+                c.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    " key TEXT PRIMARY KEY, url TEXT NOT NULL, status INTEGER NOT NULL,"
+                    " headers TEXT NOT NULL, sha TEXT NOT NULL, size INTEGER NOT NULL, recorded REAL NOT NULL)"
+                )
+        finally:
+            c.close()
+        self._ready = True
+
+    @contextmanager
+    def _conn(self):
+        if not self._ready:
+            self._setup()
+        c = sqlite3.connect(os.path.join(self.root, "index.sqlite"), timeout=10)
+        try:
+            with c:
+                yield c
+        finally:
+            c.close()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _body_path(self, sha: str) -> str:
+        return os.path.join(self.root, "bodies", sha[:2], sha)
+
+    def put(self, key: str, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        sha = hashlib.sha256(body).hexdigest()
+        path = self._body_path(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.part"
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        hdrs = {k.lower(): v for k, v in (headers or {}).items()
+                if k.lower() not in ("content-encoding", "transfer-encoding", "set-cookie")}
+        with self._conn() as c:
+            c.execute("INSERT OR REPLACE INTO responses VALUES (?,?,?,?,?,?,?)",
+                      (key, url, int(status), json.dumps(hdrs), sha, len(body), time.time()))
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._conn() as c:
+            row = c.execute("SELECT url, status, headers, sha, recorded FROM responses WHERE key=?",
+                            (key,)).fetchone()
+        if not row:
+            return None
+        try:
+            with open(self._body_path(row[3]), "rb") as f:
+                body = f.read()
+        except OSError:
+            return None
+        return CachedResponse(row[0], row[1], json.loads(row[2]), body, row[4])
+
+    def put_json(self, key: str, url: str, data) -> None:
+        self.put(key, url, 200, {"content-type": "application/json"},
+                 json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+    def get_json(self, key: str):
+        hit = self.get(key)
+        return json.loads(hit.body) if hit is not None else None
+
+    def entries(self) -> List[Tuple[str, int, int, float]]:
+        """(key, status, size, recorded) of everything recorded."""
+        with self._conn() as c:
+            return c.execute("SELECT key, status, size, recorded FROM responses ORDER BY recorded").fetchall()
+
+    def clear(self) -> None:
+        with self._conn() as c:
+            c.execute("DELETE FROM responses")
+
+    def export_har(self, path: str) -> int:
+        """Write recorded GET responses as HAR 1.2 (bodies base64); returns the entry count."""
+        out = []
+        for key, _status, _size, _rec in self.entries():
+            if not key.startswith("GET "):
+                continue
+            r = self.get(key)
+            if r is None:
+                continue
+            out.append({
+                "startedDateTime": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(r.recorded)),
+                "time": 0,
+                "request": {"method": "GET", "url": r.url, "httpVersion": "HTTP/1.1", "headers": [],
+                            "queryString": [], "cookies": [], "headersSize": -1, "bodySize": 0},
+                "response": {"status": r.status, "statusText": "", "httpVersion": "HTTP/1.1", "cookies": [],
+                             "headers": [{"name": k, "value": v} for k, v in r.headers.items()],
+                             "content": {"size": len(r.body), "mimeType": r.content_type,
+                                         "encoding": "base64", "text": base64.b64encode(r.body).decode("ascii")},
+                             "redirectURL": "", "headersSize": -1, "bodySize": len(r.body)},
+                "cache": {}, "timings": {"send": 0, "wait": 0, "receive": 0},
+            })
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"log": {"version": "1.2", "creator": {"name": "http_cache", "version": "1"},
+                               "entries": out}}, f)
+        return len(out)
+
+
+_CACHE: Optional[HttpCache] = None
+_LOCK = threading.Lock()
+
+
+def get_cache() -> HttpCache:
+    """Process-wide cache; the mode starts from $HTTP_CACHE_MODE (default off)."""
+    global _CACHE
+    with _LOCK:
+        if _CACHE is None:
+            mode = os.environ.get(ENV_MODE, "off").strip().lower() or "off"
+            _CACHE = HttpCache(mode=mode if mode in MODES else "off")
+        return _CACHE
+
+
+def set_mode(mode: str) -> HttpCache:
+    cache = get_cache()
+    if mode not in MODES:
+        raise ValueError(f"unknown cache mode: {mode}")
+    cache.mode = mode
+    return cache
+
+
+def cached_get(url: str, session: Optional[requests.Session] = None, **kw):
+    """requests GET through the cache: a live Response (off/record) or a CachedResponse (replay).
+
+    Both have .status_code, .headers, .text and .raise_for_status().
+    """
+    cache = get_cache()
+    key = f"GET {url}"
+    if cache.replaying:
+        hit = cache.get(key)
+        if hit is None:
+            raise ReplayMiss(url)
+        return hit
+    r = (session or requests).get(url, **kw)
+    if cache.recording and not kw.get("stream"):
+        cache.put(key, url, r.status_code, dict(r.headers), r.content)
+    return r
+
+
+def main():
+    ap = argparse.ArgumentParser(description="기록된 HTTP 응답 캐시(.http_cache/) 관리 — 녹화/재생 모드는 HTTP_CACHE_MODE=record|replay")
+    ap.add_argument("command", choices=["list", "har", "html", "clear"],
+                    help="list: 목록, har: HAR 파일로 내보내기, html: HTML 응답을 폴더로 내보내기(벤치마크 입력), clear: 비우기")
+    ap.add_argument("--out", default="", help="har/html 출력 경로")
+    args = ap.parse_args()
+    cache = HttpCache()
+    if args.command == "list":
+        for key, status, size, rec in cache.entries():
+            print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(rec))}  {status}  {size:>9}  {key}")
+    elif args.command == "har":
+        n = cache.export_har(args.out or "recorded.har")
+        print(f"[info] {n} entries -> {args.out or 'recorded.har'}")
+    elif args.command == "html":
+        out = args.out or "recorded_html"
+        os.makedirs(out, exist_ok=True)
+        n = 0
+        for key, _status, _size, _rec in cache.entries():
+            r = cache.get(key) if key.startswith("GET ") else None
+            if r is not None and "html" in r.content_type:
+                name = hashlib.sha1(r.url.encode("utf-8")).hexdigest()[:12] + ".html"
+                with open(os.path.join(out, name), "w", encoding="utf-8") as f:
+                    f.write(f"<!-- {r.url} -->\n" + r.text)
+                n += 1
+        print(f"[info] {n} HTML pages -> {out}")
+    else:
+        cache.clear()
+        print("[info] cache cleared")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+DEFAULT_PATH = os.path.join(os.getcwd(), ".image_hashes.sqlite")
+DEFAULT_KIND = "dhash"
+# Max differing bits (of 64) for two images to count as the same picture
+DEFAULT_THRESHOLD = {"dhash": 10, "phash": 12}
+# Rows kept in the shared index; older files fall out of cross-run matching
+MAX_ENTRIES = 20000
+
+_DCT_N = 32
+# Orthonormal DCT-II basis, built once; pHash = top-left 8x8 of C @ A @ C.T
+_k = np.arange(_DCT_N)
+_DCT = np.sqrt(2.0 / _DCT_N) * np.cos(np.pi * (2 * _k[None, :] + 1) * _k[:, None] / (2 * _DCT_N))
+_DCT[0] /= np.sqrt(2.0)
+_BITS = 1 << np.arange(63, -1, -1, dtype=np.uint64)
+
+
+def _gray(path: str, size: Tuple[int, int]) -> Tuple[np.ndarray, int, int]:
+    """Downscaled grayscale pixels plus the original (width, height).
+
+    JPEGs are decoded at reduced scale via draft(), so large photos stay cheap to hash.
+    """
+    with Image.open(path) as im:
+        w, h = im.size
+        im.draft("L", (size[0] * 4, size[1] * 4))
+        g = im.convert("L").resize(size, Image.BILINEAR)
+        return np.asarray(g, dtype=np.float32), w, h
+
+
+def _pack(bits: np.ndarray) -> int:
+    return int(np.bitwise_or.reduce(_BITS[bits.ravel()]))
+
+
+def dhash(px: np.ndarray) -> int:
+    """64-bit difference hash from a 8x9 grayscale array (left/right gradients)."""
+    return _pack(px[:, 1:] > px[:, :-1])
+
+
+def phash(px: np.ndarray) -> int:
+    """64-bit DCT hash from a 32x32 grayscale array (low frequencies vs their median)."""
+    low = (_DCT @ px @ _DCT.T)[:8, :8].ravel()
+    return _pack(low > np.median(low[1:]))
+
+
+def image_hash(path: str, kind: str = DEFAULT_KIND) -> Tuple[int, int, int]:
+    """(hash, width, height) of an image file."""
+    if kind == "phash":
+        px, w, h = _gray(path, (_DCT_N, _DCT_N))
+        return phash(px), w, h
+    px, w, h = _gray(path, (9, 8))
+    return dhash(px), w, h
+
+
+def hamming(hashes: np.ndarray, h: int) -> np.ndarray:
+    """Bit distance from h to every hash in a uint64 array."""
+    x = np.bitwise_xor(hashes, np.uint64(h))
+    return np.unpackbits(x.view(np.uint8)).reshape(-1, 64).sum(axis=1)
+
+
+class ImageHashIndex:
+    """SQLite index path -> (kind, hash, width, height, mtime, product) shared across runs.
+
+    - lookup(path) reuses a stored hash while the file's mtime is unchanged
+    - candidates() returns only the rows a new batch can match (same product or same hash)
+    - the table keeps at most max_entries rows; prune() drops the oldest files
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._conn() as c:
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute(
+                "CREATE TABLE IF NOT EXISTS images ("
+                " path TEXT NOT NULL, kind TEXT NOT NULL, hash TEXT NOT NULL,"
+                " width INTEGER NOT NULL, height INTEGER NOT NULL, mtime REAL NOT NULL,"
+                " product TEXT NOT NULL DEFAULT '',"
+                " PRIMARY KEY (path, kind))"
+            )
+            cols = {r[1] for r in c.execute("PRAGMA table_info(images)")}
+            if "product" not in cols:  # index written before rows carried their product
+                c.execute("ALTER TABLE images ADD COLUMN product TEXT NOT NULL DEFAULT ''")
+            c.execute("CREATE INDEX IF NOT EXISTS images_hash ON images (kind, hash)")
+            c.execute("CREATE INDEX IF NOT EXISTS images_product ON images (kind, product)")
+
+    @contextmanager
+    def _conn(self):
+        c = sqlite3.connect(self.path, timeout=10)
+        try:
+            with c:
+                yield c
+        finally:
+            c.close()
+
+    def lookup(self, path: str, kind: str = DEFAULT_KIND) -> Optional[Tuple[int, int, int]]:
+        key = os.path.abspath(path)
+        with self._conn() as c:
+            row = c.execute("SELECT hash, width, height, mtime FROM images WHERE path=? AND kind=?",
+                            (key, kind)).fetchone()
+        if not row or not os.path.exists(key) or abs(os.path.getmtime(key) - row[3]) > 1e-6:
+            return None
+        return int(row[0], 16), row[1], row[2]
+
+    def put(self, path: str, h: int, width: int, height: int, kind: str = DEFAULT_KIND,
+            product: str = "") -> None:
+        key = os.path.abspath(path)
+        with self._conn() as c:
+            c.execute("INSERT OR REPLACE INTO images (path, kind, hash, width, height, mtime, product)"
+                      " VALUES (?,?,?,?,?,?,?)",
+                      (key, kind, f"{h:016x}", int(width), int(height), os.path.getmtime(key), product or ""))
+
+    def remove(self, paths: Iterable[str]) -> None:
+        with self._conn() as c:
+            c.executemany("DELETE FROM images WHERE path=?", [(os.path.abspath(p),) for p in paths])
+
+    def _live(self, rows) -> List[Tuple[str, int, int, int, str]]:
+        gone = [r[0] for r in rows if not os.path.exists(r[0])]
+        if gone:
+            self.remove(gone)
+        return [(p, int(h, 16), w, ht, prod) for p, h, w, ht, prod in rows if os.path.exists(p)]
+
+    def candidates(self, kind: str = DEFAULT_KIND, product: str = "",
+                   hashes: Iterable[int] = ()) -> List[Tuple[str, int, int, int, str]]:
+        """(path, hash, width, height, product) of existing files from `product` or with one of `hashes`."""
+        keys = sorted({f"{h:016x}" for h in hashes})
+        where, args = [], [kind]
+        if product:
+            where.append("product=?")
+            args.append(product)
+        if keys:
+            where.append(f"hash IN ({','.join('?' * len(keys))})")
+            args.extend(keys)
+        if not where:
+            return []
+        with self._conn() as c:
+            rows = c.execute("SELECT path, hash, width, height, product FROM images"
+                             f" WHERE kind=? AND ({' OR '.join(where)})", args).fetchall()
+        return self._live(rows)
+
+    def entries(self, kind: str = DEFAULT_KIND) -> List[Tuple[str, int, int, int]]:
+        """(path, hash, width, height) of indexed files that still exist; stale rows are dropped."""
+        with self._conn() as c:
+            rows = c.execute("SELECT path, hash, width, height, product FROM images WHERE kind=?",
+                             (kind,)).fetchall()
+        return [r[:4] for r in self._live(rows)]
+
+    def prune(self, max_entries: Optional[int] = None) -> int:
+        """Keep the newest max_entries rows (by file mtime); returns the number dropped."""
+        keep = self.max_entries if max_entries is None else int(max_entries)
+        with self._conn() as c:
+            cur = c.execute("DELETE FROM images WHERE rowid IN"
+                            " (SELECT rowid FROM images ORDER BY mtime DESC LIMIT -1 OFFSET ?)", (keep,))
+            return cur.rowcount
+
+
+def hash_files(paths: Iterable[str], kind: str = DEFAULT_KIND, index: Optional[ImageHashIndex] = None,
+               product: str = "") -> Dict[str, Tuple[int, int, int]]:
+    """path -> (hash, width, height); unreadable files are left out."""
+    out = {}
+    for p in paths:
+        hit = index.lookup(p, kind) if index is not None else None
+        if hit is None:
+            try:
+                hit = image_hash(p, kind)
+            except Exception:
+                continue
+            if index is not None:
+                index.put(p, *hit, kind=kind, product=product)
+        out[p] = hit
+    return out
+
+
+def dedup_images(paths: List[str], index: Optional[ImageHashIndex] = None, kind: str = DEFAULT_KIND,
+                 threshold: Optional[int] = None, remove: bool = True, product: str = "") -> List[str]:
+    """Collapse near-duplicate images (same photo at another size/quality/format).
+
+    - Each cluster is represented by its highest-resolution file.
+    - With an index, files from earlier runs take part too: a new download that matches an
+      equal or larger indexed image is replaced by that file's path. Near matches (within
+      the threshold) only count for files of the same `product` (canonical product URL);
+      files of other products must have the identical hash.
+    - remove=True deletes the dropped files from `paths` (never files from earlier runs).
+    Returns the surviving paths in input order, without repeats; unreadable files are kept.
+    """
+    thr = DEFAULT_THRESHOLD.get(kind, 10) if threshold is None else int(threshold)
+    hashed = hash_files(paths, kind, index, product)
+    batch = {os.path.abspath(p) for p in hashed}
+    reps: List[Tuple[str, int, int, bool]] = []  # (path, hash, pixels, near matches allowed)
+    if index is not None:
+        rows = index.candidates(kind, product, (v[0] for v in hashed.values()))
+        reps = [(p, h, w * ht, bool(product) and prod == product)
+                for p, h, w, ht, prod in rows if p not in batch]
+    # Largest first, so the first member of a cluster is the one kept
+    order = sorted(hashed, key=lambda p: hashed[p][1] * hashed[p][2], reverse=True)
+    target: Dict[str, str] = {}
+    for p in order:
+        h, w, ht = hashed[p]
+        best = None
+        if reps:
+            dist = hamming(np.fromiter((r[1] for r in reps), dtype=np.uint64, count=len(reps)), h)
+            close = [r for r, d in zip(reps, dist) if d == 0 or (r[3] and d <= thr)]
+            if close:
+                best = max(close, key=lambda r: r[2])
+        if best is not None and best[2] >= w * ht:
+            target[p] = best[0]
+        else:
+            target[p] = p
+            reps.append((p, h, w * ht, True))
+
+    out, dropped = [], []
+    for p in paths:
+        q = target.get(p, p)
+        if q != p:
+            dropped.append(p)
+        if q not in out:
+            out.append(q)
+    if remove and dropped:
+        for p in dropped:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+        if index is not None:
+            index.remove(dropped)
+    if index is not None:
+        index.prune()
+    return out
+
+
+def dedup_folder(folder: str, index: Optional[ImageHashIndex] = None, kind: str = DEFAULT_KIND,
+                 threshold: Optional[int] = None) -> Tuple[int, int]:
+    """Deduplicate the images in one folder in place; returns (before, after) counts."""
+    exts = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp")
+    files = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(exts))
+    kept = dedup_images(files, index=index, kind=kind, threshold=threshold)
+    return len(files), len(kept)
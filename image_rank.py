@@ -0,0 +1,180 @@
+import io
+import re
+import math
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
+
+import requests
+
+from http_cache import get_cache
+from product_record import ImageRef
+
+# Candidates collected per page before ranking (only the top N are downloaded in full)
+DEFAULT_CANDIDATES = 20
+PROBE_BYTES = 16 * 1024
+PROBE_BYTES_RETRY = 64 * 1024  # JPEGs with large EXIF/ICC blocks put SOF further in
+TARGET_W, TARGET_H = 1080, 1920
+MIN_SIDE = 200  # icons/thumbnails below this are dropped when the size is known
+PROBE_HEADERS = {"User-Agent": "Mozilla/5.0 Chrome/124.0", "Accept": "image/avif,image/webp,image/*,*/*;q=0.8"}
+
+_RE_SIZE_HINT = re.compile(r"(_\d+x\d+(?:q\d+)?|_Q\d+|\d+x\d+ex/)", re.I)
+_RE_IMG_EXT = re.compile(r"(\.(?:jpe?g|png|webp|gif|avif)_?)+$", re.I)
+
+ImageLike = Union[str, ImageRef]
+
+
+def image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) from the first bytes of a JPEG/PNG/GIF/WebP file, or None."""
+    if len(data) < 24:
+        return None
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR":
+        w, h = struct.unpack(">II", data[16:24])
+        return w, h
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        w, h = struct.unpack("<HH", data[6:10])
+        return w, h
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        chunk = data[12:16]
+        if chunk == b"VP8 " and len(data) >= 30:
+            w, h = struct.unpack("<HH", data[26:30])
+            return w & 0x3FFF, h & 0x3FFF
+        if chunk == b"VP8L" and len(data) >= 25:
+            b = data[21:25]
+            w = 1 + (((b[1] & 0x3F) << 8) | b[0])
+            h = 1 + (((b[3] & 0x0F) << 10) | (b[2] << 2) | ((b[1] & 0xC0) >> 6))
+            return w, h
+        if chunk == b"VP8X" and len(data) >= 30:
+            w = 1 + int.from_bytes(data[24:27], "little")
+            h = 1 + int.from_bytes(data[27:30], "little")
+            return w, h
+        return None
+    if data[:2] == b"\xff\xd8":
+        i = 2
+        n = len(data)
+        while i + 9 < n:
+            if data[i] != 0xFF:
+                i += 1
+                continue
+            marker = data[i + 1]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                i += 2
+                continue
+            seg_len = struct.unpack(">H", data[i + 2:i + 4])[0]
+            # SOF0..SOF15 except DHT(C4), JPG(C8), DAC(CC)
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                h, w = struct.unpack(">HH", data[i + 5:i + 9])
+                return w, h
+            i += 2 + seg_len
+    return None
+
+
+def probe_image(url: str, timeout: float = 8.0, session: Optional[requests.Session] = None,
+                nbytes: int = PROBE_BYTES) -> Optional[Tuple[int, int]]:
+    """Read width/height with a Range request for the first `nbytes` only.
+
+    Servers that ignore Range still stream; we stop reading after `nbytes`.
+    One retry with a larger window covers JPEGs whose SOF sits behind big metadata.
+    http_cache replay reads the recorded prefix (or a recorded full download) instead.
+    """
+    cache = get_cache()
+    if cache.replaying:
+        hit = cache.get(f"probe {url}") or cache.get(f"GET {url}")
+        return image_size(hit.body[:PROBE_BYTES_RETRY]) if hit is not None else None
+    get = (session or requests).get
+    for size in (nbytes, PROBE_BYTES_RETRY):
+        headers = dict(PROBE_HEADERS, Range=f"bytes=0-{size - 1}")
+        try:
+            with get(url, headers=headers, timeout=timeout, stream=True) as r:
+                if r.status_code not in (200, 206):
+                    return None
+                buf = io.BytesIO()
+                for chunk in r.iter_content(chunk_size=8192):
+                    buf.write(chunk)
+                    if buf.tell() >= size:
+                        break
+        except Exception:
+            return None
+        dims = image_size(buf.getvalue())
+        if cache.recording and (dims or buf.tell() < size or size == PROBE_BYTES_RETRY):
+            cache.put(f"probe {url}", url, r.status_code, dict(r.headers), buf.getvalue())
+        if dims or buf.tell() < size:
+            return dims  # parsed, or the whole file was shorter than the window
+    return None
+
+
+def dedup_key(url: str) -> str:
+    """Same picture in different renditions (size suffixes, webp, query) -> same key.
+
+    The key is host + full path, so different pictures that share a file name
+    (.../a/1.jpg, .../b/1.jpg) stay apart.
+    """
+    u = urlparse(url.strip())
+    path = _RE_IMG_EXT.sub("", _RE_SIZE_HINT.sub("", u.path))
+    return f"{u.netloc}{path}".lower()
+
+
+def collapse_variants(urls: Iterable[str]) -> List[str]:
+    """One URL per picture, in first-seen order; the variant without size/quality suffixes wins."""
+    groups = {}
+    for u in urls:
+        if u:
+            groups.setdefault(dedup_key(u), []).append(u)
+    return [min(g, key=lambda u: len(_RE_SIZE_HINT.findall(u.split("?")[0]))) for g in groups.values()]
+
+
+def score_image(ref: ImageRef, index: int = 0, total: int = 1) -> float:
+    """Higher is better: resolution vs 1080x1920, aspect fit to 9:16 and a small DOM-order prior.
+
+    Unknown sizes get a neutral middle score so they rank below good probed images.
+    """
+    order = 1.0 - (index / max(1, total))
+    if not ref.width or not ref.height:
+        return 0.3 + 0.1 * order
+    w, h = ref.width, ref.height
+    short = min(w, h)
+    if short < MIN_SIDE:
+        return 0.0
+    res = min(1.0, (w * h) / float(TARGET_W * TARGET_H)) ** 0.5
+    aspect = w / float(h)
+    # 0 at 4x off the 9:16 ratio in either direction (log scale), 1 at an exact fit
+    fit = 1.0 - min(1.0, abs(math.log(aspect / (TARGET_W / TARGET_H))) / math.log(4.0))
+    banner = 0.5 if (aspect > 3.0 or aspect < 0.25) else 1.0
+    return banner * (0.55 * res + 0.3 * fit + 0.15 * order)
+
+
+def probe_images(refs: Sequence[ImageRef], workers: int = 8, timeout: float = 8.0) -> None:
+    """Fill width/height on refs that have none, concurrently."""
+    todo = [r for r in refs if not (r.width and r.height)]
+    if not todo:
+        return
+    with requests.Session() as s, ThreadPoolExecutor(max_workers=max(1, min(workers, len(todo)))) as ex:
+        for ref, dims in zip(todo, ex.map(lambda r: probe_image(r.url, timeout=timeout, session=s), todo)):
+            if dims:
+                ref.width, ref.height = dims
+
+
+def rank_images(images: Iterable[ImageLike], top_n: int = 8, probe: bool = True, workers: int = 8,
+                timeout: float = 8.0) -> List[ImageRef]:
+    """Rank candidate images and return the best `top_n` (as ImageRef with size/score set).
+
+    - probe: header-only size probing of every candidate (concurrent Range requests)
+    - renditions of the same picture collapse to the one with the highest score
+    - known-tiny images (icons, thumbnails) are dropped
+    """
+    refs = [im if isinstance(im, ImageRef) else ImageRef(im) for im in images if im]
+    if not refs:
+        return []
+    if probe:
+        probe_images(refs, workers=workers, timeout=timeout)
+    best = {}
+    for i, ref in enumerate(refs):
+        ref.score = score_image(ref, i, len(refs))
+        if ref.score <= 0.0:
+            continue
+        k = dedup_key(ref.url)
+        if k not in best or ref.score > best[k].score:
+            best[k] = ref
+    ranked = sorted(best.values(), key=lambda r: r.score, reverse=True)
+    return ranked[:top_n]
@@ -0,0 +1,89 @@
+import os
+import time
+import shutil
+import tempfile
+from typing import Optional
+
+# Default on-disk root (kept for backward compatibility with the old shared folder)
+DEFAULT_ROOT = "_work_pdf"
+# RAM-backed root used when tmpfs placement is requested (Linux)
+TMPFS_ROOT = "/dev/shm/shorts_jobs"
+
+CLEANUP_POLICIES = ("always", "on_success", "never")
+
+
+def _tmpfs_available() -> bool:
+    base = os.path.dirname(TMPFS_ROOT)
+    return os.path.isdir(base) and os.access(base, os.W_OK)
+
+
+class JobWorkspace:
+    """Isolated working directory for a single render job.
+
+    - Every job gets a unique directory under `root` (mkdtemp), so concurrent runs
+      never overwrite each other's page renders, placeholders or narration audio.
+    - `use_tmpfs=True` places the job under /dev/shm when available (falls back to disk).
+    - `cleanup` decides what happens on exit: "always", "on_success" (keep failed jobs
+      for debugging) or "never".
+    - Sibling job directories older than `retention_hours` are pruned on creation.
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT, use_tmpfs: bool = False, cleanup: str = "on_success",
+                 retention_hours: float = 24.0, prefix: str = "job_"):
+        if cleanup not in CLEANUP_POLICIES:
+            raise ValueError(f"unknown cleanup policy: {cleanup}")
+        if use_tmpfs:
+            if _tmpfs_available():
+                root = TMPFS_ROOT
+            else:
+                print("[warn] tmpfs not available; using disk work dir:", root)
+        self.root = root
+        self.cleanup = cleanup
+        self.retention_hours = retention_hours
+        self.prefix = prefix
+        os.makedirs(self.root, exist_ok=True)
+        self.prune()
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        self.path = tempfile.mkdtemp(prefix=f"{prefix}{stamp}_", dir=self.root)
+
+    def file(self, name: str) -> str:
+        """Return a path for `name` inside this job's directory."""
+        return os.path.join(self.path, name)
+
+    def subdir(self, name: str) -> str:
+        p = os.path.join(self.path, name)
+        os.makedirs(p, exist_ok=True)
+        return p
+
+    def prune(self) -> int:
+        """Remove stale job directories under root according to the retention window."""
+        if not self.retention_hours or self.retention_hours <= 0:
+            return 0
+        cutoff = time.time() - float(self.retention_hours) * 3600.0
+        removed = 0
+        try:
+            entries = os.listdir(self.root)
+        except Exception:
+            return 0
+        for name in entries:
+            if not name.startswith(self.prefix):
+                continue
+            p = os.path.join(self.root, name)
+            try:
+                if os.path.isdir(p) and os.path.getmtime(p) < cutoff:
+                    shutil.rmtree(p, ignore_errors=True)
+                    removed += 1
+            except Exception:
+                continue
+        return removed
+
+    def close(self, success: bool = True):
+        if self.cleanup == "always" or (self.cleanup == "on_success" and success):
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self) -> "JobWorkspace":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> Optional[bool]:
+        self.close(success=exc_type is None)
+        return None
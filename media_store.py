@@ -0,0 +1,163 @@
+import os
+import time
+import uuid
+import shutil
+import sqlite3
+from contextlib import contextmanager
+from typing import Callable, Optional, Tuple
+
+import requests
+
+from downloader import DownloadResult, fetch_to_file
+
+DEFAULT_ROOT = os.path.join(os.getcwd(), ".media_store")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+class MediaStore:
+    """Content-addressed blob store for downloaded media.
+
+    - blobs/<sha[:2]>/<sha256><ext>: each distinct file is stored once
+    - url index: URL -> blob + ETag/Last-Modified; repeat fetches send If-None-Match /
+      If-Modified-Since and a 304 reuses the blob without a body transfer
+    - callers get a hard link (copy where links are unsupported) at their own path, so
+      deleting or renaming that file never touches the blob
+    - gc(): least-recently-used blobs are removed until the store fits max_bytes
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        os.makedirs(os.path.join(root, "tmp"), exist_ok=True)
+        with self._conn() as c:
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute(
+                "CREATE TABLE IF NOT EXISTS blobs ("
+                " sha TEXT PRIMARY KEY, ext TEXT NOT NULL, size INTEGER NOT NULL,"
+                " content_type TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            c.execute(
+                "CREATE TABLE IF NOT EXISTS urls ("
+                " url TEXT PRIMARY KEY, sha TEXT NOT NULL, etag TEXT NOT NULL,"
+                " last_modified TEXT NOT NULL, fetched REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _conn(self):
+        c = sqlite3.connect(os.path.join(self.root, "index.sqlite"), timeout=10)
+        try:
+            with c:
+                yield c
+        finally:
+            c.close()
+
+    def blob_path(self, sha: str, ext: str) -> str:
+        return os.path.join(self.root, "blobs", sha[:2], sha + ext)
+
+    def lookup(self, url: str) -> Optional[Tuple[str, str, str, str]]:
+        """(blob path, content type, etag, last-modified) for a URL whose blob still exists."""
+        with self._conn() as c:
+            row = c.execute("SELECT u.sha, b.ext, b.content_type, u.etag, u.last_modified FROM urls u"
+                            " JOIN blobs b ON b.sha = u.sha WHERE u.url=?", (url,)).fetchone()
+        if not row:
+            return None
+        path = self.blob_path(row[0], row[1])
+        return (path, row[2], row[3], row[4]) if os.path.exists(path) else None
+
+    def _touch(self, path: str) -> None:
+        sha = os.path.splitext(os.path.basename(path))[0]
+        with self._conn() as c:
+            c.execute("UPDATE blobs SET last_used=? WHERE sha=?", (time.time(), sha))
+
+    def put(self, url: str, res: DownloadResult) -> str:
+        """Move a freshly downloaded file (res.path) into the store; returns the blob path."""
+        ext = os.path.splitext(res.path)[1]
+        blob = self.blob_path(res.sha256, ext)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        if os.path.exists(blob):
+            os.remove(res.path)  # same bytes already stored (other URL or rendition)
+        else:
+            os.replace(res.path, blob)
+        now = time.time()
+        with self._conn() as c:
+            c.execute("INSERT OR REPLACE INTO blobs (sha, ext, size, content_type, last_used) VALUES (?,?,?,?,?)",
+                      (res.sha256, ext, res.nbytes, res.content_type, now))
+            c.execute("INSERT OR REPLACE INTO urls (url, sha, etag, last_modified, fetched) VALUES (?,?,?,?,?)",
+                      (url, res.sha256, res.etag, res.last_modified, now))
+        return blob
+
+    @staticmethod
+    def link(blob: str, dest: str) -> str:
+        """Hard-link the blob at dest (copy across devices); an existing dest is replaced."""
+        os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+        if os.path.exists(dest):
+            if os.path.samefile(blob, dest):
+                return dest
+            os.remove(dest)
+        try:
+            os.link(blob, dest)
+        except OSError:
+            shutil.copy2(blob, dest)
+        return dest
+
+    def fetch(self, session: requests.Session, url: str, dest: Optional[Callable[[str], str]] = None,
+              **kw) -> DownloadResult:
+        """Fetch through the store; `dest(ext)` names the caller's copy (default: the blob itself).
+
+        kw is passed to downloader.fetch_to_file (timeout, retries, backoff, max_bytes).
+        """
+        known = self.lookup(url)
+        headers = dict(kw.pop("headers", None) or {})
+        if known:
+            _path, _ct, etag, last_mod = known
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_mod:
+                headers["If-Modified-Since"] = last_mod
+        tmp = os.path.join(self.root, "tmp", uuid.uuid4().hex)
+        res = fetch_to_file(session, url, lambda ext: tmp + ext, headers=headers or None, **kw)
+        if res.status == 304 and known:
+            blob, res.content_type = known[0], known[1]
+            res.cache = "revalidated"
+            self._touch(blob)
+        elif res.ok:
+            blob = self.put(url, res)
+            res.cache = "miss"
+        else:
+            return res
+        ext = os.path.splitext(blob)[1]
+        res.sha256 = res.sha256 or os.path.splitext(os.path.basename(blob))[0]
+        res.nbytes = res.nbytes or os.path.getsize(blob)
+        res.path = self.link(blob, dest(ext)) if dest else blob
+        res.error = ""
+        return res
+
+    def total_bytes(self) -> int:
+        with self._conn() as c:
+            return int(c.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0])
+
+    def gc(self, max_bytes: Optional[int] = None) -> Tuple[int, int]:
+        """Drop least-recently-used blobs until the store fits; returns (blobs removed, bytes freed).
+
+        Hard links handed out earlier keep their data; only the store's copy goes away.
+        """
+        limit = self.max_bytes if max_bytes is None else int(max_bytes)
+        total = self.total_bytes()
+        if total <= limit:
+            return 0, 0
+        removed = freed = 0
+        with self._conn() as c:
+            rows = c.execute("SELECT sha, ext, size FROM blobs ORDER BY last_used ASC").fetchall()
+            for sha, ext, size in rows:
+                if total <= limit:
+                    break
+                try:
+                    os.remove(self.blob_path(sha, ext))
+                except OSError:
+                    pass
+                c.execute("DELETE FROM urls WHERE sha=?", (sha,))
+                c.execute("DELETE FROM blobs WHERE sha=?", (sha,))
+                total -= size
+                freed += size
+                removed += 1
+        return removed, freed
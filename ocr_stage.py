@@ -0,0 +1,138 @@
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Union
+
+import numpy as np
+from PIL import Image
+
+# Optional OCR engine (needs the tesseract binary + kor/eng traineddata)
+try:
+    import pytesseract
+    HAS_OCR = True
+except Exception:
+    HAS_OCR = False
+
+DEFAULT_LANG = "kor+eng"
+OCR_CACHE_DIR = os.path.join(os.getcwd(), ".ocr_cache")
+# Tall detail images are cut into tiles of this height (px) with a small overlap
+TILE_HEIGHT = 1600
+TILE_OVERLAP = 60
+
+OcrSource = Union[str, np.ndarray, Image.Image]
+
+
+def _to_image(src: OcrSource) -> Image.Image:
+    if isinstance(src, Image.Image):
+        return src.convert("RGB")
+    if isinstance(src, np.ndarray):
+        return Image.fromarray(src)
+    return Image.open(src).convert("RGB")
+
+
+def image_digest(img: Image.Image) -> str:
+    h = hashlib.sha256()
+    h.update(f"{img.mode}:{img.size[0]}x{img.size[1]}:".encode("ascii"))
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+def split_tiles(img: Image.Image, tile_h: int = TILE_HEIGHT, overlap: int = TILE_OVERLAP) -> List[Image.Image]:
+    """Cut a tall image into horizontal strips; short images are returned as-is."""
+    w, h = img.size
+    if h <= tile_h:
+        return [img]
+    tiles = []
+    step = max(1, tile_h - overlap)
+    y = 0
+    while y < h:
+        tiles.append(img.crop((0, y, w, min(h, y + tile_h))))
+        if y + tile_h >= h:
+            break
+        y += step
+    return tiles
+
+
+_warned = set()  # failure messages already printed
+
+
+def _ocr_tile(tile: Image.Image, lang: str) -> Optional[str]:
+    """Tile text, or None when tesseract fails (missing binary/traineddata; reported once)."""
+    try:
+        return pytesseract.image_to_string(tile, lang=lang, config="--psm 6")
+    except Exception as e:
+        msg = f"{type(e).__name__}: {e}".strip()
+        if msg not in _warned:
+            _warned.add(msg)
+            print(f"[warn] OCR failed ({lang}): {msg}")
+        return None
+
+
+def _join_tiles(texts: List[str]) -> str:
+    # Tiles overlap, so drop a line when it repeats the previous one
+    out: List[str] = []
+    for t in texts:
+        for line in (t or "").splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if out and out[-1] == line:
+                continue
+            out.append(line)
+    return "\n".join(out)
+
+
+def ocr_image(src: OcrSource, lang: str = DEFAULT_LANG, workers: int = 4,
+              cache_dir: Optional[str] = OCR_CACHE_DIR) -> str:
+    """Recognize text in one image (path, RGB array or PIL image).
+
+    - Tall images are split into tiles and the tiles are recognized in parallel
+      (tesseract runs as a subprocess, so threads scale).
+    - Results are cached on disk by the SHA-256 of the decoded pixels + language; nothing is
+      cached when a tile failed, so a fixed tesseract setup is picked up on the next run.
+    - Returns "" when no OCR engine is installed.
+    """
+    if not HAS_OCR:
+        return ""
+    try:
+        img = _to_image(src)
+    except Exception:
+        return ""
+    cache_path = None
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_path = os.path.join(cache_dir, f"{image_digest(img)}_{lang.replace('+', '-')}.txt")
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    return f.read()
+            except Exception:
+                pass
+    tiles = split_tiles(img)
+    if len(tiles) == 1:
+        texts = [_ocr_tile(tiles[0], lang)]
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tiles)))) as ex:
+            texts = list(ex.map(lambda t: _ocr_tile(t, lang), tiles))
+    text = _join_tiles(texts)
+    if cache_path and None not in texts:
+        try:
+            with open(cache_path, "w", encoding="utf-8") as f:
+                f.write(text)
+        except Exception:
+            pass
+    return text
+
+
+def ocr_images(srcs: List[OcrSource], lang: str = DEFAULT_LANG, workers: int = 4,
+               cache_dir: Optional[str] = OCR_CACHE_DIR) -> List[str]:
+    """OCR several images (e.g. all scanned PDF pages) in one batch; results keep the input order.
+
+    Images are recognized in parallel (their tiles then one after another); a single image
+    parallelizes over its tiles instead.
+    """
+    srcs = list(srcs)
+    if len(srcs) <= 1:
+        return [ocr_image(s, lang=lang, workers=workers, cache_dir=cache_dir) for s in srcs]
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(srcs)))) as ex:
+        return list(ex.map(lambda s: ocr_image(s, lang=lang, workers=1, cache_dir=cache_dir), srcs))
@@ -0,0 +1,340 @@
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from browser_pool import Profile, get_pool
+from http_cache import ReplayMiss, get_cache
+from resource_policy import NetworkStats, ResourcePolicy, finish, install
+from waits import WaitLog, WaitResult, dom_quiet, images_stable, network_idle
+
+# Steps run on one page in this order (one navigation for all of them)
+STEPS = ("html", "detail", "specs", "deep")
+# Max seconds to let the page settle after domcontentloaded, per wait_state
+LOAD_SETTLE = {"domcontentloaded": 2.0, "networkidle": 5.0, "load": 5.0}
+
+MORE_SELECTORS = [
+    "button:has-text('더보기')",
+    "text=상세보기",
+    "button:has-text('Show More')",
+    "text=Show more",
+    "text=Description",
+    "text=상품 설명",
+    "text=상세",
+    "[data-spm*='desc']",
+    "a[href*='description']",
+]
+SPEC_SELECTORS = [
+    "text=Specifications", "text=Specification", "text=스펙", "text=제품 스펙", "text=상품 스펙",
+    "button:has-text('더보기')", "text=상세보기",
+]
+DETAIL_CONTAINERS = [
+    "div.detail-desc-decorate",
+    "div.product-description",
+    "div.detail-desc",
+    "div#product-description",
+    "div#product-detail",
+    "div[id*='product-description']",
+    "div[id*='description']",
+    "div[class*='product-detail']",
+]
+
+# Large images under `root` (document or an element) as {url, w, h} (natural size, 0 if not
+# decoded yet), largest first (DOM order among equals); filters thumbnails/icons
+JS_COLLECT_IMAGES = r"""
+(root) => {
+  root = root || document;
+  const seen = new Set();
+  const out = [];
+  const pickFromSrcset = (srcset) => {
+    if (!srcset) return null;
+    try {
+      const parts = srcset.split(',').map(s => s.trim());
+      const last = parts[parts.length - 1] || parts[0];
+      return (last.split(' ') || [])[0] || null;
+    } catch (e) { return null; }
+  };
+  for (const img of root.querySelectorAll('img')) {
+    const rect = img.getBoundingClientRect();
+    const w = Math.max(img.naturalWidth || 0, rect.width || 0);
+    const h = Math.max(img.naturalHeight || 0, rect.height || 0);
+    if (w < 120 || h < 120) continue;
+    let u = img.currentSrc || img.src || img.getAttribute('data-src') || img.getAttribute('data-image')
+      || img.getAttribute('data-original') || pickFromSrcset(img.getAttribute('srcset'));
+    if (!u) continue;
+    if (u.startsWith('data:')) continue;
+    if (/sprite|icon|logo|blank|placeholder/i.test(u)) continue;
+    if (u.startsWith('//')) u = 'https:' + u;
+    if (seen.has(u)) continue;
+    seen.add(u);
+    out.push({url: u, w: img.naturalWidth || 0, h: img.naturalHeight || 0});
+  }
+  return out.sort((a, b) => b.w * b.h - a.w * a.h);
+}
+"""
+
+# Text lines before the first image of the description = overview
+JS_OVERVIEW = r"""
+(el) => {
+  function splitLines(s) {
+    if (!s) return [];
+    return s.split(/[•\n\.\|・·]+/).map(x => x.trim()).filter(x => x.length >= 6 && x.length <= 120);
+  }
+  let overviewText = '';
+  const walker = document.createTreeWalker(el, NodeFilter.SHOW_ELEMENT, null);
+  let node;
+  while ((node = walker.nextNode())) {
+    const tag = (node.tagName || '').toLowerCase();
+    if (tag === 'img') break;
+    if (node.querySelector && node.querySelector('img')) break;
+    if (['p', 'li', 'div', 'span', 'h1', 'h2', 'h3', 'h4', 'section'].includes(tag)) {
+      const t = (node.innerText || '').trim();
+      if (t) overviewText += (overviewText ? '\n' : '') + t;
+    }
+  }
+  return splitLines(overviewText);
+}
+"""
+
+JS_SPECS = r"""
+() => {
+  const out = [];
+  const MAX = 48;
+  function add(line) {
+    if (!line) return;
+    const t = String(line).trim();
+    if (t.length < 3 || t.length > 100) return;
+    if (out.indexOf(t) === -1) out.push(t);
+  }
+  const scopes = document.querySelectorAll('[class*="spec"], [class*="product-prop"], [class*="product-spec"], [class*="specification"]');
+  for (const sc of scopes) {
+    for (const r of sc.querySelectorAll('tr')) {
+      const ths = r.querySelectorAll('th');
+      const tds = r.querySelectorAll('td');
+      if (ths.length && tds.length) {
+        for (let i = 0; i < Math.min(ths.length, tds.length, MAX); i++) {
+          const k = ths[i].innerText.trim();
+          const v = tds[i].innerText.trim();
+          if (k && v) add(k + ': ' + v);
+        }
+      } else if (tds.length >= 2) {
+        for (let i = 0; i < tds.length - 1 && i < MAX; i += 2) {
+          const k = tds[i].innerText.trim();
+          const v = tds[i + 1].innerText.trim();
+          if (k && v) add(k + ': ' + v);
+        }
+      } else {
+        add(r.innerText.trim());
+      }
+    }
+    for (const li of sc.querySelectorAll('li')) add(li.innerText.trim());
+  }
+  return out.slice(0, 40);
+}
+"""
+
+JS_TITLE = "() => (document.querySelector('h1')?.textContent || document.title || '').trim()"
+
+# Everything above as one object, installed per browser context with add_init_script; after
+# the steps' clicks/scrolls, extract(opts) reads all requested fields in one evaluate
+JS_BUNDLE = f"""
+window.__productExtract = window.__productExtract || (() => {{
+  const collectImages = {JS_COLLECT_IMAGES.strip()};
+  const overview = {JS_OVERVIEW.strip()};
+  const specs = {JS_SPECS.strip()};
+  const title = {JS_TITLE};
+  const extract = (opts) => {{
+    const out = {{title: title(), desc_text: null, overview: [], specs: [], detail_images: [], images: []}};
+    if (opts.detail) {{
+      for (const sel of opts.containers) {{
+        let el = null;
+        try {{ el = document.querySelector(sel); }} catch (e) {{ continue; }}
+        if (!el) continue;
+        out.detail_images = collectImages(el);
+        out.desc_text = (el.innerText || '').trim() || null;
+        try {{ out.overview = overview(el); }} catch (e) {{}}
+        break;
+      }}
+    }}
+    if (opts.specs) out.specs = specs();
+    if (opts.images) out.images = collectImages(document);
+    return out;
+  }};
+  return {{collectImages, overview, specs, title, extract}};
+}})();
+"""
+JS_EXTRACT = "(opts) => window.__productExtract.extract(opts)"
+
+
+@dataclass
+class Visit:
+    """Results of one navigation; the steps interact with the page, extract() fills the fields."""
+    url: str
+    title: Optional[str] = None
+    html: Optional[str] = None
+    desc_text: Optional[str] = None
+    detail_urls: List[str] = field(default_factory=list)
+    overview: List[str] = field(default_factory=list)
+    specs: List[str] = field(default_factory=list)
+    deep_urls: List[str] = field(default_factory=list)
+    image_sizes: Dict[str, Tuple[int, int]] = field(default_factory=dict)  # natural size of decoded <img>s
+    timings: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    clicked: Set[str] = field(default_factory=set)  # toggles already opened (never click twice)
+    network: Optional[NetworkStats] = None  # blocked/loaded requests + captured JSON (with a policy)
+    waits: WaitLog = field(default_factory=WaitLog)  # per-stage condition waits
+
+
+def _click_first(page, selectors: Iterable[str], v: Visit, limit: int = 1, pause: float = 0.4) -> int:
+    clicks = 0
+    for sel in selectors:
+        if clicks >= limit:
+            break
+        if sel in v.clicked:
+            continue
+        try:
+            loc = page.locator(sel)
+            if loc.count() > 0:
+                loc.first.click(timeout=1500)
+                v.clicked.add(sel)
+                clicks += 1
+                dom_quiet(page, quiet=0.2, ceiling=pause, stage=f"click {sel}", log=v.waits)
+        except Exception:
+            continue
+    return clicks
+
+
+def step_html(page, v: Visit, **_):
+    v.html = page.content()
+
+
+def step_detail(page, v: Visit, **_):
+    """Open one 'more/description' toggle (the description container is read by extract())."""
+    if not (v.clicked & set(MORE_SELECTORS)):
+        _click_first(page, MORE_SELECTORS, v, limit=1, pause=0.5)
+
+
+def step_specs(page, v: Visit, **_):
+    _click_first(page, SPEC_SELECTORS, v, limit=1)
+
+
+def step_deep(page, v: Visit, scrolls: int = 8, delay: float = 0.8, **_):
+    """Open up to two more toggles and scroll gradually so lazy images are in the DOM.
+
+    After each scroll step the page waits until its images stop changing (at most `delay`).
+    """
+    _click_first(page, MORE_SELECTORS, v, limit=max(0, 2 - len(v.clicked & set(MORE_SELECTORS))))
+    n = max(1, scrolls)
+    for i in range(n):
+        try:
+            page.evaluate("(step) => { window.scrollTo(0, document.body.scrollHeight * step); }", (i + 1) / n)
+        except Exception:
+            pass
+        images_stable(page, quiet=0.25, ceiling=delay, stage=f"scroll {i + 1}/{n}", log=v.waits)
+
+
+STEP_FUNCS = {"html": step_html, "detail": step_detail, "specs": step_specs, "deep": step_deep}
+
+
+def extract(page, v: Visit, steps: Iterable[str]) -> None:
+    """Read title, description, overview, specs and images for `steps` in one page.evaluate.
+
+    The bundle normally comes with the context (add_init_script); a document that does not
+    have it (opened before it was registered) gets it injected first.
+    """
+    opts = {"containers": DETAIL_CONTAINERS, "detail": "detail" in steps, "specs": "specs" in steps,
+            "images": "deep" in steps}
+    try:
+        data = page.evaluate(JS_EXTRACT, opts)
+    except Exception:
+        page.evaluate(f"() => {{ {JS_BUNDLE} }}")
+        data = page.evaluate(JS_EXTRACT, opts)
+    v.title = data.get("title") or None
+    if opts["detail"]:
+        v.desc_text = data.get("desc_text") or None
+        v.overview = list(data.get("overview") or [])
+        v.detail_urls = [im["url"] for im in data.get("detail_images") or []]
+    if opts["specs"]:
+        cleaned: List[str] = []
+        for ln in data.get("specs") or []:
+            s = " ".join((ln or "").split())
+            if 3 <= len(s) <= 100 and s not in cleaned:
+                cleaned.append(s)
+        v.specs = cleaned[:40]
+    if opts["images"]:
+        v.deep_urls = [im["url"] for im in data.get("images") or []]
+    for im in (data.get("detail_images") or []) + (data.get("images") or []):
+        if im.get("w") and im.get("h"):
+            v.image_sizes[im["url"]] = (int(im["w"]), int(im["h"]))
+
+
+def open_page(page, url: str, timeout: int, wait_state: str = "domcontentloaded",
+              log: Optional[WaitLog] = None) -> None:
+    """goto() until domcontentloaded, then wait for the network to go quiet (or the load
+    event) for at most LOAD_SETTLE[wait_state] seconds instead of most of the timeout."""
+    page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
+    ceiling = min(LOAD_SETTLE.get(wait_state, LOAD_SETTLE["domcontentloaded"]), max(1.0, timeout - 3))
+    if wait_state == "load":
+        t0 = time.perf_counter()
+        try:
+            page.wait_for_load_state("load", timeout=int(ceiling * 1000))
+            met = True
+        except Exception:
+            met = False
+        if log is not None:
+            log.add(WaitResult("load", "load event", time.perf_counter() - t0, ceiling, met))
+        return
+    network_idle(page, quiet=0.5, ceiling=ceiling, stage="load", log=log)
+
+
+def visit(url: str, steps: Iterable[str] = ("html",), profile: Profile = Profile(), timeout: int = 45,
+          wait_state: str = "domcontentloaded", scrolls: int = 8, delay: float = 0.8, pool=None,
+          policy: Optional[ResourcePolicy] = None) -> Visit:
+    """Navigate once on a warm pooled browser and run the requested extraction steps.
+
+    Steps always run in STEPS order (html before any clicks; deep scrolling last), then one
+    extract() call reads every requested field. A failing step is recorded in `errors` and
+    does not stop the others.
+    policy: resource_policy.ResourcePolicy routed on the page (images stay allowed when a
+    step reads rendered images); counts and captured JSON end up in `network`.
+    http_cache record/replay stores the extracted results (not the page's sub-requests).
+    """
+    wanted = [s for s in STEPS if s in set(steps)]
+    cache = get_cache()
+    key = f"visit {'+'.join(wanted)} {'mobile' if profile.mobile else 'desktop'} {url}"
+    if cache.replaying:
+        data = cache.get_json(key)
+        if data is None:
+            raise ReplayMiss(key)
+        return Visit(**dict(data, clicked=set(data.get("clicked", [])),
+                            image_sizes={u: tuple(wh) for u, wh in data.get("image_sizes", {}).items()}))
+    pool = pool or get_pool()
+    pool.add_init_script(JS_BUNDLE)
+
+    def job(page):
+        v = Visit(url)
+        rec = install(page, policy.for_steps(wanted)) if policy is not None else None
+        t0 = time.perf_counter()
+        open_page(page, url, timeout, wait_state, log=v.waits)
+        v.timings["load"] = time.perf_counter() - t0
+        for name in wanted:
+            t = time.perf_counter()
+            try:
+                STEP_FUNCS[name](page, v, scrolls=scrolls, delay=delay)
+            except Exception as e:
+                v.errors[name] = f"{type(e).__name__}: {e}"
+            v.timings[name] = time.perf_counter() - t
+        t = time.perf_counter()
+        try:
+            extract(page, v, wanted)
+        except Exception as e:
+            v.errors["extract"] = f"{type(e).__name__}: {e}"
+        v.timings["extract"] = time.perf_counter() - t
+        if rec is not None:
+            v.network = finish(rec, load_seconds=v.timings["load"])
+        return v
+
+    v = pool.run(profile, job, timeout=timeout * (2 + len(wanted)))
+    if cache.recording:
+        cache.put_json(key, url, {k: (sorted(val) if k == "clicked" else val) for k, val in vars(v).items()
+                                  if k not in ("network", "waits")})
+    return v
@@ -0,0 +1,139 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+from contextlib import contextmanager
+from typing import Optional
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+
+from product_record import ProductRecord, HAS_MSGPACK
+
+DEFAULT_PATH = os.path.join(os.getcwd(), ".parse_cache.sqlite")
+DEFAULT_TTL_HOURS = 6.0
+
+# Query parameters that never change the product shown
+TRACKING_PREFIXES = ("utm_", "aff_", "algo_")
+TRACKING_PARAMS = {"spm", "scm", "gclid", "fbclid", "gatewayAdapt", "traceid", "isAddedCart",
+                   "rank", "searchId", "pvid", "sourceType", "itemsCount", "_t"}
+_RE_ALI_ITEM = re.compile(r"/item/(?:[^/]*/)?(\d{6,})\.html")
+_RE_COUPANG_PRODUCT = re.compile(r"/v[pm]/products/(\d+)")
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a product URL so every variant of the same product maps to one key.
+
+    - Coupang: www/m hosts -> https://www.coupang.com/vp/products/<id>, keeping only
+      itemId and vendorItemId (they select the option/seller)
+    - AliExpress: any locale/mobile host -> https://www.aliexpress.com/item/<id>.html
+    - others: lower-cased host, no fragment, tracking parameters dropped, query sorted
+    """
+    url = (url or "").strip()
+    try:
+        u = urlparse(url)
+    except Exception:
+        return url
+    host = (u.netloc or "").lower()
+    q = parse_qs(u.query, keep_blank_values=False)
+    if "coupang.com" in host:
+        m = _RE_COUPANG_PRODUCT.search(u.path)
+        if m:
+            keep = [(k, q[k][0]) for k in ("itemId", "vendorItemId") if q.get(k)]
+            return urlunparse(("https", "www.coupang.com", f"/vp/products/{m.group(1)}", "", urlencode(keep), ""))
+    if "aliexpress." in host:
+        m = _RE_ALI_ITEM.search(u.path)
+        item_id = m.group(1) if m else (q.get("productId") or [None])[0]
+        if item_id:
+            return f"https://www.aliexpress.com/item/{item_id}.html"
+    keep = sorted((k, v[0]) for k, v in q.items()
+                  if k not in TRACKING_PARAMS and not k.startswith(TRACKING_PREFIXES))
+    path = u.path.rstrip("/") or "/"
+    return urlunparse(((u.scheme or "https").lower(), host, path, "", urlencode(keep), ""))
+
+
+def html_digest(html: str) -> str:
+    return hashlib.blake2b((html or "").encode("utf-8", "ignore"), digest_size=16).hexdigest()
+
+
+class ParseCache:
+    """SQLite cache: canonical URL (+site) -> HTML digest, ProductRecord, timestamp.
+
+    - get(url, site): record if younger than the TTL (no fetch needed)
+    - get(url, site, html=...): additionally requires the same HTML digest; a changed
+      page invalidates (deletes) the entry
+    - Records are stored as msgpack when available, JSON otherwise.
+    - One short-lived connection per call, so Streamlit reruns/threads can share it.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl_hours: float = DEFAULT_TTL_HOURS):
+        self.path = path
+        self.ttl = float(ttl_hours) * 3600.0
+        d = os.path.dirname(os.path.abspath(path))
+        os.makedirs(d, exist_ok=True)
+        with self._conn() as c:
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                " url TEXT NOT NULL, site TEXT NOT NULL, digest TEXT NOT NULL,"
+                " fmt TEXT NOT NULL, data BLOB NOT NULL, created REAL NOT NULL,"
+                " PRIMARY KEY (url, site))"
+            )
+
+    @contextmanager
+    def _conn(self):
+        c = sqlite3.connect(self.path, timeout=10)
+        try:
+            with c:  # commit on success, rollback on error
+                yield c
+        finally:
+            c.close()
+
+    @staticmethod
+    def _encode(rec: ProductRecord):
+        if HAS_MSGPACK:
+            return "msgpack", rec.to_msgpack()
+        return "json", rec.to_json().encode("utf-8")
+
+    @staticmethod
+    def _decode(fmt: str, data: bytes) -> Optional[ProductRecord]:
+        try:
+            if fmt == "msgpack":
+                return ProductRecord.from_msgpack(data)
+            return ProductRecord.from_json(bytes(data).decode("utf-8"))
+        except Exception:
+            return None
+
+    def get(self, url: str, site: str = "auto", html: Optional[str] = None) -> Optional[ProductRecord]:
+        key = canonical_url(url)
+        with self._conn() as c:
+            row = c.execute("SELECT digest, fmt, data, created FROM records WHERE url=? AND site=?",
+                            (key, site)).fetchone()
+            if not row:
+                return None
+            digest, fmt, data, created = row
+            stale = (time.time() - created) > self.ttl
+            changed = html is not None and html_digest(html) != digest
+            if stale or changed:
+                c.execute("DELETE FROM records WHERE url=? AND site=?", (key, site))
+                return None
+        return self._decode(fmt, data)
+
+    def put(self, url: str, html: str, rec: ProductRecord, site: str = "auto") -> None:
+        fmt, data = self._encode(rec)
+        with self._conn() as c:
+            c.execute("INSERT OR REPLACE INTO records (url, site, digest, fmt, data, created) VALUES (?,?,?,?,?,?)",
+                      (canonical_url(url), site, html_digest(html), fmt, sqlite3.Binary(data), time.time()))
+
+    def invalidate(self, url: str, site: Optional[str] = None) -> None:
+        key = canonical_url(url)
+        with self._conn() as c:
+            if site is None:
+                c.execute("DELETE FROM records WHERE url=?", (key,))
+            else:
+                c.execute("DELETE FROM records WHERE url=? AND site=?", (key, site))
+
+    def prune(self) -> int:
+        """Drop entries older than the TTL; returns how many were removed."""
+        with self._conn() as c:
+            cur = c.execute("DELETE FROM records WHERE created < ?", (time.time() - self.ttl,))
+            return cur.rowcount
@@ -1,131 +1,257 @@
 import re
-import json
-from typing import List, Optional
-from bs4 import BeautifulSoup
+from typing import Optional
 
+from html_context import ParseContext, HAS_LXML, has_class, node_text
+from embedded_state import find_state_blobs, find_key, json_ld_products
+from price import find_price, parse_price_text, price_from_offers
+from product_record import ProductRecord
 
-class AliParsed:
-    def __init__(self, title: str, price: Optional[str], features: List[str], images: List[str]):
-        self.title = title
-        self.price = price
-        self.features = features
-        self.images = images
 
+# Former result class; parse() now returns a ProductRecord
+AliParsed = ProductRecord
 
-def _parse_json_ld(soup: BeautifulSoup):
-    for tag in soup.find_all("script", type="application/ld+json"):
-        try:
-            data = json.loads(tag.string or "{}")
-        except Exception:
-            continue
-        if isinstance(data, list):
-            for item in data:
-                if isinstance(item, dict) and item.get("@type") == "Product":
-                    yield item
-        elif isinstance(data, dict) and data.get("@type") == "Product":
-            yield data
+_RE_FEATURE_SPLIT = re.compile(r"[•\n\.\|]+")
+_RE_SIZE_SUFFIX = re.compile(r"(_\d+x\d+)|(_Q\d+)")
+ALI_IMAGE_HOSTS = ("ae01.alicdn.com", "img.alicdn.com", "i.alicdn.com")
+MAX_IMAGES = 8
+
+# Field names used by the embedded state across runParams/_init_data_ page versions
+STATE_TITLE_KEYS = ("subject",)
+STATE_SALE_PRICE_KEYS = ("formatedActivityPrice", "formattedActivityPrice")
+STATE_PRICE_KEYS = ("formatedPrice", "formattedPrice")
+STATE_IMAGE_KEYS = ("imagePathList", "summImagePathList")
+STATE_SPEC_KEYS = ("props",)
+# (css, xpath) price regions on the rendered product page
+PRICE_REGIONS = [("div.product-price-current", f"//div[{has_class('product-price-current')}]"),
+                 ("span.product-price-value", f"//span[{has_class('product-price-value')}]"),
+                 ("div.price--current", f"//div[{has_class('price--current')}]")]
+ORIGINAL_PRICE_REGIONS = [("span.product-price-del", f"//span[{has_class('product-price-del')}]"),
+                          ("span.price--originalText", f"//span[{has_class('price--originalText')}]")]
+
+
+_parse_json_ld = json_ld_products
 
 
 def _parse_runparams(html: str):
-    # Very heuristic extraction of window.runParams = { ... } structure
-    m = re.search(r"window\.runParams\s*=\s*(\{.*?\});\s*window", html, re.S)
-    if not m:
-        m = re.search(r"window\.runParams\s*=\s*(\{.*?\});", html, re.S)
-    if not m:
-        return None
-    txt = m.group(1)
-    # Try to fix unquoted keys and trailing commas with a loose load
-    try:
-        return json.loads(txt)
-    except Exception:
-        # As a fallback, try to extract some obvious arrays/fields
-        return None
+    """window.runParams = {...} as a dict (brace-balanced scan, tolerant JSON), or None."""
+    return find_state_blobs(html, ("window.runParams",)).get("window.runParams")
+
+
+def _set(rec: ProductRecord, name: str, value, source: str) -> None:
+    """Fill an empty field once and remember where it came from."""
+    if value and not getattr(rec, name):
+        setattr(rec, name, value)
+        rec.provenance[name] = source
+
+
+def _add_features(rec: ProductRecord, lines, source: str) -> None:
+    lines = [x for x in lines if x]
+    if lines:
+        rec.features.extend(lines)
+        rec.provenance.setdefault("features", source)
+
+
+def _add_images(rec: ProductRecord, urls, source: str) -> None:
+    n = len(rec.images)
+    rec.add_images(urls, source=source)
+    if len(rec.images) > n:
+        rec.provenance.setdefault("images", source)
+
+
+def _from_state(html: str, rec: ProductRecord) -> None:
+    """Map embedded page state (runParams / __INITIAL_STATE__ / _init_data_) into the record.
+
+    - title (subject) and price fill only missing fields; the activity (sale)
+      price wins and the regular price becomes `original`
+    - imagePathList gallery is appended to the images
+    - props [{attrName, attrValue}] go to specs and, as "name: value", to features
+    """
+    blobs = list(find_state_blobs(html).values())
+    if not blobs:
+        return
+    title = find_key(blobs, STATE_TITLE_KEYS)
+    _set(rec, "title", title if isinstance(title, str) else None, "state")
+    sale = find_key(blobs, STATE_SALE_PRICE_KEYS)
+    regular = find_key(blobs, STATE_PRICE_KEYS)
+    price = parse_price_text(sale, source="state") if isinstance(sale, str) else None
+    reg = parse_price_text(regular, source="state") if isinstance(regular, str) else None
+    if price is None:
+        price = reg
+    elif reg and reg.amount and price.amount and reg.amount > price.amount:
+        price.original = reg.amount
+    _set(rec, "price", price, "state")
+    gallery = find_key(blobs, STATE_IMAGE_KEYS)
+    if isinstance(gallery, list):
+        _add_images(rec, [norm_image_url(u) for u in gallery if isinstance(u, str)], "state")
+    props = find_key(blobs, STATE_SPEC_KEYS)
+    if isinstance(props, list):
+        lines = []
+        for p in props:
+            if not isinstance(p, dict):
+                continue
+            name = str(p.get("attrName") or "").strip()
+            val = str(p.get("attrValue") or "").strip()
+            if not (name and val):
+                continue
+            rec.specs.setdefault(name, val)
+            line = f"{name}: {val}"
+            if 6 <= len(line) <= 90:
+                lines.append(line)
+        if rec.specs:
+            rec.provenance.setdefault("specs", "state")
+        _add_features(rec, lines, "state")
+
+
+def norm_image_url(u: str) -> str:
+    if not u:
+        return u
+    # prefer jpg and strip size suffixes like _640x640, _Q90
+    u = _RE_SIZE_SUFFIX.sub("", u)
+    u = u.replace(".webp", ".jpg")
+    u = u.replace(".jpg_.webp", ".jpg")
+    u = u.replace(".jpg_Q90.jpg", ".jpg")
+    # "x.jpg_640x640.jpg" -> "x.jpg.jpg" after the suffix strip
+    u = u.replace(".jpg.jpg", ".jpg")
+    return u
+
+
+def _from_product(prod: dict, rec: ProductRecord) -> None:
+    _set(rec, "title", prod.get("name"), "jsonld")
+    _set(rec, "price", price_from_offers(prod.get("offers")), "jsonld")
+    imgs = prod.get("image")
+    if isinstance(imgs, str):
+        imgs = [imgs]
+    if isinstance(imgs, list):
+        _add_images(rec, [u for u in imgs if isinstance(u, str)], "jsonld")
+    desc = prod.get("description") or ""
+    lines = []
+    for c in _RE_FEATURE_SPLIT.split(desc):
+        c = c.strip()
+        if 6 <= len(c) <= 90:
+            lines.append(c)
+    _add_features(rec, lines, "jsonld")
 
 
-def parse(html: str) -> AliParsed:
-    soup = BeautifulSoup(html, "lxml")
-
-    title = None
-    price = None
-    features: List[str] = []
-    images: List[str] = []
-
-    # Prefer JSON-LD Product
-    for prod in _parse_json_ld(soup):
-        title = prod.get("name") or title
-        offers = prod.get("offers") or {}
-        if isinstance(offers, dict):
-            price = offers.get("price") or price
-            if price and offers.get("priceCurrency"):
-                cur = offers.get("priceCurrency")
-                if not any(c in price for c in "$₩€¥"):
-                    price = f"{price} {cur}"
-        imgs = prod.get("image")
-        if isinstance(imgs, list):
-            images.extend(imgs)
-        elif isinstance(imgs, str):
-            images.append(imgs)
-        desc = prod.get("description") or ""
-        for c in re.split(r"[•\n\.\|]+", desc):
-            c = c.strip()
-            if 6 <= len(c) <= 90:
-                features.append(c)
-        break  # Use first product block
+def _parse_bs4(ctx: ParseContext, max_images: int = MAX_IMAGES) -> ProductRecord:
+    soup = ctx.soup
+    rec = ProductRecord(url=ctx.base_url, site="aliexpress")
+
+    # Prefer JSON-LD Product (first block only), then the embedded page state
+    for prod in _parse_json_ld(soup.find_all("script", type="application/ld+json")):
+        _from_product(prod, rec)
+        break
+    _from_state(ctx.html, rec)
 
     # Fallbacks
-    if not title:
+    if not rec.title:
         ogt = soup.find("meta", property="og:title")
         if ogt and ogt.get("content"):
-            title = ogt["content"].strip()
-    if not title and soup.title:
-        title = soup.title.get_text(" ", strip=True)
-    if not title:
-        title = "AliExpress Product"
-
-    def _norm(u: str) -> str:
-        if not u:
-            return u
-        # prefer jpg and strip size suffixes like _640x640, _Q90
-        u = re.sub(r"(_\d+x\d+)|(_Q\d+)", "", u)
-        u = u.replace(".webp", ".jpg")
-        u = u.replace(".jpg_.webp", ".jpg")
-        u = u.replace(".jpg_Q90.jpg", ".jpg")
-        return u
+            _set(rec, "title", ogt["content"].strip(), "og")
+    if not rec.title and soup.title:
+        _set(rec, "title", soup.title.get_text(" ", strip=True), "title")
 
-    if not images:
+    if not rec.images:
         ogimgs = [m.get("content") for m in soup.find_all("meta", property="og:image") if m.get("content")]
-        images.extend([_norm(x) for x in ogimgs])
-    if len(images) < 8:
+        _add_images(rec, [norm_image_url(x) for x in ogimgs], "og")
+    if len(rec.images) < max_images:
         for img in soup.select("img"):
             src = img.get("src") or img.get("data-src") or img.get("data-image") or ""
-            if any(host in src for host in ("ae01.alicdn.com", "img.alicdn.com", "i.alicdn.com")):
-                images.append(_norm(src))
-            if len(images) >= 8:
+            if any(host in src for host in ALI_IMAGE_HOSTS):
+                _add_images(rec, [norm_image_url(src)], "img")
+            if len(rec.images) >= max_images:
                 break
 
-    if not price:
-        text = soup.get_text("\n", strip=True)
-        m = re.search(r"([$€¥₩])\s*([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]+)?)", text)
-        if m:
-            price = f"{m.group(1)}{m.group(2)}"
+    if not rec.price:
+        p = find_price(ctx, PRICE_REGIONS, ORIGINAL_PRICE_REGIONS, default_currency=None, backend="bs4")
+        _set(rec, "price", p, p.source if p else "")
 
     # Features: also check bullets
-    if len(features) < 3:
+    if len(rec.features) < 3:
+        lines = []
         for li in soup.select("li"):
             t = li.get_text(" ", strip=True)
             if 6 <= len(t) <= 90:
-                features.append(t)
-            if len(features) >= 6:
+                lines.append(t)
+            if len(rec.features) + len(lines) >= 6:
+                break
+        _add_features(rec, lines, "li")
+    return rec
+
+
+def _parse_lxml(ctx: ParseContext, max_images: int = MAX_IMAGES) -> Optional[ProductRecord]:
+    """XPath fast path over the raw lxml tree; mirrors _parse_bs4 field by field."""
+    doc = ctx.tree
+    if doc is None:
+        return None
+    rec = ProductRecord(url=ctx.base_url, site="aliexpress")
+
+    for prod in _parse_json_ld(s.text for s in doc.xpath("//script[@type='application/ld+json']")):
+        _from_product(prod, rec)
+        break
+    _from_state(ctx.html, rec)
+
+    if not rec.title:
+        ogt = doc.xpath("//meta[@property='og:title']")
+        if ogt and ogt[0].get("content"):
+            _set(rec, "title", ogt[0].get("content").strip(), "og")
+    if not rec.title:
+        t = doc.xpath("//title")
+        if t:
+            _set(rec, "title", node_text(t[0], " "), "title")
+
+    if not rec.images:
+        _add_images(rec, [norm_image_url(x) for x in doc.xpath("//meta[@property='og:image']/@content") if x], "og")
+    if len(rec.images) < max_images:
+        for img in doc.iter("img"):
+            src = img.get("src") or img.get("data-src") or img.get("data-image") or ""
+            if any(host in src for host in ALI_IMAGE_HOSTS):
+                _add_images(rec, [norm_image_url(src)], "img")
+            if len(rec.images) >= max_images:
+                break
+
+    if not rec.price:
+        p = find_price(ctx, PRICE_REGIONS, ORIGINAL_PRICE_REGIONS, default_currency=None, backend="lxml")
+        _set(rec, "price", p, p.source if p else "")
+
+    if len(rec.features) < 3:
+        lines = []
+        for li in doc.iter("li"):
+            t = node_text(li, " ")
+            if 6 <= len(t) <= 90:
+                lines.append(t)
+            if len(rec.features) + len(lines) >= 6:
                 break
-    # Dedup
-    def dedup_list(xs):
-        out = []
-        for x in xs:
-            if x and x not in out:
-                out.append(x)
-        return out
-
-    images = dedup_list(images)[:8]
-    features = dedup_list(features)[:5] or ["Key feature 1", "Key feature 2", "Key feature 3"]
-
-    return AliParsed(title=title, price=price, features=features, images=images)
+        _add_features(rec, lines, "li")
+    return rec
+
+
+def parse(html: str, ctx: Optional[ParseContext] = None, fill_defaults: bool = True,
+          backend: str = "auto", max_images: int = MAX_IMAGES) -> ProductRecord:
+    """Parse an AliExpress product page into a ProductRecord.
+
+    - ctx: shared ParseContext; the tree and page text are reused instead of re-parsed.
+    - fill_defaults=False leaves missing title/features empty (for merging with other extractors).
+    - backend: "auto" (lxml XPath, BeautifulSoup only when it finds no title/images),
+      "lxml" (fast path only) or "bs4".
+    - max_images: image candidates to collect (raise it when the caller ranks them).
+    """
+    ctx = ParseContext.ensure(html, ctx)
+    rec = None
+    if backend in ("auto", "lxml"):
+        if backend == "lxml" and not HAS_LXML:
+            raise RuntimeError("lxml not installed")
+        rec = _parse_lxml(ctx, max_images)
+        if backend == "auto" and rec is not None and not (rec.title or rec.images):
+            rec = None  # fast path missed; let BeautifulSoup have a go
+        if backend == "lxml" and rec is None:
+            rec = ProductRecord(url=ctx.base_url, site="aliexpress")
+    if rec is None:
+        rec = _parse_bs4(ctx, max_images)
+
+    if not rec.title and fill_defaults:
+        _set(rec, "title", "AliExpress Product", "default")
+    rec.images = rec.images[:max_images]
+    rec.features = list(dict.fromkeys(x for x in rec.features if x))[:5]
+    if not rec.features and fill_defaults:
+        _add_features(rec, ["Key feature 1", "Key feature 2", "Key feature 3"], "default")
+    return rec
@@ -1,97 +1,216 @@
 import re
-from typing import List, Optional
-from bs4 import BeautifulSoup
+from typing import List, Optional, Tuple
 
-class CoupangParsed:
-    def __init__(self, title: str, price: Optional[str], features: List[str], images: List[str]):
-        self.title = title
-        self.price = price
-        self.features = features
-        self.images = images
+from html_context import ParseContext, HAS_LXML, has_class, node_text
+from price import find_price
+from product_record import ProductRecord
 
-def parse(html: str) -> CoupangParsed:
-    soup = BeautifulSoup(html, "lxml")
+# Former result class; parse() now returns a ProductRecord
+CoupangParsed = ProductRecord
 
-    # --- Title (prefer Korean) ---
+_RE_KO = re.compile(r"[가-힣]")
+_RE_FEATURE_SPLIT = re.compile(r"[•\n\.\|]+")
+
+TITLE_SELECTORS = ["h2.prod-buy-header__title", "h1.prod-buy-header__title",
+                   "div.prod-buy-header__title", "meta[name='title']"]
+PRICE_SELECTORS = ["span.total-price", "span.total-price > strong",
+                   "span.prod-sale-price > strong", "span.prod-price__price"]
+FEATURE_SELECTOR = "li.prod-description-attribute__item, ul.prod-description-attribute li"
+MAX_IMAGES = 8
+
+# XPath equivalents of the CSS selectors (same order => same first match)
+TITLE_XPATHS = [f"//h2[{has_class('prod-buy-header__title')}]",
+                f"//h1[{has_class('prod-buy-header__title')}]",
+                f"//div[{has_class('prod-buy-header__title')}]",
+                "//meta[@name='title']"]
+PRICE_XPATHS = [f"//span[{has_class('total-price')}]",
+                f"//span[{has_class('total-price')}]/strong",
+                f"//span[{has_class('prod-sale-price')}]/strong",
+                f"//span[{has_class('prod-price__price')}]"]
+ORIGINAL_PRICE_SELECTORS = ["span.origin-price", "del.base-price"]
+ORIGINAL_PRICE_XPATHS = [f"//span[{has_class('origin-price')}]", f"//del[{has_class('base-price')}]"]
+FEATURE_XPATH = (f"//li[{has_class('prod-description-attribute__item')}]"
+                 f" | //ul[{has_class('prod-description-attribute')}]//li")
+PRICE_REGIONS = list(zip(PRICE_SELECTORS, PRICE_XPATHS))
+ORIGINAL_PRICE_REGIONS = list(zip(ORIGINAL_PRICE_SELECTORS, ORIGINAL_PRICE_XPATHS))
+
+
+def _pick_title(cands: List[Tuple[str, str]]) -> Tuple[Optional[str], str]:
+    # (text, source) candidates; prefer Korean
+    return next((c for c in cands if _RE_KO.search(c[0] or "")), (cands[0] if cands else (None, "")))
+
+
+def norm_image_url(u: str) -> str:
+    if not u:
+        return u
+    # remove query strings that often reduce size
+    u = u.split("?")[0]
+    # prefer jpg over webp if both provided
+    u = u.replace(".webp", ".jpg")
+    return u
+
+
+def _split_desc(desc: str) -> List[str]:
+    out = []
+    for chunk in _RE_FEATURE_SPLIT.split(desc):
+        c = chunk.strip()
+        if 6 <= len(c) <= 90:
+            out.append(c)
+    return out
+
+
+def _record(ctx: ParseContext, title_cands, price, features, feat_src, images) -> ProductRecord:
+    rec = ProductRecord(url=ctx.base_url, site="coupang", price=price, features=features)
+    rec.title, src = _pick_title(title_cands)
+    if rec.title:
+        rec.provenance["title"] = src
+    if price:
+        rec.provenance["price"] = price.source
+    if features:
+        rec.provenance["features"] = feat_src
+    for url, src in images:
+        rec.add_images([url], source=src)
+    if rec.images:
+        rec.provenance["images"] = rec.images[0].source
+    return rec
+
+
+def _parse_bs4(ctx: ParseContext, max_images: int = MAX_IMAGES) -> ProductRecord:
+    soup = ctx.soup
+
+    # --- Title ---
     cands = []
     ogt = soup.find("meta", property="og:title")
     if ogt and ogt.get("content"):
-        cands.append(ogt["content"].strip())
-    for sel in ["h2.prod-buy-header__title", "h1.prod-buy-header__title",
-                "div.prod-buy-header__title", "meta[name='title']"]:
+        cands.append((ogt["content"].strip(), "og"))
+    for sel in TITLE_SELECTORS:
         el = soup.select_one(sel)
         if el:
             c = (el.get("content") or el.get_text(" ", strip=True)).strip()
             if c:
-                cands.append(c)
+                cands.append((c, "selector"))
     if soup.title:
         t = soup.title.get_text(" ", strip=True)
         if t:
-            cands.append(t)
-    def _has_ko(s: str) -> bool:
-        return bool(re.search(r"[가-힣]", s or ""))
-    title = next((t for t in cands if _has_ko(t)), (cands[0] if cands else None))
-    if not title:
-        title = "쿠팡 상품"
+            cands.append((t, "title"))
 
-    # --- Price ---
-    text = soup.get_text("\n", strip=True)
-    price = None
-    m = re.search(r"(?:₩|\b)[\s]*([0-9]{1,3}(?:,[0-9]{3})+)\s*원?", text)
-    if m:
-        price = m.group(0)
-    if not price:
-        for sel in ["span.total-price", "span.total-price > strong",
-                    "span.prod-sale-price > strong", "span.prod-price__price"]:
-            el = soup.select_one(sel)
-            if el:
-                price = el.get_text(" ", strip=True)
-                break
-        if not price:
-            mp = soup.find("meta", attrs={"property": "og:product:price:amount"}) or soup.find("meta", attrs={"itemprop": "price"})
-            if mp and mp.get("content"):
-                price = mp["content"]
+    # --- Price (meta -> JSON-LD -> price selectors -> page text) ---
+    price = find_price(ctx, PRICE_REGIONS, ORIGINAL_PRICE_REGIONS, default_currency="KRW", backend="bs4")
 
     # --- Features ---
     features = []
-    for li in soup.select("li.prod-description-attribute__item, ul.prod-description-attribute li"):
+    feat_src = "selector"
+    for li in soup.select(FEATURE_SELECTOR):
         t = li.get_text(" ", strip=True)
         if 6 <= len(t) <= 90:
             features.append(t)
             if len(features) >= 6:
                 break
     if len(features) < 3:
+        feat_src = "selector" if features else "og"
         ogd = soup.find("meta", property="og:description")
-        desc = ogd.get("content").strip() if ogd and ogd.get("content") else ""
-        for chunk in re.split(r"[•\n\.\|]+", desc):
-            c = chunk.strip()
-            if 6 <= len(c) <= 90:
-                features.append(c)
-    if not features:
-        features = ["핵심 기능 1", "핵심 기능 2", "핵심 기능 3"]
-    features = list(dict.fromkeys(features))[:5]
+        features.extend(_split_desc(ogd.get("content").strip() if ogd and ogd.get("content") else ""))
 
     # --- Images ---
-    def _norm(u: str) -> str:
-        if not u:
-            return u
-        # remove query strings that often reduce size
-        u = u.split("?")[0]
-        # prefer jpg over webp if both provided
-        u = u.replace(".webp", ".jpg")
-        return u
-
     images = []
     for m in soup.find_all("meta", property="og:image"):
         if m.get("content"):
-            images.append(_norm(m["content"]))
+            images.append((norm_image_url(m["content"]), "og"))
     if len(images) < 5:
         for img in soup.select("img"):
             src = img.get("src") or img.get("data-img-src") or ""
             if "coupangcdn.com" in src:
-                images.append(_norm(src))
-            if len(images) >= 8:
+                images.append((norm_image_url(src), "img"))
+            if len(images) >= max_images:
+                break
+    return _record(ctx, cands, price, features, feat_src, images)
+
+
+def _parse_lxml(ctx: ParseContext, max_images: int = MAX_IMAGES) -> Optional[ProductRecord]:
+    """XPath fast path over the raw lxml tree; mirrors _parse_bs4 field by field."""
+    doc = ctx.tree
+    if doc is None:
+        return None
+
+    def first(xp):
+        r = doc.xpath(xp)
+        return r[0] if r else None
+
+    # --- Title ---
+    cands = []
+    ogt = first("//meta[@property='og:title']")
+    if ogt is not None and ogt.get("content"):
+        cands.append((ogt.get("content").strip(), "og"))
+    for xp in TITLE_XPATHS:
+        el = first(xp)
+        if el is not None:
+            c = (el.get("content") or node_text(el, " ")).strip()
+            if c:
+                cands.append((c, "selector"))
+    el = first("//title")
+    if el is not None:
+        t = node_text(el, " ")
+        if t:
+            cands.append((t, "title"))
+
+    # --- Price ---
+    price = find_price(ctx, PRICE_REGIONS, ORIGINAL_PRICE_REGIONS, default_currency="KRW", backend="lxml")
+
+    # --- Features ---
+    features = []
+    feat_src = "selector"
+    for li in doc.xpath(FEATURE_XPATH):
+        t = node_text(li, " ")
+        if 6 <= len(t) <= 90:
+            features.append(t)
+            if len(features) >= 6:
+                break
+    if len(features) < 3:
+        feat_src = "selector" if features else "og"
+        ogd = first("//meta[@property='og:description']")
+        features.extend(_split_desc(ogd.get("content").strip() if ogd is not None and ogd.get("content") else ""))
+
+    # --- Images ---
+    images = [(norm_image_url(c), "og") for c in doc.xpath("//meta[@property='og:image']/@content") if c]
+    if len(images) < 5:
+        for img in doc.iter("img"):
+            src = img.get("src") or img.get("data-img-src") or ""
+            if "coupangcdn.com" in src:
+                images.append((norm_image_url(src), "img"))
+            if len(images) >= max_images:
                 break
-    images = list(dict.fromkeys(images))[:8]
+    return _record(ctx, cands, price, features, feat_src, images)
+
+
+def parse(html: str, ctx: Optional[ParseContext] = None, fill_defaults: bool = True,
+          backend: str = "auto", max_images: int = MAX_IMAGES) -> ProductRecord:
+    """Parse a Coupang product page into a ProductRecord.
+
+    - ctx: shared ParseContext; the tree and page text are reused instead of re-parsed.
+    - fill_defaults=False leaves missing title/features empty (for merging with other extractors).
+    - backend: "auto" (lxml XPath, BeautifulSoup only when it finds no title/images),
+      "lxml" (fast path only) or "bs4".
+    - max_images: image candidates to collect (raise it when the caller ranks them).
+    """
+    ctx = ParseContext.ensure(html, ctx)
+    rec = None
+    if backend in ("auto", "lxml"):
+        if backend == "lxml" and not HAS_LXML:
+            raise RuntimeError("lxml not installed")
+        rec = _parse_lxml(ctx, max_images)
+        if backend == "auto" and rec is not None and not (rec.title or rec.images):
+            rec = None  # fast path missed; let BeautifulSoup have a go
+        if backend == "lxml" and rec is None:
+            rec = ProductRecord(url=ctx.base_url, site="coupang")
+    if rec is None:
+        rec = _parse_bs4(ctx, max_images)
 
-    return CoupangParsed(title, price, features, images)
+    if not rec.title and fill_defaults:
+        rec.title = "쿠팡 상품"
+        rec.provenance["title"] = "default"
+    if not rec.features and fill_defaults:
+        rec.features = ["핵심 기능 1", "핵심 기능 2", "핵심 기능 3"]
+        rec.provenance["features"] = "default"
+    rec.features = list(dict.fromkeys(rec.features))[:5]
+    rec.images = rec.images[:max_images]
+    return rec
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+import glob
+import argparse
+
+from html_context import ParseContext
+import parser_coupang as pc
+import parser_aliexpress as pa
+
+PARSERS = {"coupang": pc.parse, "aliexpress": pa.parse}
+FIELDS = ("title", "price", "features", "images", "specs", "provenance")
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parity_corpus")
+
+
+def sites_for(path: str, site: str = "auto"):
+    """Pick parsers by file-name prefix (coupang_*.html, aliexpress_*.html); otherwise run both."""
+    if site != "auto":
+        return [site]
+    name = os.path.basename(path).lower()
+    hits = [s for s in PARSERS if name.startswith(s)]
+    return hits or list(PARSERS)
+
+
+def compare(html: str, site: str):
+    """Run the bs4 and lxml backends on fresh contexts; return (diffs, bs4_seconds, lxml_seconds)."""
+    fn = PARSERS[site]
+    t0 = time.perf_counter()
+    slow = fn(html, ctx=ParseContext(html), backend="bs4")
+    t1 = time.perf_counter()
+    fast = fn(html, ctx=ParseContext(html), backend="lxml")
+    t2 = time.perf_counter()
+    diffs = []
+    for f in FIELDS:
+        a, b = getattr(slow, f), getattr(fast, f)
+        if a != b:
+            diffs.append((f, a, b))
+    return diffs, t1 - t0, t2 - t1
+
+
+def main():
+    ap = argparse.ArgumentParser(description="lxml 고속 파서와 BeautifulSoup 파서 결과 비교 (저장된 상품 페이지)")
+    ap.add_argument("paths", nargs="*", help="HTML 파일 또는 폴더 (기본: parity_corpus/)")
+    ap.add_argument("--site", default="auto", choices=["auto", *PARSERS], help="파서 지정 (기본: 파일명 접두사로 판단)")
+    args = ap.parse_args()
+
+    files = []
+    for p in (args.paths or [DEFAULT_CORPUS]):
+        if os.path.isdir(p):
+            files.extend(sorted(glob.glob(os.path.join(p, "*.htm*"))))
+        else:
+            files.append(p)
+    if not files:
+        print("[warn] no HTML files found")
+        return 1
+
+    failed = 0
+    tot_slow = tot_fast = 0.0
+    for path in files:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            html = f.read()
+        for site in sites_for(path, args.site):
+            diffs, t_slow, t_fast = compare(html, site)
+            tot_slow += t_slow
+            tot_fast += t_fast
+            status = "OK  " if not diffs else "DIFF"
+            print(f"[{status}] {os.path.basename(path)} ({site}) bs4={t_slow*1000:.1f}ms lxml={t_fast*1000:.1f}ms")
+            for field, a, b in diffs:
+                print(f"    {field}:\n      bs4 : {a!r}\n      lxml: {b!r}")
+            failed += bool(diffs)
+    speedup = (tot_slow / tot_fast) if tot_fast > 0 else 0.0
+    print(f"[info] {len(files)} file(s), {failed} mismatch(es); total bs4={tot_slow:.3f}s lxml={tot_fast:.3f}s (x{speedup:.1f})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+from embedded_state import json_ld_products
+
+# (css, xpath) pairs so the same selector list drives both parser backends
+Selector = Tuple[str, str]
+
+DEFAULT_KRW_RATES: Dict[str, float] = {"USD": 1350.0, "EUR": 1450.0, "JPY": 9.5, "CNY": 190.0}
+
+_NUM = r"[0-9]{1,3}(?:,[0-9]{3})+(?:\.[0-9]+)?|[0-9]+,[0-9]{2}(?![0-9])|[0-9]+(?:\.[0-9]+)?"
+_RE_AMOUNT = re.compile(_NUM)
+_CODES = r"USD|EUR|JPY|CNY|GBP|KRW"
+# currency symbol/code right before the number ...
+_RE_SYMBOL_PRICE = re.compile(r"(US\s*\$|CN¥|[$€¥￥£₩]|\b(?:" + _CODES + r"))\s*(" + _NUM + r")")
+# ... or right after it ('12,49 €', '19.99 USD'); a symbol that starts the next price does not count
+_RE_SYMBOL_SUFFIX = re.compile(r"(" + _NUM + r")\s*([$€¥￥£]|(?:" + _CODES + r")\b)(?!\s*[0-9])")
+_RE_KRW_PRICE = re.compile(r"₩\s*(" + _NUM + r")|(" + _NUM + r")\s*원")
+_RE_KRW_MAN = re.compile(r"(" + _NUM + r")\s*만\s*원")  # '3만원' = 30,000
+# legacy Won pattern (grouped number with optional 원); only used when nothing better matched
+_RE_WON_LOOSE = re.compile(r"(?:₩|\b)[\s]*([0-9]{1,3}(?:,[0-9]{3})+)\s*원?")
+_RE_CODE = re.compile(r"\b(KRW|USD|EUR|JPY|CNY|RMB|GBP)\b", re.I)
+_RE_DECIMAL_COMMA = re.compile(r"[0-9]+,[0-9]{2}")  # '12,49' (fullmatch)
+_RE_SPACE = re.compile(r"\s+")
+
+_SYMBOLS = {"₩": "KRW", "원": "KRW", "$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "￥": "JPY"}
+_DISPLAY = {"USD": "$", "EUR": "€", "GBP": "£", "JPY": "¥", "CNY": "CN¥"}
+
+META_AMOUNT = (("property", "product:price:amount"), ("property", "og:product:price:amount"),
+               ("property", "og:price:amount"), ("itemprop", "price"))
+META_CURRENCY = (("property", "product:price:currency"), ("property", "og:product:price:currency"),
+                 ("property", "og:price:currency"), ("itemprop", "priceCurrency"))
+
+
+@dataclass(slots=True)
+class Price:
+    """Structured price.
+
+    - amount: sale/current price as a number (None if unknown)
+    - currency: ISO code (KRW/USD/EUR/JPY/CNY/GBP) or None
+    - original: list price before discount, when the page shows one
+    - text: price as shown on the page ("" for values built from meta/JSON-LD)
+    - source: meta | jsonld | state | selector | text
+    """
+    amount: Optional[float] = None
+    currency: Optional[str] = None
+    original: Optional[float] = None
+    text: str = ""
+    source: str = ""
+
+    @property
+    def display(self) -> str:
+        return self.text or format_price(self.amount, self.currency)
+
+
+def to_number(s) -> Optional[float]:
+    """'19,900' -> 19900.0, '12,49' -> 12.49 (decimal comma), 89.99 -> 89.99."""
+    if isinstance(s, (int, float)):
+        return float(s)
+    m = _RE_AMOUNT.search(str(s or ""))
+    if not m:
+        return None
+    num = m.group(0)
+    if _RE_DECIMAL_COMMA.fullmatch(num):
+        num = num.replace(",", ".")
+    try:
+        return float(num.replace(",", ""))
+    except ValueError:
+        return None
+
+
+def detect_currency(s: str, default: Optional[str] = None) -> Optional[str]:
+    s = s or ""
+    up = s.upper()
+    if "CN¥" in up or "RMB" in up or "CNY" in up or "元" in s:
+        return "CNY"
+    m = _RE_CODE.search(s)
+    if m:
+        return m.group(1).upper()
+    for sym, cur in _SYMBOLS.items():
+        if sym in s:
+            return cur
+    return default
+
+
+def format_price(amount: Optional[float], currency: Optional[str]) -> str:
+    if amount is None:
+        return ""
+    if currency in (None, "KRW"):
+        return f"{int(round(amount)):,}원"
+    sym = _DISPLAY.get(currency)
+    if sym:
+        return f"{sym}{amount:,.2f}"
+    return f"{amount:,.2f} {currency}"
+
+
+def _first(text: str, patterns) -> Optional[Tuple["re.Match", int, int, float]]:
+    """Earliest match of (regex, number group, symbol group, multiplier) patterns."""
+    best = None
+    for rx, num_g, sym_g, mult in patterns:
+        m = rx.search(text)
+        if m and (best is None or m.start() < best[0].start()):
+            best = (m, num_g, sym_g, mult)
+    return best
+
+
+def _krw_match(text: str) -> Optional[Tuple[int, float, str, str, str]]:
+    """(start, amount, 'KRW', shown, matched span) of the first ₩N / N원 / N만원 price."""
+    hit = _first(text, ((_RE_KRW_PRICE, 0, 0, 1), (_RE_KRW_MAN, 1, 0, 10000)))
+    if hit is None:
+        return None
+    m, num_g, _sym_g, mult = hit
+    amount = to_number(m.group(num_g) if num_g else (m.group(1) or m.group(2)))
+    span = m.group(0).strip()
+    return (m.start(), amount * mult, "KRW", span, span) if amount is not None else None
+
+
+def _symbol_match(text: str) -> Optional[Tuple[int, float, str, str, str]]:
+    """(start, amount, currency, shown, matched span) of the first '$19.99' / 'US $5' or '12,49 €' price."""
+    hit = _first(text, ((_RE_SYMBOL_PRICE, 2, 1, 1), (_RE_SYMBOL_SUFFIX, 1, 2, 1)))
+    if hit is None:
+        return None
+    m, num_g, sym_g, _mult = hit
+    amount = to_number(m.group(num_g))
+    if amount is None:
+        return None
+    sym = _RE_SPACE.sub("", m.group(sym_g))
+    shown = f"{sym}{m.group(num_g)}" if sym_g == 1 else m.group(0).strip()
+    return m.start(), amount, detect_currency(sym), shown, m.group(0).strip()
+
+
+def parse_price_text(s, default_currency: Optional[str] = None, source: str = "text") -> Optional[Price]:
+    """Parse a price string such as 'US $19.99', '19,900원', '₩49,900' or '12,49 €'.
+
+    The amount is the number next to a currency marker ('2개 묶음 12,900원' -> 12900,
+    '약 3만원' -> 30000) and `text` is that price as written; a string without a marker falls
+    back to its first number.
+    """
+    if s is None:
+        return None
+    txt = str(s).strip()
+    hits = [h for h in (_krw_match(txt), _symbol_match(txt)) if h]
+    if hits:
+        _start, amount, currency, _shown, span = min(hits)
+        return Price(amount=amount, currency=currency, text=span, source=source)
+    amount = to_number(txt)
+    if amount is None:
+        return None
+    return Price(amount=amount, currency=detect_currency(txt, default_currency), text=txt, source=source)
+
+
+def price_from_offers(offers, source: str = "jsonld") -> Optional[Price]:
+    """schema.org offers (dict or list) -> Price; AggregateOffer uses lowPrice."""
+    if isinstance(offers, list):
+        offers = next((o for o in offers if isinstance(o, dict)), None)
+    if not isinstance(offers, dict):
+        return None
+    raw = offers.get("price")
+    if raw in (None, ""):
+        raw = offers.get("lowPrice")
+    amount = to_number(raw)
+    if amount is None:
+        return None
+    cur = offers.get("priceCurrency") or detect_currency(str(raw))
+    text = ""
+    if isinstance(raw, str) and any(c in raw for c in "$₩€¥"):
+        text = raw.strip()
+    return Price(amount=amount, currency=cur, text=text, source=source)
+
+
+def scan_text(text: str, prefer: Optional[str] = "KRW") -> Optional[Price]:
+    """Last-resort full-text scan with precompiled patterns.
+
+    prefer="KRW" tries Won prices (₩/원) first, otherwise symbol prices ($/€/¥) first;
+    a bare grouped number (legacy Won pattern) is the final fallback for KRW.
+    """
+    if not text:
+        return None
+
+    for fn in ((_krw_match, _symbol_match) if prefer == "KRW" else (_symbol_match, _krw_match)):
+        hit = fn(text)
+        if hit:
+            _start, amount, currency, shown, _span = hit
+            return Price(amount=amount, currency=currency, text=shown, source="text")
+    if prefer == "KRW":
+        m = _RE_WON_LOOSE.search(text)
+        if m:
+            return Price(amount=to_number(m.group(1)), currency="KRW", text=m.group(0).strip(), source="text")
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Region lookups (both parser backends)
+# ---------------------------------------------------------------------------
+
+def _use_tree(ctx, backend: str) -> bool:
+    if backend == "bs4":
+        return False
+    return ctx.tree is not None
+
+
+def _meta(ctx, tree: bool, attr: str, value: str) -> Optional[str]:
+    if tree:
+        r = ctx.tree.xpath(f"//meta[@{attr}='{value}']/@content")
+        return r[0] if r else None
+    m = ctx.soup.find("meta", attrs={attr: value})
+    return m.get("content") if m else None
+
+
+def _first_text(ctx, tree: bool, sel: Selector) -> Optional[str]:
+    from html_context import node_text  # lazy: the PDF path only needs scan_text (no bs4)
+    css, xp = sel
+    if tree:
+        r = ctx.tree.xpath(xp)
+        return node_text(r[0], " ") if r else None
+    el = ctx.soup.select_one(css)
+    return el.get_text(" ", strip=True) if el else None
+
+
+def _ld_blocks(ctx, tree: bool):
+    if tree:
+        return [s.text for s in ctx.tree.xpath("//script[@type='application/ld+json']")]
+    return ctx.soup.find_all("script", type="application/ld+json")
+
+
+def price_from_meta(ctx, backend: str = "auto", default_currency: Optional[str] = None) -> Optional[Price]:
+    tree = _use_tree(ctx, backend)
+    for attr, value in META_AMOUNT:
+        raw = _meta(ctx, tree, attr, value)
+        amount = to_number(raw) if raw else None
+        if amount is None:
+            continue
+        cur = None
+        for cattr, cvalue in META_CURRENCY:
+            cur = _meta(ctx, tree, cattr, cvalue)
+            if cur:
+                break
+        return Price(amount=amount, currency=(cur or detect_currency(raw, default_currency)), source="meta")
+    return None
+
+
+def price_from_json_ld(ctx, backend: str = "auto") -> Optional[Price]:
+    for prod in json_ld_products(_ld_blocks(ctx, _use_tree(ctx, backend))):
+        p = price_from_offers(prod.get("offers"))
+        if p:
+            return p
+    return None
+
+
+def price_from_selectors(ctx, selectors: Sequence[Selector], default_currency: Optional[str] = None,
+                         backend: str = "auto") -> Optional[Price]:
+    tree = _use_tree(ctx, backend)
+    for sel in selectors:
+        p = parse_price_text(_first_text(ctx, tree, sel), default_currency, source="selector")
+        if p:
+            return p
+    return None
+
+
+def find_price(ctx, selectors: Sequence[Selector] = (), original: Sequence[Selector] = (),
+               default_currency: Optional[str] = "KRW", full_text: bool = True,
+               backend: str = "auto") -> Optional[Price]:
+    """Look for the price in likely regions first, the whole page text last.
+
+    Order: meta tags -> JSON-LD offers -> price selectors -> full-text scan.
+    """
+    p = price_from_meta(ctx, backend, default_currency) or price_from_json_ld(ctx, backend)
+    if p is None and selectors:
+        p = price_from_selectors(ctx, selectors, default_currency, backend)
+    if p is None and full_text:
+        p = scan_text(ctx.text, prefer=default_currency)
+    if p is not None and p.original is None and original:
+        tree = _use_tree(ctx, backend)
+        for osel in original:
+            o = parse_price_text(_first_text(ctx, tree, osel), p.currency)
+            if o and o.amount and p.amount and o.amount > p.amount:
+                p.original = o.amount
+                break
+    return p
+
+
+def to_krw(p: Optional[Price], rates: Optional[Dict[str, float]] = None) -> Optional[int]:
+    """Convert to Won with the given per-unit rates; None if currency/amount unknown."""
+    if p is None or p.amount is None or not p.currency:
+        return None
+    if p.currency == "KRW":
+        return int(round(p.amount))
+    rate = (rates or DEFAULT_KRW_RATES).get(p.currency)
+    if not rate:
+        return None
+    return int(round(p.amount * rate))
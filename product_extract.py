@@ -0,0 +1,227 @@
+import re
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urljoin
+
+from html_context import ParseContext, has_class
+from price import Price, find_price
+from product_record import ProductRecord, ImageRef
+
+_RE_KO = re.compile(r"[가-힣]")
+_RE_FEATURE_SPLIT = re.compile(r"[•\n\.\|]+")
+
+TITLE_META_SELECTORS = [
+    "meta[property='og:title']",
+    "meta[name='og:title']",
+    "meta[name='title']",
+    "meta[property='twitter:title']",
+    "meta[name='twitter:title']",
+    "meta[itemprop='name']",
+]
+# (css, xpath) pairs, see price.find_price
+PRICE_REGIONS = [
+    ("span.total-price", f"//span[{has_class('total-price')}]"),
+    ("span.total-price > strong", f"//span[{has_class('total-price')}]/strong"),
+    ("span.prod-sale-price > strong", f"//span[{has_class('prod-sale-price')}]/strong"),
+    ("span.prod-price__price", f"//span[{has_class('prod-price__price')}]"),
+    ("[itemprop='price']", "//*[@itemprop='price']"),
+]
+
+
+def has_korean(s: str) -> bool:
+    return bool(_RE_KO.search(s or ""))
+
+
+# ---------------------------------------------------------------------------
+# Generic extractors (any product-like page)
+# ---------------------------------------------------------------------------
+
+def generic_title(ctx: ParseContext) -> Optional[str]:
+    """og:title/twitter/meta title > <title> > first heading, preferring Korean text."""
+    soup = ctx.soup
+    candidates = []
+    for sel in TITLE_META_SELECTORS:
+        m = soup.select_one(sel)
+        if m and m.get("content"):
+            t = (m.get("content") or "").strip()
+            if t:
+                candidates.append(t)
+    if soup.title:
+        t = soup.title.get_text(" ", strip=True)
+        if t:
+            candidates.append(t)
+    h = soup.select_one("h1, h2, .product-title, .prod-buy-header__title")
+    if h:
+        t = h.get_text(" ", strip=True)
+        if t:
+            candidates.append(t)
+    return next((t for t in candidates if has_korean(t)), (candidates[0] if candidates else None))
+
+
+def generic_price_info(ctx: ParseContext) -> Optional[Price]:
+    """Meta/JSON-LD first, then common price selectors; full-text Won/currency scan last."""
+    return find_price(ctx, PRICE_REGIONS, default_currency="KRW")
+
+
+def generic_price(ctx: ParseContext) -> Optional[str]:
+    p = generic_price_info(ctx)
+    return p.display if p else None
+
+
+def generic_features(ctx: ParseContext, limit: int = 5) -> List[str]:
+    """Split og:description/description meta, then fall back to list items."""
+    soup = ctx.soup
+    features = []
+    ogd = soup.select_one("meta[property='og:description'], meta[name='og:description'], meta[name='description'], meta[itemprop='description']")
+    desc = ogd.get("content").strip() if ogd and ogd.get("content") else ""
+    for chunk in _RE_FEATURE_SPLIT.split(desc):
+        c = chunk.strip()
+        if 6 <= len(c) <= 90:
+            features.append(c)
+    if len(features) < 3:
+        for li in soup.select("li"):
+            t = li.get_text(" ", strip=True)
+            if 6 <= len(t) <= 90:
+                features.append(t)
+            if len(features) >= 6:
+                break
+    return list(dict.fromkeys(features))[:limit]
+
+
+def generic_images(ctx: ParseContext, max_items: int = 8) -> List[str]:
+    """og:image first, then every <img> (src/data-src/data-img-src), absolute http(s) only."""
+    soup = ctx.soup
+    urls = []
+    for m in soup.find_all("meta", property="og:image"):
+        c = m.get("content")
+        if c:
+            urls.append(urljoin(ctx.base_url, c))
+    for img in soup.select("img"):
+        for k in ("src", "data-src", "data-img-src"):
+            v = img.get(k)
+            if v:
+                urls.append(urljoin(ctx.base_url, v))
+                break
+    seen = set()
+    out = []
+    for u in urls:
+        if not (u.startswith("http://") or u.startswith("https://")):
+            continue
+        if u not in seen:
+            seen.add(u)
+            out.append(u)
+        if len(out) >= max_items:
+            break
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Site-specific extractors (plug-ins)
+# ---------------------------------------------------------------------------
+
+# cached records keep this many images so later calls with a larger limit still hit
+CACHE_MAX_IMAGES = 20
+
+SITE_EXTRACTORS: Dict[str, Callable[[ParseContext, int], ProductRecord]] = {}
+
+
+def register_extractor(site: str):
+    """Decorator: register a site extractor `fn(ctx, max_images) -> ProductRecord`."""
+    def deco(fn):
+        SITE_EXTRACTORS[site] = fn
+        return fn
+    return deco
+
+
+@register_extractor("coupang")
+def extract_coupang(ctx: ParseContext, max_images: int = 8) -> ProductRecord:
+    import parser_coupang as pc
+    return pc.parse(ctx.html, ctx=ctx, fill_defaults=False, max_images=max_images)
+
+
+@register_extractor("aliexpress")
+def extract_aliexpress(ctx: ParseContext, max_images: int = 8) -> ProductRecord:
+    import parser_aliexpress as pa
+    return pa.parse(ctx.html, ctx=ctx, fill_defaults=False, max_images=max_images)
+
+
+def extract_product(html: str, base_url: str = "", site: str = "auto", max_images: int = 8,
+                    ctx: Optional[ParseContext] = None, cache=None) -> ProductRecord:
+    """Parse the page once and merge site-specific and generic results into one ProductRecord.
+
+    Site extractor values win; generic extractors run only for the fields still missing.
+    `provenance` records "<site>:<source>" or "generic" for each field.
+    With a parse_cache.ParseCache, an entry for the same URL/site and HTML digest is
+    returned without parsing; misses are parsed with CACHE_MAX_IMAGES and stored.
+    """
+    if cache is not None:
+        rec = cache.get(base_url, site, html=html)
+        if rec is None:
+            rec = _extract(html, base_url, site, max(max_images, CACHE_MAX_IMAGES), ctx)
+            cache.put(base_url, html, rec, site=site)
+        rec.images = rec.images[:max_images]
+        return rec
+    return _extract(html, base_url, site, max_images, ctx)
+
+
+class PageParser:
+    """extract_product for one URL over several fetch attempts; only the page in use is cached.
+
+    - check(html) / __call__(html): the record for html, parsed once per page (a usability
+      check on a cut-off page and fetch_adaptive's parse share it); neither reads nor
+      writes the cache, so a truncated or incomplete page never replaces the stored record
+    - store(html): cache the record parsed from html (call it for the page that was kept
+      and has every field, e.g. when fetch_adaptive's outcome.ok)
+    """
+
+    def __init__(self, base_url: str, site: str = "auto", max_images: int = 8, cache=None):
+        self.base_url, self.site, self.max_images, self.cache = base_url, site, max_images, cache
+        self._parsed: Dict[str, ProductRecord] = {}  # html -> record with CACHE_MAX_IMAGES images
+
+    def _parse(self, html: str) -> ProductRecord:
+        rec = self._parsed.get(html)
+        if rec is None:
+            n = max(self.max_images, CACHE_MAX_IMAGES) if self.cache is not None else self.max_images
+            rec = self._parsed[html] = _extract(html, self.base_url, self.site, n, None)
+        return rec
+
+    def __call__(self, html: str) -> ProductRecord:
+        rec = self._parse(html)
+        return replace(rec, images=rec.images[:self.max_images])
+
+    check = __call__
+
+    def store(self, html: str) -> None:
+        if self.cache is not None and html in self._parsed:
+            self.cache.put(self.base_url, html, self._parsed[html], site=self.site)
+
+
+def _extract(html: str, base_url: str, site: str, max_images: int,
+             ctx: Optional[ParseContext]) -> ProductRecord:
+    ctx = ParseContext.ensure(html, ctx, base_url=base_url)
+    rec = ProductRecord(url=base_url, site=site)
+    fn = SITE_EXTRACTORS.get(site)
+    if fn is not None:
+        try:
+            data = fn(ctx, max_images)
+        except Exception:
+            data = None
+        if data is not None:
+            for k in ("title", "price", "features", "images", "specs"):
+                if getattr(data, k):
+                    setattr(rec, k, getattr(data, k))
+                    rec.provenance[k] = f"{site}:{data.provenance.get(k, '')}".rstrip(":")
+    generic = {
+        "title": lambda: generic_title(ctx),
+        "price": lambda: generic_price_info(ctx),
+        "features": lambda: generic_features(ctx),
+        "images": lambda: [ImageRef(u, source="generic") for u in generic_images(ctx, max_items=max_images)],
+    }
+    for k, get in generic.items():
+        if getattr(rec, k):
+            continue
+        val = get()
+        if val:
+            setattr(rec, k, val)
+            rec.provenance[k] = "generic"
+    return rec
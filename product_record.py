@@ -0,0 +1,118 @@
+import json
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Iterable, List, Optional
+
+from price import Price
+
+# Optional compact binary serialization
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except Exception:
+    HAS_MSGPACK = False
+
+RECORD_VERSION = 1
+
+
+@dataclass(slots=True)
+class ImageRef:
+    """One product image; width/height/score are filled in when images are probed/ranked."""
+    url: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    score: float = 0.0
+    source: str = ""  # og | img | jsonld | state | ...
+
+    def to_list(self) -> list:
+        return [self.url, self.width, self.height, self.score, self.source]
+
+
+@dataclass(slots=True)
+class ProductRecord:
+    """Parsed product page shared by the parsers, the UI and any cache/batch step.
+
+    - price: structured price.Price (price_text gives the display string)
+    - images: ordered/ranked ImageRef list (image_urls gives plain URLs)
+    - specs: name -> value pairs from the page (spec tables, embedded state)
+    - provenance: field name -> where the value came from (e.g. "jsonld", "coupang:selector")
+    """
+    url: str = ""
+    site: str = ""
+    title: Optional[str] = None
+    price: Optional[Price] = None
+    features: List[str] = field(default_factory=list)
+    images: List[ImageRef] = field(default_factory=list)
+    specs: Dict[str, str] = field(default_factory=dict)
+    provenance: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def price_text(self) -> Optional[str]:
+        return self.price.display if self.price else None
+
+    @property
+    def image_urls(self) -> List[str]:
+        return [im.url for im in self.images]
+
+    def add_images(self, urls: Iterable[str], source: str = "") -> None:
+        """Append URLs not already present (order = priority)."""
+        seen = {im.url for im in self.images}
+        for u in urls:
+            if u and u not in seen:
+                seen.add(u)
+                self.images.append(ImageRef(u, source=source))
+
+    # -- serialization -----------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {
+            "v": RECORD_VERSION,
+            "url": self.url,
+            "site": self.site,
+            "title": self.title,
+            "price": asdict(self.price) if self.price else None,
+            "features": list(self.features),
+            "images": [asdict(im) for im in self.images],
+            "specs": dict(self.specs),
+            "provenance": dict(self.provenance),
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ProductRecord":
+        p = d.get("price")
+        return cls(
+            url=d.get("url") or "",
+            site=d.get("site") or "",
+            title=d.get("title"),
+            price=Price(**p) if isinstance(p, dict) else None,
+            features=list(d.get("features") or []),
+            images=[ImageRef(**im) if isinstance(im, dict) else ImageRef(*im) for im in d.get("images") or []],
+            specs=dict(d.get("specs") or {}),
+            provenance=dict(d.get("provenance") or {}),
+        )
+
+    def to_json(self, **kw) -> str:
+        kw.setdefault("ensure_ascii", False)
+        return json.dumps(self.to_dict(), **kw)
+
+    @classmethod
+    def from_json(cls, s: str) -> "ProductRecord":
+        return cls.from_dict(json.loads(s))
+
+    def to_msgpack(self) -> bytes:
+        """Positional (array) encoding: no repeated key names, cheap to pass between processes."""
+        if not HAS_MSGPACK:
+            raise RuntimeError("msgpack not installed")
+        p = self.price
+        packed_price = [p.amount, p.currency, p.original, p.text, p.source] if p else None
+        return msgpack.packb([RECORD_VERSION, self.url, self.site, self.title, packed_price,
+                              self.features, [im.to_list() for im in self.images],
+                              self.specs, self.provenance], use_bin_type=True)
+
+    @classmethod
+    def from_msgpack(cls, data: bytes) -> "ProductRecord":
+        if not HAS_MSGPACK:
+            raise RuntimeError("msgpack not installed")
+        v, url, site, title, p, feats, imgs, specs, prov = msgpack.unpackb(data, raw=False)
+        return cls(url=url, site=site, title=title, price=Price(*p) if p else None,
+                   features=list(feats), images=[ImageRef(*im) for im in imgs],
+                   specs=dict(specs), provenance=dict(prov))
@@ -0,0 +1,157 @@
+import re
+import json
+import time
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+# Analytics / ad / tracking hosts (subdomains match too)
+AD_DOMAINS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "googleadservices.com", "adservice.google.com", "facebook.net", "connect.facebook.net",
+    "criteo.com", "criteo.net", "scorecardresearch.com", "hotjar.com", "clarity.ms",
+    "amazon-adsystem.com", "analytics.tiktok.com", "mmstat.com", "adnxs.com", "taboola.com",
+)
+# Rough transfer size of an aborted request by resource type (for the savings estimate)
+TYPICAL_BYTES = {"image": 80_000, "media": 1_000_000, "font": 60_000, "script": 40_000,
+                 "stylesheet": 20_000, "xhr": 5_000, "fetch": 5_000}
+# Steps that read rendered <img> sizes, so images must load for them
+IMAGE_STEPS = ("detail", "deep")
+MAX_CAPTURED = 20
+MAX_CAPTURE_BYTES = 2 * 1024 * 1024
+_RE_JSONP = re.compile(r"^\s*[\w.$]+\((.*)\)\s*;?\s*$", re.S)
+
+
+@dataclass(frozen=True)
+class ResourcePolicy:
+    """Which requests a Playwright page may make (applied with page.route).
+
+    - block_types: Playwright resource types to abort (media, font, ...)
+    - block_images: abort images too; only used when no step needs rendered images
+    - block_domains: analytics/ad hosts to abort regardless of type
+    - capture: URL substrings of XHR/fetch JSON responses to keep (product data APIs)
+    """
+    block_types: Tuple[str, ...] = ("media", "font")
+    block_images: bool = True
+    block_domains: Tuple[str, ...] = AD_DOMAINS
+    capture: Tuple[str, ...] = ()
+
+    def for_steps(self, steps: Iterable[str]) -> "ResourcePolicy":
+        if self.block_images and any(s in IMAGE_STEPS for s in steps):
+            return replace(self, block_images=False)
+        return self
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.block_types or (self.block_images and resource_type == "image"):
+            return True
+        if self.block_domains:
+            host = (urlparse(url).hostname or "").lower()
+            labels = host.split(".")
+            return any(".".join(labels[i:]) in self.block_domains for i in range(len(labels) - 1))
+        return False
+
+
+# Loads everything (previous behaviour)
+ALLOW_ALL = ResourcePolicy(block_types=(), block_images=False, block_domains=())
+
+
+@dataclass
+class NetworkStats:
+    """Request counts/bytes for one page (or summed over many with add())."""
+    pages: int = 0
+    requests: int = 0
+    blocked: int = 0
+    blocked_by_type: Dict[str, int] = field(default_factory=dict)
+    saved_bytes: int = 0  # estimate (TYPICAL_BYTES per aborted request)
+    bytes: int = 0  # Content-Length of responses that loaded
+    load_seconds: float = 0.0
+    captured: List[Tuple[str, object]] = field(default_factory=list)  # (url, parsed JSON)
+
+    @property
+    def saved_seconds(self) -> float:
+        """Estimated time saved: blocked bytes at this page's observed throughput."""
+        if not self.bytes or not self.load_seconds:
+            return 0.0
+        return self.saved_bytes / (self.bytes / self.load_seconds)
+
+    def add(self, other: "NetworkStats") -> None:
+        self.pages += other.pages or 1
+        self.requests += other.requests
+        self.blocked += other.blocked
+        for k, n in other.blocked_by_type.items():
+            self.blocked_by_type[k] = self.blocked_by_type.get(k, 0) + n
+        self.saved_bytes += other.saved_bytes
+        self.bytes += other.bytes
+        self.load_seconds += other.load_seconds
+
+    def summary(self) -> str:
+        if not self.requests:
+            return ""
+        kinds = ", ".join(f"{k} {n}" for k, n in sorted(self.blocked_by_type.items(), key=lambda kv: -kv[1]))
+        return (f"blocked {self.blocked}/{self.requests} req ({kinds or '-'}), "
+                f"~{self.saved_bytes / 1e6:.1f} MB / ~{self.saved_seconds:.1f}s saved, "
+                f"loaded {self.bytes / 1e6:.1f} MB in {self.load_seconds:.1f}s")
+
+
+class _Recorder:
+    def __init__(self, policy: ResourcePolicy):
+        self.policy = policy
+        self.stats = NetworkStats(pages=1)
+        self.responses = []
+        self.t0 = time.perf_counter()
+
+    def route(self, route):
+        req = route.request
+        self.stats.requests += 1
+        rtype = req.resource_type
+        if self.policy.blocks(rtype, req.url):
+            self.stats.blocked += 1
+            self.stats.blocked_by_type[rtype] = self.stats.blocked_by_type.get(rtype, 0) + 1
+            self.stats.saved_bytes += TYPICAL_BYTES.get(rtype, 10_000)
+            route.abort()
+        else:
+            route.continue_()
+
+    def response(self, resp):
+        try:
+            self.stats.bytes += int(resp.headers.get("content-length") or 0)
+        except ValueError:
+            pass
+        if (self.policy.capture and len(self.responses) < MAX_CAPTURED
+                and resp.request.resource_type in ("xhr", "fetch")
+                and any(p in resp.url for p in self.policy.capture)):
+            self.responses.append(resp)
+
+
+def install(page, policy: ResourcePolicy) -> _Recorder:
+    """Route every request of `page` through the policy; call finish() when the page is done."""
+    rec = _Recorder(policy)
+    page.route("**/*", rec.route)
+    page.on("response", rec.response)
+    return rec
+
+
+def finish(rec: _Recorder, load_seconds: Optional[float] = None) -> NetworkStats:
+    """Stop timing and read captured JSON bodies (after navigation, outside the event handlers)."""
+    rec.stats.load_seconds = time.perf_counter() - rec.t0 if load_seconds is None else load_seconds
+    for resp in rec.responses:
+        try:
+            body = resp.body()
+        except Exception:
+            continue
+        if len(body) <= MAX_CAPTURE_BYTES:
+            data = parse_json(body.decode("utf-8", "ignore"))
+            if data is not None:
+                rec.stats.captured.append((resp.url, data))
+    return rec.stats
+
+
+def parse_json(text: str):
+    """JSON or JSONP (`callback({...})`, as AliExpress mtop APIs answer); None if neither."""
+    for candidate in (text, (_RE_JSONP.match(text) or [None, None])[1]):
+        if candidate:
+            try:
+                return json.loads(candidate)
+            except ValueError:
+                pass
+    return None
@@ -5,9 +5,10 @@ import sys
 import json
 import math
 import time
+import heapq
 import argparse
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Union
 
 # PDF
 import fitz  # PyMuPDF
@@ -25,6 +26,11 @@ from moviepy.audio.AudioClip import CompositeAudioClip, concatenate_audioclips
 from moviepy.audio import fx as afx
 from moviepy.video.fx.Resize import Resize
 
+from job_workspace import JobWorkspace, CLEANUP_POLICIES
+from ocr_stage import ocr_images, HAS_OCR, DEFAULT_LANG as OCR_LANG
+from price import scan_text, parse_price_text
+from product_record import ProductRecord
+
 # Optional TTS
 try:
     import pyttsx3
@@ -33,6 +39,13 @@ except Exception:
     HAS_TTS = False
 
 W, H = 1080, 1920  # 9:16
+OCR_MIN_CHARS = 20  # pages with less extractable text than this are OCR'd when --ocr is on
+OCR_ZOOM = 300 / 72  # tesseract is most accurate around 300 dpi
+OCR_MAX_SIDE = 3500  # px; caps the OCR render of oversized pages
+JPEG_QUALITY = 90  # used only when page renders are written to disk (cache/debug)
+
+# A slide source is either an image path or an in-memory RGB array (H x W x 3, uint8)
+ImageSource = Union[str, np.ndarray]
 
 
 @dataclass
@@ -40,9 +53,16 @@ class DocumentInfo:
     title: str
     price: Optional[str] = None
     features: List[str] = field(default_factory=list)
-    images: List[str] = field(default_factory=list)
+    images: List[ImageSource] = field(default_factory=list)
     cta: str = "더 알아보기는 링크 클릭!"
 
+    def to_record(self, url: str = "", site: str = "pdf") -> ProductRecord:
+        """Serializable part as a ProductRecord (in-memory page renders are left out)."""
+        rec = ProductRecord(url=url, site=site, title=self.title,
+                            price=parse_price_text(self.price, "KRW"), features=list(self.features))
+        rec.add_images([s for s in self.images if isinstance(s, str)], source=site)
+        return rec
+
 
 @dataclass
 class TemplateConfig:
@@ -219,9 +239,15 @@ def _make_template_overlay(dynamic_caption: Optional[str], tpl: TemplateConfig,
     return overlay
 
 
-def make_image_slide(src_path: str, caption: Optional[str], duration: float, font_path: Optional[str], tpl: Optional[TemplateConfig] = None,
+def _load_slide_image(src: ImageSource) -> Image.Image:
+    if isinstance(src, np.ndarray):
+        return Image.fromarray(src)
+    return Image.open(src).convert("RGB")
+
+
+def make_image_slide(src_path: ImageSource, caption: Optional[str], duration: float, font_path: Optional[str], tpl: Optional[TemplateConfig] = None,
                      highlight: Optional[List[float]] = None) -> ImageClip:
-    img = Image.open(src_path).convert("RGB")
+    img = _load_slide_image(src_path)
     img_w, img_h = img.size
     target_ratio = W / H
     src_ratio = img_w / img_h
@@ -303,7 +329,7 @@ def synthesize_voice(lines: List[str], out_path: str, rate: int = 185) -> Option
         return None
 
 
-def build_timeline(images: List[str], script: Dict[str, List[str]], duration: int, font_path: Optional[str],
+def build_timeline(images: List[ImageSource], script: Dict[str, List[str]], duration: int, font_path: Optional[str],
                    min_slide: float, max_slide: float, tpl: Optional[TemplateConfig] = None,
                    slides_spec: Optional[List[Dict]] = None) -> CompositeVideoClip:
     if slides_spec:
@@ -312,7 +338,7 @@ def build_timeline(images: List[str], script: Dict[str, List[str]], duration: in
             path = spec.get("image") if isinstance(spec, dict) else None
             if not path or not os.path.exists(path):
                 path = images[i % len(images)] if images else None
-            if not path:
+            if path is None:
                 continue
             cap = spec.get("caption") if isinstance(spec, dict) else None
             per = float(spec.get("duration", max(min_slide, min(max_slide, duration / max(1, len(slides_spec))))))
@@ -346,37 +372,179 @@ def build_timeline(images: List[str], script: Dict[str, List[str]], duration: in
     return video
 
 
-def extract_features_from_text(text: str, max_features: int = 5) -> List[str]:
-    lines = [l.strip() for l in text.splitlines()]
-    cands = []
-    for l in lines:
-        if not l:
-            continue
-        if len(l) < 6 or len(l) > 90:
+# Words that usually introduce a selling point in Korean product/brochure copy
+FEATURE_KEYWORDS = (
+    "기능", "특징", "장점", "방수", "무선", "배터리", "충전", "용량", "소재", "사이즈",
+    "크기", "무게", "보증", "할인", "무료", "간편", "휴대", "최대", "고급", "프리미엄",
+)
+_RE_JUNK_LINE = re.compile(r"^[•\-\d\s\.]+$")
+_RE_HANGUL = re.compile(r"[가-힣]")
+_RE_KEYWORDS = re.compile("|".join(FEATURE_KEYWORDS))
+PLACEHOLDER_FEATURES = ["핵심 내용 1", "핵심 내용 2", "핵심 내용 3"]
+
+
+@dataclass
+class TextLine:
+    text: str
+    size: float = 0.0      # max font size of the spans on the line (0 = unknown)
+    bold: bool = False
+    y: float = 0.5         # vertical position on the page, 0 (top) .. 1 (bottom)
+    page: int = 0
+
+
+def collect_text_lines(page: fitz.Page, page_index: int = 0) -> List[TextLine]:
+    """Flatten page.get_text("dict") into one TextLine per visual line, keeping span styling."""
+    out: List[TextLine] = []
+    try:
+        blocks = (page.get_text("dict") or {}).get("blocks", [])
+    except Exception:
+        return out
+    ph = float(page.rect.height) or 1.0
+    for b in blocks:
+        if b.get("type") != 0:
             continue
-        if re.match(r"^[•\-\d\s\.]+$", l):
+        for ln in b.get("lines", []):
+            spans = ln.get("spans") or []
+            text = "".join(sp.get("text", "") for sp in spans).strip()
+            if not text:
+                continue
+            size = max((float(sp.get("size", 0.0)) for sp in spans), default=0.0)
+            # PyMuPDF span flag bit 4 (16) = bold
+            bold = any(int(sp.get("flags", 0)) & 16 for sp in spans)
+            y = float((ln.get("bbox") or (0, 0, 0, 0))[1]) / ph
+            out.append(TextLine(text=text, size=size, bold=bold, y=y, page=page_index))
+    return out
+
+
+def rank_features(lines: List[TextLine], max_features: int = 5) -> List[str]:
+    """Score every candidate line in the document and return the top-k, in one linear pass.
+
+    - Larger-than-average font, bold spans and a higher position on the page score up.
+    - Hangul density and product keywords (FEATURE_KEYWORDS) score up.
+    - Lines repeated on several pages (running headers/footers) score down.
+    """
+    cands: List[tuple] = []
+    repeats: Dict[str, set] = {}
+    size_sum, size_n = 0.0, 0
+    for ln in lines:
+        t = " ".join(ln.text.split())
+        if not (6 <= len(t) <= 90) or _RE_JUNK_LINE.match(t):
             continue
-        cands.append(l)
-        if len(cands) >= max_features * 2:
-            break
-    # dedup
-    dedup = []
-    for c in cands:
-        if c not in dedup:
-            dedup.append(c)
-    return dedup[:max_features] or ["핵심 내용 1", "핵심 내용 2", "핵심 내용 3"]
+        cands.append((t, ln))
+        repeats.setdefault(t, set()).add(ln.page)
+        if ln.size > 0:
+            size_sum += ln.size
+            size_n += 1
+    mean_size = (size_sum / size_n) if size_n else 0.0
+
+    best: Dict[str, float] = {}
+    for t, ln in cands:
+        score = 0.0
+        if mean_size and ln.size:
+            score += min(3.0, ln.size / mean_size)
+        if ln.bold:
+            score += 0.5
+        score += 0.3 * (1.0 - max(0.0, min(1.0, ln.y)))
+        score += 0.5 * (len(_RE_HANGUL.findall(t)) / len(t))
+        score += 0.4 * min(3, len(_RE_KEYWORDS.findall(t)))
+        if len(repeats[t]) > 1:
+            score -= 1.5
+        if t not in best or score > best[t]:
+            best[t] = score
+    top = heapq.nlargest(max_features, best.items(), key=lambda kv: kv[1])
+    return [t for t, _ in top]
+
+
+def ocr_text_lines(text: str, page_index: int = 0) -> List[TextLine]:
+    """Turn OCR output into TextLines (no styling; position from line order)."""
+    rows = [l for l in text.splitlines() if l.strip()]
+    n = max(1, len(rows))
+    return [TextLine(text=l, y=k / n, page=page_index) for k, l in enumerate(rows)]
+
+
+def extract_features_from_text(text: str, max_features: int = 5) -> List[str]:
+    """Rank plain-text lines (no styling available, e.g. OCR output) with rank_features()."""
+    lines = [TextLine(text=l) for l in text.splitlines() if l.strip()]
+    return rank_features(lines, max_features=max_features) or list(PLACEHOLDER_FEATURES)
+
+
+class _PixmapArray(np.ndarray):
+    """ndarray over a pixmap's sample buffer; holds the Pixmap so the memory stays valid."""
+    pixmap = None
+
+
+def pixmap_to_array(pix: "fitz.Pixmap") -> np.ndarray:
+    """Wrap pixmap samples as an (H, W, 3) uint8 array without a JPEG encode/decode.
+
+    Uses the zero-copy samples_mv buffer (PyMuPDF >= 1.18.17; older versions copy via
+    samples). The array keeps a reference to the pixmap, and views of it keep the array.
+    """
+    buf = getattr(pix, "samples_mv", None)
+    if buf is None:
+        buf = pix.samples
+    arr = np.frombuffer(buf, dtype=np.uint8).reshape(pix.height, pix.width, pix.n).view(_PixmapArray)
+    arr.pixmap = pix
+    if pix.n == 1:
+        arr = np.repeat(arr, 3, axis=2)
+    elif pix.n > 3:
+        arr = arr[:, :, :3]
+    return arr
+
+
+def fit_zoom(rect: "fitz.Rect", zoom_cap: float, target: tuple = (W, H), min_zoom: float = 0.25) -> float:
+    """Smallest zoom at which `rect` still covers the target frame after the cover-fit
+    in make_image_slide (so the slide is never upscaled), capped at `zoom_cap`."""
+    if rect.width <= 0 or rect.height <= 0:
+        return zoom_cap
+    need = max(target[0] / rect.width, target[1] / rect.height)
+    return max(min_zoom, min(float(zoom_cap), need))
+
+
+def _render_pixmap(page: fitz.Page, zoom: float, clip: Optional["fitz.Rect"] = None,
+                   save_path: Optional[str] = None, auto_zoom: bool = True) -> np.ndarray:
+    """Rasterize a page (or clip) straight into memory; optionally also write a JPEG copy.
+
+    With auto_zoom, `zoom` acts as a cap and the actual zoom is chosen by fit_zoom().
+    """
+    if auto_zoom:
+        zoom = fit_zoom(clip if clip is not None else page.rect, zoom)
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, alpha=False)
+    if save_path:
+        try:
+            pix.save(save_path, jpg_quality=JPEG_QUALITY)
+        except TypeError:
+            # Older PyMuPDF without jpg_quality
+            pix.save(save_path)
+    return pixmap_to_array(pix)
+
+
+def ocr_zoom(rect: "fitz.Rect") -> float:
+    """Zoom for an OCR render: ~300 dpi, long side at most OCR_MAX_SIDE px."""
+    side = max(rect.width, rect.height)
+    return min(OCR_ZOOM, OCR_MAX_SIDE / side) if side > 0 else OCR_ZOOM
+
+
+def shrink_to_slide(arr: np.ndarray) -> np.ndarray:
+    """Downscale a render larger than needed (e.g. for OCR) to the cover-fit slide size."""
+    h, w = arr.shape[:2]
+    scale = max(W / w, H / h)
+    if scale >= 1.0:
+        return arr
+    size = (max(W, round(w * scale)), max(H, round(h * scale)))
+    return np.asarray(Image.fromarray(np.ascontiguousarray(arr)).resize(size, Image.LANCZOS))
 
 
 def _extract_image_blocks(page: fitz.Page, zoom: float, min_area_ratio: float = 0.05,
-                          margin_ratio: float = 0.01, out_dir: str = "_work_pdf",
-                          page_index: int = 0) -> List[str]:
+                          margin_ratio: float = 0.01, out_dir: Optional[str] = None,
+                          page_index: int = 0, auto_zoom: bool = True) -> List[np.ndarray]:
     """Extract large image blocks from a PDF page by cropping the page to image bboxes.
 
     - Uses page.get_text("rawdict") to find blocks of type image and their bbox.
     - Filters out small images by min_area_ratio (relative to page area).
     - Adds a small margin around the bbox.
+    - Returns in-memory RGB arrays; JPEG copies are written only when out_dir is given.
     """
-    out_paths: List[str] = []
+    out: List[np.ndarray] = []
     try:
         raw = page.get_text("rawdict") or {}
         blocks = raw.get("blocks", [])
@@ -384,8 +552,8 @@ def _extract_image_blocks(page: fitz.Page, zoom: float, min_area_ratio: float =
         blocks = []
 
     page_area = float(page.rect.width * page.rect.height)
-    mat = fitz.Matrix(zoom, zoom)
-    os.makedirs(out_dir, exist_ok=True)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
     idx = 0
     for b in blocks:
         try:
@@ -405,48 +573,82 @@ def _extract_image_blocks(page: fitz.Page, zoom: float, min_area_ratio: float =
             r = r & page.rect
             if r.is_empty:
                 continue
-            pix = page.get_pixmap(matrix=mat, clip=r, alpha=False)
-            fn = os.path.join(out_dir, f"page{page_index+1:02d}_img{idx+1:02d}.jpg")
-            pix.save(fn)
-            out_paths.append(fn)
+            fn = os.path.join(out_dir, f"page{page_index+1:02d}_img{idx+1:02d}.jpg") if out_dir else None
+            out.append(_render_pixmap(page, zoom, clip=r, save_path=fn, auto_zoom=auto_zoom))
             idx += 1
         except Exception:
             continue
-    return out_paths
+    return out
 
 
 def parse_pdf(pdf_path: str, max_pages: int = 6, zoom: float = 2.0,
               mode: str = "page", min_img_ratio: float = 0.05, crop_margin: float = 0.01,
-              max_extract: int = 20) -> DocumentInfo:
+              max_extract: int = 20, work_dir: str = "_work_pdf", save_renders: bool = False,
+              auto_zoom: bool = True, ocr: bool = False, ocr_lang: str = OCR_LANG) -> DocumentInfo:
+    """Read title/text/price/features from a PDF and rasterize slides in memory.
+
+    Slide images are handed to the renderer as RGB arrays; with save_renders=True
+    JPEG copies are also written into work_dir for caching/debugging.
+    With auto_zoom, each page/image block is rendered at the minimal zoom covering
+    1080x1920 and `zoom` is only an upper bound.
+    With ocr=True, pages without a usable text layer are rendered once at OCR resolution
+    (ocr_zoom), OCR'd together in one ocr_images() batch, and the same render (downscaled)
+    is the page's slide in page mode or in the auto fallback.
+    """
     doc = fitz.open(pdf_path)
     title = (doc.metadata.get("title") or "").strip() or os.path.basename(pdf_path)
     all_text = []
-    images = []
-    work_dir = "_work_pdf"
-    os.makedirs(work_dir, exist_ok=True)
+    text_lines: List[TextLine] = []
+    save_dir = work_dir if save_renders else None
+    if save_dir:
+        os.makedirs(save_dir, exist_ok=True)
+
+    def _page_save_path(i: int) -> Optional[str]:
+        return os.path.join(save_dir, f"page_{i+1:02d}.jpg") if save_dir else None
 
-    extracted_images: List[str] = []
+    extracted_images: List[ImageSource] = []
+    ocr_renders: Dict[int, np.ndarray] = {}  # page index -> render at OCR resolution
+    pages_read = 0
     for i, page in enumerate(doc):
         if i >= max_pages:
             break
+        pages_read = i + 1
         text = page.get_text("text")
         all_text.append(text)
+        text_lines.extend(collect_text_lines(page, page_index=i))
+        if ocr and len(text.strip()) < OCR_MIN_CHARS:
+            ocr_renders[i] = _render_pixmap(page, ocr_zoom(page.rect), auto_zoom=False)
         if mode in ("image", "auto"):
             imgs = _extract_image_blocks(page, zoom=zoom, min_area_ratio=min_img_ratio,
-                                         margin_ratio=crop_margin, out_dir=work_dir, page_index=i)
-            for pth in imgs:
-                if pth not in extracted_images:
-                    extracted_images.append(pth)
+                                         margin_ratio=crop_margin, out_dir=save_dir, page_index=i,
+                                         auto_zoom=auto_zoom)
+            extracted_images.extend(imgs)
             if len(extracted_images) >= max_extract:
                 break
-        if mode in ("page",):
-            mat = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
-            fn = os.path.join(work_dir, f"page_{i+1:02d}.jpg")
-            pix.save(fn)
-            images.append(fn)
 
+    if ocr_renders:
+        pages = sorted(ocr_renders)
+        for i, ocr_txt in zip(pages, ocr_images([ocr_renders[i] for i in pages], lang=ocr_lang)):
+            if ocr_txt:
+                all_text.append(ocr_txt)
+                text_lines.extend(ocr_text_lines(ocr_txt, page_index=i))
+
+    def page_slide(i: int) -> np.ndarray:
+        if i not in ocr_renders:
+            return _render_pixmap(doc[i], zoom, save_path=_page_save_path(i), auto_zoom=auto_zoom)
+        arr = shrink_to_slide(ocr_renders.pop(i))
+        if save_dir:
+            Image.fromarray(arr).save(_page_save_path(i), quality=JPEG_QUALITY)
+        return arr
+
+    # If mode is 'image' or 'auto' and we have extracted images, prefer them
+    final_images: List[ImageSource] = extracted_images if mode in ("image", "auto") else []
+    # page mode, or auto mode that found no image blocks: whole pages (OCR renders are reused)
+    if mode == "page" or (mode == "auto" and not final_images):
+        final_images = [page_slide(i) for i in range(pages_read)]
+    ocr_renders.clear()
     doc.close()
+
     combined = "\n".join(all_text)
     # fallback title as first significant line
     if not title:
@@ -459,24 +661,10 @@ def parse_pdf(pdf_path: str, max_pages: int = 6, zoom: float = 2.0,
             title = "문서 요약"
 
     # price detection (optional)
-    price = None
-    m = re.search(r"(?:₩|\b)[\s]*([0-9]{1,3}(?:,[0-9]{3})+)\s*원?", combined)
-    if m:
-        price = m.group(0)
+    p = scan_text(combined, prefer="KRW")
+    price = p.display if p else None
 
-    features = extract_features_from_text(combined, max_features=5)
-    # If mode is 'image' or 'auto' and we have extracted images, prefer them
-    final_images = extracted_images if (mode in ("image", "auto") and extracted_images) else images
-    # Fallback: if auto mode produced nothing, render whole pages
-    if mode == "auto" and not final_images:
-        for i, page in enumerate(doc):
-            if i >= max_pages:
-                break
-            mat = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
-            fn = os.path.join(work_dir, f"page_{i+1:02d}.jpg")
-            pix.save(fn)
-            final_images.append(fn)
+    features = rank_features(text_lines, max_features=5) or extract_features_from_text(combined, max_features=5)
     return DocumentInfo(title=title, price=price, features=features, images=final_images)
 
 
@@ -508,7 +696,8 @@ def main():
     ap.add_argument("--out", type=str, default="out.mp4")
     ap.add_argument("--duration", type=int, default=24)
     ap.add_argument("--max_pages", type=int, default=6, help="사용할 최대 페이지 수")
-    ap.add_argument("--zoom", type=float, default=2.0, help="PDF 렌더링 확대 배율")
+    ap.add_argument("--zoom", type=float, default=2.0, help="PDF 렌더링 최대 확대 배율 (자동 배율의 상한)")
+    ap.add_argument("--fixed_zoom", action="store_true", help="자동 배율 대신 --zoom 값을 그대로 사용")
     ap.add_argument("--music", type=str, help="배경음악 mp3/wav (선택)")
     ap.add_argument("--no_tts", action="store_true", help="TTS 내레이션 비활성화")
     ap.add_argument("--voice_rate", type=int, default=185)
@@ -548,8 +737,28 @@ def main():
                     help="이미지 bbox 여백 비율")
     ap.add_argument("--max_extract", type=int, default=20,
                     help="페이지에서 추출할 최대 이미지 수(전체)")
+    ap.add_argument("--save_renders", action="store_true",
+                    help="PDF 렌더 결과를 작업 폴더에 JPEG로도 저장(캐시/디버깅용)")
+    ap.add_argument("--ocr", action="store_true",
+                    help="텍스트가 없는 PDF 페이지/입력 이미지를 OCR(Tesseract)로 읽어 특징 추출에 사용")
+    ap.add_argument("--ocr_lang", type=str, default=OCR_LANG, help="Tesseract 언어 (기본 kor+eng)")
+    # Per-job work directory
+    ap.add_argument("--work_dir", type=str, default="_work_pdf",
+                    help="작업 디렉터리 루트 (작업마다 하위 폴더 생성)")
+    ap.add_argument("--tmpfs", action="store_true", help="작업 폴더를 RAM(/dev/shm)에 생성")
+    ap.add_argument("--work_cleanup", choices=list(CLEANUP_POLICIES), default="on_success",
+                    help="작업 폴더 정리 정책: always, on_success(실패 시 보존), never")
+    ap.add_argument("--work_retention_hours", type=float, default=24.0,
+                    help="이 시간보다 오래된 작업 폴더 자동 삭제 (0=비활성)")
     args = ap.parse_args()
 
+    with JobWorkspace(root=args.work_dir, use_tmpfs=args.tmpfs, cleanup=args.work_cleanup,
+                      retention_hours=args.work_retention_hours) as ws:
+        print("[info] work dir:", ws.path)
+        run(args, ws)
+
+
+def run(args, ws: JobWorkspace):
     # Build info and images depending on source
     # Optionally load script JSON overrides early
     script_data = None
@@ -572,6 +781,11 @@ def main():
             min_img_ratio=args.min_img_ratio,
             crop_margin=args.crop_margin,
             max_extract=args.max_extract,
+            work_dir=ws.path,
+            save_renders=args.save_renders,
+            auto_zoom=not args.fixed_zoom,
+            ocr=args.ocr,
+            ocr_lang=args.ocr_lang,
         )
         if (script_data and script_data.get("title")) or args.title:
             info.title = (script_data.get("title") if script_data else None) or args.title
@@ -601,7 +815,14 @@ def main():
         # Build minimal info from overrides
         base_title = os.path.splitext(os.path.basename(valid_imgs[0]))[0]
         title = (script_data.get("title") if script_data else None) or args.title or base_title
-        feats = ["핵심 내용 1", "핵심 내용 2", "핵심 내용 3"]
+        feats = list(PLACEHOLDER_FEATURES)
+        if args.ocr:
+            # Detail images often carry all their copy as pixels
+            ocr_txt = "\n".join(ocr_images(valid_imgs, lang=args.ocr_lang))
+            if ocr_txt.strip():
+                feats = extract_features_from_text(ocr_txt, max_features=5)
+            elif not HAS_OCR:
+                print("[warn] --ocr requested but pytesseract is not installed")
         if script_data and isinstance(script_data.get("features"), list):
             feats = script_data["features"]
         if args.feature:
@@ -625,9 +846,7 @@ def main():
             bbox = draw.textbbox((0, 0), txt, font=font)
             tw, th = bbox[2] - bbox[0], bbox[3] - bbox[1]
             draw.text(((W - tw)//2, (H - th)//2), txt, fill=(235,235,235), font=font)
-            work_dir = "_work_pdf"
-            os.makedirs(work_dir, exist_ok=True)
-            fn = os.path.join(work_dir, f"ph_{i+1:02d}.jpg")
+            fn = ws.file(f"ph_{i+1:02d}.jpg")
             im.save(fn, "JPEG", quality=90)
             images.append(fn)
 
@@ -704,11 +923,9 @@ def main():
     # Narration
     narration_path = None
     if not args.no_tts:
-        work_dir = "_work_pdf"
-        os.makedirs(work_dir, exist_ok=True)
         narration_path = synthesize_voice(
             script["hook"] + script["core"] + script["closing"],
-            os.path.join(work_dir, "narration.wav"),
+            ws.file("narration.wav"),
             rate=args.voice_rate,
         )
 
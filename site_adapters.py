@@ -0,0 +1,153 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from html_context import ParseContext
+from product_record import ProductRecord
+from resource_policy import NetworkStats, ResourcePolicy
+import product_extract as pe
+import parser_coupang as pc
+import parser_aliexpress as pa
+
+FETCH_STRATEGIES = ("requests", "playwright")
+
+
+@dataclass
+class AdapterStats:
+    """Per-stage call counts and wall time (fetch / parse / download ...)."""
+    calls: Dict[str, int] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    seconds: Dict[str, float] = field(default_factory=dict)
+    network: NetworkStats = field(default_factory=NetworkStats)  # Playwright pages under the policy
+
+    def record(self, stage: str, sec: float, ok: bool = True) -> None:
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + sec
+        if not ok:
+            self.errors[stage] = self.errors.get(stage, 0) + 1
+
+    def summary(self) -> str:
+        parts = []
+        for stage, n in self.calls.items():
+            avg = self.seconds[stage] / n * 1000
+            err = self.errors.get(stage, 0)
+            parts.append(f"{stage} {n}x avg {avg:.0f}ms" + (f" ({err} failed)" if err else ""))
+        return ", ".join(parts)
+
+
+@dataclass
+class SiteAdapter:
+    """Everything site-specific the fetch pipeline needs.
+
+    - hosts: registrable domains (subdomains match too: m.coupang.com -> coupang.com)
+    - fetch: preferred first fetch ("requests", or "playwright" for JS-rendered pages)
+    - parser: `fn(ctx, max_images) -> ProductRecord` (None = generic extractors only)
+    - normalize_image: canonical/full-size image URL
+    - script: optional external fetcher script run by the UI (e.g. the Selenium downloader)
+    - policy: requests Playwright pages may make (media/fonts/trackers aborted; product APIs captured)
+    """
+    name: str
+    label: str
+    hosts: Tuple[str, ...]
+    fetch: str = "requests"
+    parser: Optional[Callable[[ParseContext, int], ProductRecord]] = None
+    normalize_image: Optional[Callable[[str], str]] = None
+    referer: str = ""
+    script: Optional[str] = None
+    policy: ResourcePolicy = ResourcePolicy()
+    stats: AdapterStats = field(default_factory=AdapterStats)
+
+    @contextmanager
+    def timed(self, stage: str):
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.stats.record(stage, time.perf_counter() - t0, ok)
+
+    def normalize_images(self, urls: List[str]) -> List[str]:
+        if self.normalize_image is None:
+            return list(urls)
+        return list(dict.fromkeys(self.normalize_image(u) for u in urls if u))
+
+
+ADAPTERS: Dict[str, SiteAdapter] = {}
+_HOSTS: Dict[str, str] = {}  # registrable domain -> adapter name
+
+# Used for pages no adapter claims ("auto"): generic extractors, plain requests fetch
+GENERIC = SiteAdapter(name="auto", label="Generic", hosts=())
+
+
+def register_adapter(adapter: SiteAdapter) -> SiteAdapter:
+    """Add an adapter; its parser is also registered with product_extract.extract_product."""
+    if adapter.fetch not in FETCH_STRATEGIES:
+        raise ValueError(f"unknown fetch strategy: {adapter.fetch}")
+    ADAPTERS[adapter.name] = adapter
+    for h in adapter.hosts:
+        _HOSTS[h.lower()] = adapter.name
+    if adapter.parser is not None:
+        pe.register_extractor(adapter.name)(adapter.parser)
+    return adapter
+
+
+def site_names() -> List[str]:
+    return list(ADAPTERS)
+
+
+def get_adapter(name: str) -> SiteAdapter:
+    return ADAPTERS.get(name, GENERIC)
+
+
+def adapter_for_url(url: str) -> SiteAdapter:
+    """Dict lookup of the host and its parent domains (www.x.co.kr -> x.co.kr -> co.kr)."""
+    try:
+        host = (urlparse(url).hostname or "").lower()
+    except Exception:
+        return GENERIC
+    labels = host.split(".")
+    for i in range(len(labels) - 1):
+        name = _HOSTS.get(".".join(labels[i:]))
+        if name:
+            return ADAPTERS[name]
+    return GENERIC
+
+
+def resolve_adapter(site: str, url: str = "") -> SiteAdapter:
+    """Explicit site choice wins; "auto" detects from the URL."""
+    if site and site != "auto":
+        return get_adapter(site)
+    return adapter_for_url(url)
+
+
+# ---------------------------------------------------------------------------
+# Built-in adapters
+# ---------------------------------------------------------------------------
+
+register_adapter(SiteAdapter(
+    name="coupang", label="Coupang", hosts=("coupang.com",),
+    parser=pe.extract_coupang, normalize_image=pc.norm_image_url,
+    referer="https://www.coupang.com/",
+    policy=ResourcePolicy(capture=("/vp/products/", "/next-api/")),
+))
+register_adapter(SiteAdapter(
+    name="aliexpress", label="AliExpress",
+    hosts=("aliexpress.com", "aliexpress.us", "aliexpress.ru", "ali.com", "alibaba.com"),
+    parser=pe.extract_aliexpress, normalize_image=pa.norm_image_url,
+    referer="https://www.aliexpress.com/", script="56.aliexpressmov1ok_pdfok.py",
+    policy=ResourcePolicy(capture=("mtop.aliexpress", "/pdp/")),
+))
+# Client-rendered stores: render first, generic extractors (og/JSON-LD) do the parsing
+register_adapter(SiteAdapter(
+    name="smartstore", label="Naver SmartStore",
+    hosts=("smartstore.naver.com", "brand.naver.com", "shopping.naver.com"),
+    fetch="playwright", referer="https://shopping.naver.com/",
+    policy=ResourcePolicy(capture=("/i/v1/", "/products/")),
+))
+register_adapter(SiteAdapter(
+    name="11st", label="11번가", hosts=("11st.co.kr",),
+    referer="https://www.11st.co.kr/",
+))
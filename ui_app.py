@@ -33,9 +33,22 @@ except Exception:
             pass
 
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+
+from product_extract import PageParser
+from product_record import ImageRef
+from parse_cache import ParseCache, DEFAULT_TTL_HOURS, canonical_url
+from price import parse_price_text, to_krw
+from image_rank import rank_images, DEFAULT_CANDIDATES
+from image_dedup import dedup_images, ImageHashIndex
+from downloader import download_many
+from media_store import MediaStore
+from site_adapters import adapter_for_url, resolve_adapter, site_names, ADAPTERS, GENERIC
+from browser_pool import Profile
+from page_extract import visit
+from batch_ingest import BatchRunner, RenderOptions, read_urls
+from fetch_strategy import FetchStats, fetch_adaptive, missing_fields
+from html_stream import fetch_html
+from http_cache import MODES as CACHE_MODES, get_cache, set_mode
 
 
 APP_TITLE = "Product/PDF/Images → Shorts MP4"
@@ -72,6 +85,10 @@ def _save_ui_prefs():
         "images_fetch_count",
         "images_fetch_timeout",
         "images_prefill_limit",
+        "images_fetch_cache",
+        "images_fetch_cache_ttl",
+        "images_fetch_rank",
+        "images_fetch_dedup",
         # Selection behavior
         "images_use_selected_only",
         # Site choice
@@ -170,547 +187,153 @@ def run_cmd(cmd_list):
     return ret, "".join(logs), duration
 
 
-def fetch_html_requests(url: str, timeout: int = 30) -> str:
+def fetch_html_requests(url: str, timeout: int = 30, referer: str = "", usable=None, min_images: int = 3) -> str:
+    """Streamed GET that stops once og/JSON-LD product metadata has arrived (html_stream).
+
+    usable(html) -> bool checks a cut-off page; False re-reads the whole body.
+    """
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
         "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
-        "Referer": "https://www.coupang.com/",
         "Connection": "keep-alive",
     }
-    r = requests.get(url, headers=headers, timeout=timeout)
-    r.raise_for_status()
-    return r.text
+    if referer:
+        headers["Referer"] = referer
+    res = fetch_html(url, usable=usable, min_images=min_images, headers=headers, timeout=timeout)
+    st.caption(f"HTML: {res.summary()}")
+    return res.html
+
+
+# Natural sizes of images the browser already decoded (url -> (w, h)); ranking skips probing them
+DOM_IMAGE_SIZES: dict = {}
+
+
+def _pw_visit(url: str, steps, profile: Profile, **kw):
+    """page_extract.visit under the URL's adapter resource policy; network savings go to its stats."""
+    adapter = adapter_for_url(url)
+    v = visit(url, steps, profile, policy=adapter.policy, **kw)
+    if v.network is not None:
+        adapter.stats.network.add(v.network)
+        if v.network.requests:
+            st.caption(f"Playwright ({'+'.join(steps)}): {v.network.summary()}"
+                       + (f", {len(v.network.captured)} JSON captured" if v.network.captured else ""))
+    if v.waits.results:
+        st.caption(f"Playwright waits: {v.waits.summary()}")
+    DOM_IMAGE_SIZES.update(v.image_sizes)
+    return v
 
 
 def fetch_html_playwright(url: str, timeout: int = 30, use_stealth: bool = True, mobile: bool = True,
-                          wait_state: str = "networkidle") -> str:
-    try:
-        from playwright.sync_api import sync_playwright
-        try:
-            from playwright_stealth import stealth_sync as pw_stealth
-        except Exception:
-            pw_stealth = None
-    except Exception as e:
-        raise RuntimeError("Playwright not installed") from e
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        # Set headers and UA to encourage Korean content
-        ua_mobile = "Mozilla/5.0 (Linux; Android 13; SM-G998N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36"
-        ua_desktop = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
-        context_args = {
-            "locale": "ko-KR",
-            "ignore_https_errors": True,
-            "user_agent": ua_mobile if mobile else ua_desktop,
-            "extra_http_headers": {
-                "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
-                "Referer": "https://www.coupang.com/",
-            },
-        }
-        if mobile:
-            context_args.update({
-                "viewport": {"width": 375, "height": 667},
-                "is_mobile": True,
-                "device_scale_factor": 2,
-            })
-        ctx = browser.new_context(**context_args)
-        page = ctx.new_page()
-        if use_stealth and pw_stealth:
-            pw_stealth(page)
-        page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
-        try:
-            page.wait_for_load_state(wait_state, timeout=max(1000, (timeout - 3) * 1000))
-        except Exception:
-            pass
-        html = page.content()
-        ctx.close()
-        browser.close()
-        return html
+                          wait_state: str = "domcontentloaded", referer: str = "") -> str:
+    prof = Profile(mobile=mobile, stealth=use_stealth, referer=referer)
+    return _pw_visit(url, ("html",), prof, timeout=timeout, wait_state=wait_state).html or ""
 
 
 def fetch_images_playwright_deep(url: str, timeout: int = 45, use_stealth: bool = True, mobile: bool = True,
-                                 wait_state: str = "networkidle", scrolls: int = 8, delay: float = 0.8):
-    """Open the page with Playwright, scroll/expand sections, and return large image URLs.
+                                 wait_state: str = "domcontentloaded", scrolls: int = 8, delay: float = 0.8,
+                                 referer: str = ""):
+    """Open the page on the shared browser pool, scroll/expand sections, and return large image URLs.
 
     - Scrolls the page gradually to trigger lazy-loading.
     - Clicks common "show more"/description toggles (including Korean labels).
-    - Collects image src/data-src/srcset and filters likely thumbnails/icons.
+    - Collects image src/data-src/srcset and filters likely thumbnails/icons; largest first.
     """
-    try:
-        from playwright.sync_api import sync_playwright
-        try:
-            from playwright_stealth import stealth_sync as pw_stealth
-        except Exception:
-            pw_stealth = None
-    except Exception as e:
-        raise RuntimeError("Playwright not installed") from e
-
-    urls: list[str] = []
-    title: str | None = None
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        ua_mobile = "Mozilla/5.0 (Linux; Android 13; SM-G998N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36"
-        ua_desktop = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
-        context_args = {
-            "locale": "ko-KR",
-            "ignore_https_errors": True,
-            "user_agent": ua_mobile if mobile else ua_desktop,
-            "extra_http_headers": {
-                "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
-                "Referer": "https://www.aliexpress.com/",
-            },
-        }
-        ctx = browser.new_context(**context_args)
-        page = ctx.new_page()
-        if use_stealth and pw_stealth:
-            pw_stealth(page)
-        page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
-        try:
-            page.wait_for_load_state(wait_state, timeout=max(1000, (timeout - 3) * 1000))
-        except Exception:
-            pass
-
-        # Try to open description/details if present (limit 'more' clicks to 2)
-        clicks = 0
-        for sel in [
-            "button:has-text('더보기')",
-            "text=상세보기",
-            "button:has-text('Show More')",
-            "text=Show more",
-            "text=Description",
-            "text=상품 설명",
-            "text=상세",
-            "[data-spm*='desc']",
-            "a[href*='description']",
-        ]:
-            if clicks >= 2:
-                break
-            try:
-                loc = page.locator(sel)
-                if loc.count() > 0:
-                    loc.first.click(timeout=1500)
-                    clicks += 1
-                    page.wait_for_timeout(400)
-            except Exception:
-                continue
-
-        # Gradual scroll to trigger lazy images
-        for i in range(max(1, scrolls)):
-            try:
-                page.evaluate("(step) => { window.scrollTo(0, document.body.scrollHeight * step); }", (i + 1) / max(1, scrolls))
-            except Exception:
-                pass
-            page.wait_for_timeout(int(delay * 1000))
-
-        # Collect image URLs (filter by size and keywords)
-        js = """
-        (function(){
-          const urls = new Set();
-          function pickFromSrcset(srcset){
-            if(!srcset) return null;
-            try {
-              const parts = srcset.split(',').map(s=>s.trim());
-              const last = parts[parts.length-1] || parts[0];
-              const u = (last.split(' ')||[])[0];
-              return u || null;
-            } catch(e){ return null; }
-          }
-          const imgs = Array.from(document.querySelectorAll('img'));
-          for(const img of imgs){
-            const rect = img.getBoundingClientRect();
-            const w = Math.max(img.naturalWidth||0, rect.width||0);
-            const h = Math.max(img.naturalHeight||0, rect.height||0);
-            if(w < 120 || h < 120) continue;
-            let u = img.currentSrc || img.src || img.getAttribute('data-src') || img.getAttribute('data-image') || img.getAttribute('data-original') || pickFromSrcset(img.getAttribute('srcset'));
-            if(!u) continue;
-            if(u.startsWith('data:')) continue;
-            if(/sprite|icon|logo|blank|placeholder/i.test(u)) continue;
-            if(u.startsWith('//')) u = 'https:' + u;
-            urls.add(u);
-          }
-          const title = (document.querySelector('h1')||{}).textContent || document.title || '';
-          return {title: title.trim(), urls: Array.from(urls)};
-        })()
-        """
-        data = page.evaluate(js)
-        urls = list(data.get("urls") or [])
-        title = (data.get("title") or "").strip() or None
-
-        ctx.close()
-        browser.close()
-    return title, urls
+    prof = Profile(mobile=mobile, stealth=use_stealth, referer=referer)
+    v = _pw_visit(url, ("deep",), prof, timeout=timeout, wait_state=wait_state, scrolls=scrolls, delay=delay)
+    return v.title, v.deep_urls
 
 
 def fetch_detail_only_playwright(url: str, timeout: int = 45, use_stealth: bool = True, mobile: bool = True,
-                                 wait_state: str = "networkidle"):
+                                 wait_state: str = "domcontentloaded", with_specs: bool = False):
     """Open URL, click a single 'more/description' control, then extract images and text ONLY from
     the product description/detail container.
 
-    Returns: (title, desc_text, image_urls, overview_lines)
+    Returns: (title, desc_text, image_urls, overview_lines), plus spec lines when with_specs
+    (read in the same navigation instead of a second page load).
     """
-    try:
-        from playwright.sync_api import sync_playwright
-        try:
-            from playwright_stealth import stealth_sync as pw_stealth
-        except Exception:
-            pw_stealth = None
-    except Exception as e:
-        raise RuntimeError("Playwright not installed") from e
-
-    title: str | None = None
-    desc_text: str | None = None
-    urls: list[str] = []
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        ua_mobile = "Mozilla/5.0 (Linux; Android 13; SM-G998N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36"
-        ua_desktop = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
-        context_args = {
-            "locale": "ko-KR",
-            "ignore_https_errors": True,
-            "user_agent": ua_mobile if mobile else ua_desktop,
-            "extra_http_headers": {
-                "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
-            },
-        }
-        ctx = browser.new_context(**context_args)
-        page = ctx.new_page()
-        if use_stealth and pw_stealth:
-            pw_stealth(page)
-        page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
-        try:
-            page.wait_for_load_state(wait_state, timeout=max(1000, (timeout - 3) * 1000))
-        except Exception:
-            pass
-
-        # Click only once on a likely 'more/description' control
-        for sel in [
-            "button:has-text('더보기')",
-            "text=상세보기",
-            "button:has-text('Show More')",
-            "text=Description",
-            "text=상품 설명",
-            "text=상세",
-            "[data-spm*='desc']",
-            "a[href*='description']",
-        ]:
-            try:
-                loc = page.locator(sel)
-                if loc.count() > 0:
-                    loc.first.click(timeout=1500)
-                    page.wait_for_timeout(500)
-                    break
-            except Exception:
-                continue
-
-        # Attempt to locate a description container
-        container = None
-        for sel in [
-            "div.detail-desc-decorate",
-            "div.product-description",
-            "div.detail-desc",
-            "div#product-description",
-            "div#product-detail",
-            "div[id*='product-description']",
-            "div[id*='description']",
-            "div[class*='product-detail']",
-        ]:
-            try:
-                loc = page.locator(sel)
-                if loc.count() > 0:
-                    container = loc.first
-                    break
-            except Exception:
-                continue
-
-        # Evaluate inside container
-        if container and container.count() > 0:
-            data = container.evaluate("(el)=>{\n                const urls = new Set();\n                const pickFromSrcset = (srcset)=>{\n                  if(!srcset) return null;\n                  try{ const parts = srcset.split(',').map(s=>s.trim());\n                        const last = parts[parts.length-1]||parts[0];\n                        return (last.split(' ')||[])[0]||null; }catch(e){return null;}\n                };\n                const imgs = el.querySelectorAll('img');\n                for(const img of imgs){\n                  const rect = img.getBoundingClientRect();\n                  const w = Math.max(img.naturalWidth||0, rect.width||0);\n                  const h = Math.max(img.naturalHeight||0, rect.height||0);\n                  if(w < 120 || h < 120) continue;\n                  let u = img.currentSrc || img.src || img.getAttribute('data-src') || img.getAttribute('data-image') || img.getAttribute('data-original') || pickFromSrcset(img.getAttribute('srcset'));\n                  if(!u) continue;\n                  if(u.startsWith('data:')) continue;\n                  if(/sprite|icon|logo|blank|placeholder/i.test(u)) continue;\n                  if(u.startsWith('//')) u = 'https:' + u;\n                  urls.add(u);\n                }\n                const text = el.innerText || '';\n                return { urls: Array.from(urls), text: text.trim() };\n            }")
-            urls = list(data.get("urls") or [])
-            desc_text = (data.get("text") or "").strip() or None
-            try:
-                data2 = container.evaluate("(el)=>{\n                  // Collect text before first image as overview\n                  function splitLines(s){ if(!s) return []; return s.split(/[•\\n\\.\\|\u30fb\u00b7]+/).map(x=>x.trim()).filter(x=>x.length>=6 && x.length<=120); }\n                  let overviewText = '';\n                  const walker = document.createTreeWalker(el, NodeFilter.SHOW_ELEMENT, null);\n                  let node; let reachedImg = false;\n                  while((node = walker.nextNode())){\n                    const tag = (node.tagName||'').toLowerCase();\n                    if(tag === 'img') { reachedImg = true; break; }\n                    if(node.querySelector && node.querySelector('img')) { reachedImg = true; break; }\n                    if(['p','li','div','span','h1','h2','h3','h4','section'].includes(tag)) {\n                      const t = (node.innerText||'').trim();\n                      if(t) overviewText += (overviewText? '\\n' : '') + t;\n                    }\n                  }\n                  return { overview: splitLines(overviewText) };\n                }")
-                overview_lines = list(data2.get('overview') or [])
-            except Exception:
-                overview_lines = []
-        # Title from h1 or document
-        try:
-            title = page.evaluate("() => (document.querySelector('h1')?.textContent || document.title || '').trim()") or None
-        except Exception:
-            title = None
-
-        ctx.close()
-        browser.close()
-    return title, desc_text, urls, (overview_lines if 'overview_lines' in locals() else [])
+    steps = ("detail", "specs") if with_specs else ("detail",)
+    v = _pw_visit(url, steps, Profile(mobile=mobile, stealth=use_stealth), timeout=timeout, wait_state=wait_state)
+    if with_specs:
+        return v.title, v.desc_text, v.detail_urls, v.overview, v.specs
+    return v.title, v.desc_text, v.detail_urls, v.overview
 
 
 def fetch_specifications_playwright(url: str, timeout: int = 45, use_stealth: bool = True, mobile: bool = True,
-                                    wait_state: str = "networkidle") -> list[str]:
+                                    wait_state: str = "domcontentloaded") -> list[str]:
     """Extract specification lines (key: value or bullet items) from product pages.
 
-    Heuristics:
+    Heuristics (page_extract.JS_SPECS):
     - Look for elements with classes containing 'spec', 'product-props', 'specification'.
     - Extract table rows (th/td or td pairs) and list items.
     - Limit to reasonable line lengths to avoid noise.
     """
-    try:
-        from playwright.sync_api import sync_playwright
-        try:
-            from playwright_stealth import stealth_sync as pw_stealth
-        except Exception:
-            pw_stealth = None
-    except Exception as e:
-        raise RuntimeError("Playwright not installed") from e
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        ua_mobile = "Mozilla/5.0 (Linux; Android 13; SM-G998N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36"
-        ua_desktop = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
-        context_args = {
-            "locale": "ko-KR",
-            "ignore_https_errors": True,
-            "user_agent": ua_mobile if mobile else ua_desktop,
-            "extra_http_headers": {
-                "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
-            },
-        }
-        ctx = browser.new_context(**context_args)
-        page = ctx.new_page()
-        if use_stealth and pw_stealth:
-            pw_stealth(page)
-        page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
-        try:
-            page.wait_for_load_state(wait_state, timeout=max(1000, (timeout - 3) * 1000))
-        except Exception:
-            pass
-
-        # Click likely spec/detail toggles once to reveal content
-        for sel in [
-            "text=Specifications", "text=Specification", "text=스펙", "text=제품 스펙", "text=상품 스펙",
-            "button:has-text('더보기')", "text=상세보기",
-        ]:
-            try:
-                loc = page.locator(sel)
-                if loc.count() > 0:
-                    loc.first.click(timeout=1500)
-                    page.wait_for_timeout(400)
-                    break
-            except Exception:
-                continue
-
-        js = """
-        (function(){
-          const out = [];
-          const MAX = 48;
-          function add(line){
-            if(!line) return;
-            const t = String(line).trim();
-            if(t.length < 3 || t.length > 100) return;
-            if(out.indexOf(t) === -1) out.push(t);
-          }
-          // Tables under spec-like containers
-          const scopes = Array.from(document.querySelectorAll('[class*="spec"], [class*="product-prop"], [class*="product-spec"], [class*="specification"]'));
-          for(const sc of scopes){
-            // Rows
-            const rows = sc.querySelectorAll('tr');
-            for(const r of rows){
-              const ths = r.querySelectorAll('th');
-              const tds = r.querySelectorAll('td');
-              if(ths.length && tds.length){
-                for(let i=0;i<Math.min(ths.length, tds.length, MAX);i++){
-                  const k = ths[i].innerText.trim();
-                  const v = tds[i].innerText.trim();
-                  if(k && v) add(k + ': ' + v);
-                }
-              } else if(tds.length >= 2){
-                for(let i=0;i<tds.length-1 && i<MAX;i+=2){
-                  const k = tds[i].innerText.trim();
-                  const v = tds[i+1].innerText.trim();
-                  if(k && v) add(k + ': ' + v);
-                }
-              } else {
-                const t = r.innerText.trim();
-                add(t);
-              }
-            }
-            // List items
-            const lis = sc.querySelectorAll('li');
-            for(const li of lis){
-              const t = li.innerText.trim();
-              add(t);
-            }
-          }
-          return out.slice(0, 40);
-        })()
-        """
-        try:
-            lines = page.evaluate(js)
-        except Exception:
-            lines = []
-
-        ctx.close()
-        browser.close()
-    # Simple cleanup
-    cleaned = []
-    for ln in lines or []:
-        s = " ".join((ln or "").split())
-        if 3 <= len(s) <= 100 and s not in cleaned:
-            cleaned.append(s)
-    return cleaned[:40]
-
-
-def parse_images_from_html(html: str, base_url: str, max_items: int = 8):
-    soup = BeautifulSoup(html, "lxml")
-    # Title (robust with Korean preference)
-    candidates = []
-    for sel in [
-        "meta[property='og:title']",
-        "meta[name='og:title']",
-        "meta[name='title']",
-        "meta[property='twitter:title']",
-        "meta[name='twitter:title']",
-        "meta[itemprop='name']",
-    ]:
-        m = soup.select_one(sel)
-        if m and m.get("content"):
-            t = (m.get("content") or "").strip()
-            if t:
-                candidates.append(t)
-    if soup.title:
-        t = soup.title.get_text(" ", strip=True)
-        if t:
-            candidates.append(t)
-    h = soup.select_one("h1, h2, .product-title, .prod-buy-header__title")
-    if h:
-        t = h.get_text(" ", strip=True)
-        if t:
-            candidates.append(t)
-    def _has_korean(s: str) -> bool:
-        import re as _re
-        return bool(_re.search(r"[가-힣]", s or ""))
-    title = next((t for t in candidates if _has_korean(t)), (candidates[0] if candidates else None))
-
-    urls = []
-    # og:image first
-    for m in soup.find_all("meta", property="og:image"):
-        c = m.get("content")
-        if c:
-            urls.append(urljoin(base_url, c))
-    # then all <img>
-    for img in soup.select("img"):
-        for k in ("src", "data-src", "data-img-src"):
-            v = img.get(k)
-            if v:
-                urls.append(urljoin(base_url, v))
-                break
-    # dedup and filter http(s)
-    seen = set()
-    out = []
-    for u in urls:
-        if not (u.startswith("http://") or u.startswith("https://")):
-            continue
-        if u not in seen:
-            seen.add(u)
-            out.append(u)
-        if len(out) >= max_items:
-            break
-    return title, out
-
-
-def parse_product_text_from_html(html: str):
-    """Parse title, price, features from generic product-like HTML.
-
-    - Title: og:title > <title>
-    - Price: Won patterns like 49,900원 or ₩49,900; or common price selectors.
-    - Features: Split og:description or list items.
-    """
-    soup = BeautifulSoup(html, "lxml")
-    # Title (robust with Korean preference)
-    candidates = []
-    for sel in [
-        "meta[property='og:title']",
-        "meta[name='og:title']",
-        "meta[name='title']",
-        "meta[property='twitter:title']",
-        "meta[name='twitter:title']",
-        "meta[itemprop='name']",
-    ]:
-        m = soup.select_one(sel)
-        if m and m.get("content"):
-            t = (m.get("content") or "").strip()
-            if t:
-                candidates.append(t)
-    if soup.title:
-        t = soup.title.get_text(" ", strip=True)
-        if t:
-            candidates.append(t)
-    h = soup.select_one("h1, h2, .product-title, .prod-buy-header__title")
-    if h:
-        t = h.get_text(" ", strip=True)
-        if t:
-            candidates.append(t)
-    def _has_korean(s: str) -> bool:
-        import re as _re
-        return bool(_re.search(r"[가-힣]", s or ""))
-    title = next((t for t in candidates if _has_korean(t)), (candidates[0] if candidates else None))
-
-    # Price
-    import re as _re
-    text = soup.get_text("\n", strip=True)
-    price = None
-    m = _re.search(r"(?:₩|\b)[\s]*([0-9]{1,3}(?:,[0-9]{3})+)\s*원?", text)
-    if m:
-        price = m.group(0)
-    if not price:
-        for sel in [
-            "span.total-price",
-            "span.total-price > strong",
-            "span.prod-sale-price > strong",
-            "span.prod-price__price",
-        ]:
-            el = soup.select_one(sel)
-            if el:
-                price = el.get_text(" ", strip=True)
-                break
-        if not price:
-            mp = soup.find("meta", attrs={"itemprop": "price"}) or soup.find("meta", attrs={"property": "og:product:price:amount"})
-            if mp and mp.get("content"):
-                price = mp["content"]
-
-    # Features
-    features = []
-    ogd = soup.select_one("meta[property='og:description'], meta[name='og:description'], meta[name='description'], meta[itemprop='description']")
-    desc = ogd.get("content").strip() if ogd and ogd.get("content") else ""
-    for chunk in _re.split(r"[•\n\.\|]+", desc):
-        c = chunk.strip()
-        if 6 <= len(c) <= 90:
-            features.append(c)
-    if len(features) < 3:
-        for li in soup.select("li"):
-            t = li.get_text(" ", strip=True)
-            if 6 <= len(t) <= 90:
-                features.append(t)
-            if len(features) >= 6:
-                break
-    # Dedup and limit
-    dedup = []
-    for f in features:
-        if f not in dedup:
-            dedup.append(f)
-    features = dedup[:5] if dedup else []
-    return title, price, features
+    v = _pw_visit(url, ("specs",), Profile(mobile=mobile, stealth=use_stealth), timeout=timeout, wait_state=wait_state)
+    return v.specs
 
 
 def detect_site(url: str) -> str:
-    try:
-        host = urlparse(url).netloc.lower()
-    except Exception:
-        return "auto"
-    if "coupang.com" in host:
-        return "coupang"
-    if any(h in host for h in ["aliexpress.com", "ali.com", "alibaba.com", "aliexpress"]):
-        return "aliexpress"
-    return "auto"
+    """Registered site adapter name for the URL's host, or "auto" (see site_adapters)."""
+    return adapter_for_url(url).name
+
+
+def fetch_product(url: str, site: str, max_images: int, timeout: int, use_playwright: bool,
+                  pw_stealth: bool, pw_mobile: bool, pw_wait: str, use_cache: bool = True,
+                  cache_ttl_hours: float = DEFAULT_TTL_HOURS):
+    """Fetch and parse a product page into a ProductRecord via the URL's site adapter.
+
+    Plain HTTP is tried first; with use_playwright the browser is used only when the page
+    lacks product data (title, price, a few images) or when the per-domain fetch stats show
+    that requests does not work for the site (fetch_strategy).
+    With use_cache, a parse-cache entry younger than the TTL is returned without fetching;
+    a re-fetched page that has title, price and images replaces the entry (an incomplete one
+    is never cached, so the next call escalates again).
+    Returns None (after showing the error) when nothing could be fetched.
+    """
+    adapter = resolve_adapter(site, url)
+    site = adapter.name
+    cache = ParseCache(ttl_hours=cache_ttl_hours) if use_cache else None
+    if cache is not None:
+        rec = cache.get(url, site)
+        if rec is not None:
+            rec.images = rec.images[:max_images]
+            st.caption("Parse cache hit (no re-fetch)")
+            return rec
+
+    min_images = min(3, int(max_images))
+
+    def via_requests(u):
+        with adapter.timed("fetch"):
+            return fetch_html_requests(u, timeout=int(timeout), referer=adapter.referer, min_images=min_images,
+                                       usable=lambda html: not missing_fields(page_parser.check(html), min_images))
+
+    def via_playwright(u):
+        with adapter.timed("fetch"):
+            return fetch_html_playwright(u, timeout=int(timeout), use_stealth=pw_stealth, mobile=pw_mobile, wait_state=pw_wait,
+                                         referer=adapter.referer)
+
+    # Site + generic extractors share one tree/text; a cut-off page checked by via_requests is
+    # not parsed again, and only a page with every field goes into the parse cache
+    page_parser = PageParser(url, site=site, max_images=int(max_images), cache=cache)
+
+    def parse(html):
+        with adapter.timed("parse"):
+            return page_parser(html)
+
+    fetchers = {"requests": via_requests}
+    if use_playwright:
+        fetchers["playwright"] = via_playwright
+    out = fetch_adaptive(url, fetchers, parse, prefer=adapter.fetch, min_images=min_images,
+                         stats=FetchStats())
+    if out.ok:
+        page_parser.store(out.html)
+    if out.record is None:
+        errs = [a.error for a in out.attempts if a.error]
+        if errs:
+            st.error(f"Fetch failed: {errs[-1]}")
+        return None
+    st.caption(f"Fetch: {out.summary()}")
+    return out.record
 
 
 def refine_features(features):
@@ -727,52 +350,58 @@ def refine_features(features):
 
 
 def convert_price_to_krw(price: str, usd: float = 1350.0, eur: float = 1450.0, jpy: float = 9.5, cny: float = 190.0):
-    import re as _re
-    if not price:
-        return price
-    s = price.strip()
-    # Detect currency and amount
-    sym = None
-    if s.startswith("$") or "USD" in s.upper():
-        sym = "USD"
-    elif s.startswith("€") or "EUR" in s.upper():
-        sym = "EUR"
-    elif s.startswith("¥") or "JPY" in s.upper():
-        sym = "JPY"
-    elif s.startswith("¥") or "CNY" in s.upper() or "RMB" in s.upper():
-        sym = "CNY"
-    # Extract number
-    m = _re.search(r"([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]+)?)", s)
-    if not sym or not m:
+    """Foreign price text -> "약 N원"; Won or unrecognized prices are returned unchanged."""
+    p = parse_price_text(price) if price else None
+    if p is None or p.currency in (None, "KRW"):
         return price
-    amt = float(m.group(1).replace(",", ""))
-    rate = {"USD": usd, "EUR": eur, "JPY": jpy, "CNY": cny}.get(sym)
-    if not rate:
+    krw = to_krw(p, {"USD": usd, "EUR": eur, "JPY": jpy, "CNY": cny})
+    if krw is None:
         return price
-    krw = int(round(amt * rate, 0))
-    # format with thousands
-    krw_str = f"{krw:,}원"
-    return f"약 {krw_str}"
+    return f"약 {krw:,}원"
+
+
+def pick_images(urls, n: int, rank: bool = False):
+    """First n image URLs, or with rank the best n after header-only size probing (9:16 fit).
+
+    Sizes the browser reported (DOM_IMAGE_SIZES) are used as-is instead of probing.
+    """
+    urls = list(urls or [])
+    if not rank:
+        return urls[:n]
+    try:
+        refs = [ImageRef(u, *DOM_IMAGE_SIZES.get(u, (None, None)), source="dom" if u in DOM_IMAGE_SIZES else "")
+                for u in urls]
+        return [ref.url for ref in rank_images(refs, top_n=n)]
+    except Exception:
+        return urls[:n]
+
 
+def download_images(urls, subdir="images_fetch", dedup=None, product=""):
+    """Download URLs into UPLOAD_DIR/subdir; near-duplicate pictures are collapsed (hash index).
 
-def download_images(urls, subdir="images_fetch"):
-    paths = []
-    os.makedirs(os.path.join(UPLOAD_DIR, subdir), exist_ok=True)
-    headers = {"User-Agent": "Mozilla/5.0 Chrome/124.0"}
-    for i, u in enumerate(urls, 1):
+    Files are fetched concurrently over one pooled session (bounded per host, retried with
+    backoff) through the media store: a URL fetched before is revalidated (304 -> no body)
+    and each file is a hard link to its content-addressed blob. Paths follow the input order.
+    dedup=None follows the "Dedup images" toggle. A picture already downloaded in an earlier
+    run for the same product (or byte-for-byte the same picture) at the same or higher
+    resolution is returned as that earlier file instead.
+    """
+    stamp = int(time.time() * 1000)
+    store = MediaStore()
+    results = download_many(list(urls), os.path.join(UPLOAD_DIR, subdir),
+                            lambda i, ext: f"fetched_{stamp}_{i}{ext}", workers=8, per_host=4, store=store)
+    paths = [r.path for r in results if r.ok]
+    try:
+        store.gc()
+    except Exception:
+        pass
+    if dedup is None:
+        dedup = bool(st.session_state.get("images_fetch_dedup", True))
+    if dedup and paths:
         try:
-            r = requests.get(u, headers=headers, timeout=20)
-            r.raise_for_status()
-            ext = ".jpg"
-            ct = r.headers.get("content-type", "").lower()
-            if "png" in ct:
-                ext = ".png"
-            fn = os.path.join(UPLOAD_DIR, subdir, f"fetched_{int(time.time()*1000)}_{i}{ext}")
-            with open(fn, "wb") as f:
-                f.write(r.content)
-            paths.append(fn)
+            paths = dedup_images(paths, index=ImageHashIndex(), product=canonical_url(product) if product else "")
         except Exception:
-            continue
+            pass
     return paths
 
 
@@ -1050,6 +679,11 @@ def main():
         with colr4:
             cny_rate = st.number_input("CNY KRW", 100.0, 400.0, st.session_state.get("rate_cny", 190.0), 5.0, key="rate_cny")
 
+        st.markdown("---")
+        cache_mode = st.selectbox("HTTP cache", CACHE_MODES, index=CACHE_MODES.index(get_cache().mode), key="http_cache_mode",
+                                  help="record: 받은 HTML/이미지/Playwright 결과를 .http_cache/에 저장, replay: 네트워크 없이 저장된 응답만 사용(개발·벤치마크용)")
+        set_mode(cache_mode)
+
         st.markdown("---")
         st.caption("Save/Load environment (font/TTS/duration/KRW rates/template flag)")
         col_env1, col_env2 = st.columns(2)
@@ -1273,7 +907,7 @@ def main():
                     st.error(f"Failed to load all: {e}")
 
     # Unify to use shorts_maker2.py only
-    tab1, tab2, tab3 = st.tabs(["Images", "PDF", "Template"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Images", "PDF", "Template", "Batch"])
 
     with tab1:
         st.subheader("Images → MP4 (shorts_maker2.py)")
@@ -1478,33 +1112,53 @@ def main():
         auto_site = detect_site(url_fetch) if url_fetch else "auto"
         # Respect saved preference if present
         initial_site = st.session_state.get("images_fetch_site", auto_site)
+        site_opts = ["auto", *site_names()]
         site_sel = st.selectbox(
             "Site",
-            ["auto", "coupang", "aliexpress"],
-            index=["auto","coupang","aliexpress"].index(initial_site if initial_site in ["auto","coupang","aliexpress"] else auto_site),
+            site_opts,
+            index=site_opts.index(initial_site if initial_site in site_opts else auto_site),
+            format_func=lambda n: ADAPTERS[n].label if n in ADAPTERS else n,
             key="images_fetch_site",
             on_change=_save_ui_prefs,
         )
+        site_adapter = resolve_adapter(site_sel, url_fetch)
         if url_fetch:
             st.caption(f"Detected: {auto_site}")
+        used_adapters = [a for a in (*ADAPTERS.values(), GENERIC) if a.stats.calls]
+        if used_adapters:
+            with st.expander("Site adapter timings"):
+                for a in used_adapters:
+                    st.caption(f"{a.label}: {a.stats.summary()}")
+                    if a.stats.network.requests:
+                        st.caption(f"{a.label} network ({a.stats.network.pages} pages): {a.stats.network.summary()}")
+                for dom, strat, att, rate, avg in FetchStats().rows():
+                    st.caption(f"{dom} · {strat}: {rate:.0%} of ~{att:.0f} recent fetches ok, avg {avg:.1f}s")
         colf1, colf2, colf3 = st.columns(3)
         with colf1:
             fetch_count = st.slider("Fetch count", 2, 10, int(st.session_state.get("images_fetch_count", 4)), 1, key="images_fetch_count", on_change=_save_ui_prefs)
             fetch_timeout = st.number_input("Timeout (s)", 5, 120, int(st.session_state.get("images_fetch_timeout", 30)), key="images_fetch_timeout", on_change=_save_ui_prefs)
+            use_parse_cache = st.checkbox("Parse cache", value=bool(st.session_state.get("images_fetch_cache", True)), key="images_fetch_cache", on_change=_save_ui_prefs,
+                                          help="같은 상품 URL(정규화)을 TTL 안에 다시 누르면 재요청/재파싱 없이 캐시 결과를 사용합니다.")
+            parse_cache_ttl = st.number_input("Cache TTL (h)", 0.1, 168.0, float(st.session_state.get("images_fetch_cache_ttl", DEFAULT_TTL_HOURS)), 0.5, key="images_fetch_cache_ttl", on_change=_save_ui_prefs)
+            rank_imgs = st.checkbox("Rank images (probe sizes)", value=bool(st.session_state.get("images_fetch_rank", True)), key="images_fetch_rank", on_change=_save_ui_prefs,
+                                    help=f"후보 이미지를 최대 {DEFAULT_CANDIDATES}개 모아 파일 앞부분만 받아 해상도/비율(9:16)을 확인하고, 상위 이미지만 전체 다운로드합니다.")
+            st.checkbox("Dedup images (hash)", value=bool(st.session_state.get("images_fetch_dedup", True)), key="images_fetch_dedup", on_change=_save_ui_prefs,
+                        help="크기·화질·포맷만 다른 같은 사진(지각 해시)을 하나로 합치고 가장 큰 해상도만 남깁니다. 이전 실행에서 받은 이미지와도 비교합니다.")
         with colf2:
-            use_playwright = st.checkbox("Playwright fallback", value=bool(st.session_state.get("images_fetch_pw", False)), key="images_fetch_pw", on_change=_save_ui_prefs)
+            use_playwright = st.checkbox("Playwright fallback (auto)", value=bool(st.session_state.get("images_fetch_pw", False)), key="images_fetch_pw", on_change=_save_ui_prefs,
+                                         help="먼저 일반 HTTP로 받고, 제목·가격·이미지가 부족할 때만 브라우저로 다시 받습니다. 도메인별 성공률을 기록해 HTTP가 통하지 않는 사이트는 바로 브라우저를 사용합니다.")
             pw_stealth = st.checkbox("Stealth", value=bool(st.session_state.get("images_fetch_pw_stealth", True)), key="images_fetch_pw_stealth", on_change=_save_ui_prefs)
             deep_fetch = st.checkbox("Deep fetch (scroll/expand)", value=bool(st.session_state.get("images_fetch_deep", False)), key="images_fetch_deep", on_change=_save_ui_prefs)
             detail_only = st.checkbox("Detail-only images (1x 더보기)", value=bool(st.session_state.get("images_fetch_detail_only", False)), key="images_fetch_detail_only", on_change=_save_ui_prefs)
         with colf3:
             pw_mobile = st.checkbox("Mobile", value=bool(st.session_state.get("images_fetch_pw_mobile", True)), key="images_fetch_pw_mobile", on_change=_save_ui_prefs)
-            pw_wait = st.selectbox("Wait state", ["networkidle", "domcontentloaded", "load"], index=["networkidle","domcontentloaded","load"].index(st.session_state.get("images_fetch_pw_wait", "networkidle")), key="images_fetch_pw_wait", on_change=_save_ui_prefs)
+            pw_wait = st.selectbox("Wait state", ["domcontentloaded", "networkidle", "load"], index=["domcontentloaded","networkidle","load"].index(st.session_state.get("images_fetch_pw_wait", "domcontentloaded")), key="images_fetch_pw_wait", on_change=_save_ui_prefs)
             deep_scrolls = st.slider("Scroll passes", 3, 16, int(st.session_state.get("images_fetch_deep_scrolls", 8)), 1, key="images_fetch_deep_scrolls", on_change=_save_ui_prefs)
 
-        # Optional: Use Selenium-based AliExpress fetcher (56.*) when site is AliExpress
-        use_ali56 = False
-        if site_sel == "aliexpress":
-            use_ali56 = st.checkbox("Use AliExpress Selenium fetcher (56)", value=True, key="images_fetch_use_56")
+        # Optional: the adapter's external fetcher script (e.g. AliExpress Selenium 56.*)
+        use_site_script = False
+        if site_adapter.script:
+            use_site_script = st.checkbox(f"Use {site_adapter.label} Selenium fetcher ({site_adapter.script})", value=True, key="images_fetch_use_56")
 
         # Prefill controls: limit + button
         col_pf1, col_pf2, col_pf3 = st.columns([1,1,2])
@@ -1522,20 +1176,12 @@ def main():
             if not url_fetch:
                 st.warning("Enter a URL first.")
             else:
-                try:
-                    html = fetch_html_requests(url_fetch, timeout=int(fetch_timeout))
-                except Exception as e:
-                    html = None
-                    if use_playwright:
-                        try:
-                            html = fetch_html_playwright(url_fetch, timeout=int(fetch_timeout), use_stealth=pw_stealth, mobile=pw_mobile, wait_state=pw_wait)
-                        except Exception as e2:
-                            st.error(f"Fetch failed: {e2}")
-                    else:
-                        st.error(f"Fetch failed: {e}")
-                if html:
-                    prefill_limit = int(st.session_state.get("images_prefill_limit", int(st.session_state.get("images_fetch_count", 4))))
-                    t_title, t_price, t_feats = parse_product_text_from_html(html)
+                prefill_limit = int(st.session_state.get("images_prefill_limit", int(st.session_state.get("images_fetch_count", 4))))
+                rec = fetch_product(url_fetch, site_sel, DEFAULT_CANDIDATES if rank_imgs else int(prefill_limit), int(fetch_timeout), use_playwright,
+                                    pw_stealth, pw_mobile, pw_wait, use_cache=use_parse_cache,
+                                    cache_ttl_hours=float(parse_cache_ttl))
+                if rec is not None:
+                    t_title, t_price, t_feats = rec.title, rec.price_text, rec.features
                     # Download images either via Selenium 56, detail-only, deep fetch, or built-in
                     dpaths = []
                     desc_text = None
@@ -1543,12 +1189,14 @@ def main():
                     # Detail-only branch (Playwright)
                     if use_playwright and detail_only:
                         try:
-                            d_title, d_text, d_urls, d_overview = fetch_detail_only_playwright(
+                            # Description + specifications from one navigation
+                            d_title, d_text, d_urls, d_overview, d_specs = fetch_detail_only_playwright(
                                 url_fetch,
                                 timeout=int(fetch_timeout),
                                 use_stealth=pw_stealth,
                                 mobile=pw_mobile,
                                 wait_state=pw_wait,
+                                with_specs=True,
                             )
                             if d_title and not t_title:
                                 t_title = d_title
@@ -1557,36 +1205,28 @@ def main():
                                     d_urls = d_urls[: int(prefill_limit)]
                                 except Exception:
                                     pass
-                                dpaths = download_images(d_urls)
+                                with site_adapter.timed("download"):
+                                    dpaths = download_images(site_adapter.normalize_images(d_urls), product=url_fetch)
                             desc_text = d_text
                             overview_lines = d_overview
-                            # Try to extract specification lines
-                            try:
-                                spec_lines = fetch_specifications_playwright(
-                                    url_fetch,
-                                    timeout=int(fetch_timeout),
-                                    use_stealth=pw_stealth,
-                                    mobile=pw_mobile,
-                                    wait_state=pw_wait,
-                                )
-                            except Exception:
-                                spec_lines = None
+                            spec_lines = d_specs or None
                         except Exception as e:
                             st.warning(f"Detail-only fetch failed: {e}")
-                    if site_sel == "aliexpress" and use_ali56:
+                    if use_site_script:
                         try:
-                            base_dir = os.path.join(UPLOAD_DIR, "aliexpress_downloads")
+                            base_dir = os.path.join(UPLOAD_DIR, f"{site_adapter.name}_downloads")
                             os.makedirs(base_dir, exist_ok=True)
                             st.info("Running AliExpress Selenium fetcher (headless)…")
                             cmd56 = [
                                 os.path.basename(os.sys.executable),
-                                "56.aliexpressmov1ok_pdfok.py",
+                                site_adapter.script,
                                 "--url", url_fetch,
                                 "--out_dir", base_dir,
                                 "--headless",
                             ]
                             st.code(" ".join(shlex.quote(c) for c in cmd56))
-                            code56, logs56, took56 = run_cmd(cmd56)
+                            with site_adapter.timed("script"):
+                                code56, logs56, took56 = run_cmd(cmd56)
                             # Pick the most recent created folder under base_dir
                             latest_dir = None
                             try:
@@ -1642,6 +1282,7 @@ def main():
                                         mobile=pw_mobile,
                                         wait_state=pw_wait,
                                         scrolls=int(deep_scrolls),
+                                        referer=site_adapter.referer,
                                     )
                                     if deep_title and not t_title:
                                         t_title = deep_title
@@ -1649,35 +1290,17 @@ def main():
                                 except Exception as e:
                                     st.warning(f"Deep fetch failed; falling back: {e}")
                             if not img_urls:
-                                if site_sel == "coupang":
-                                    try:
-                                        import parser_coupang as pc
-                                        cp = pc.parse(html)
-                                        img_urls = cp.images[: int(prefill_limit)]
-                                    except Exception:
-                                        _, img_urls = parse_images_from_html(html, base_url=url_fetch, max_items=int(prefill_limit))
-                                elif site_sel == "aliexpress":
-                                    try:
-                                        import parser_aliexpress as pa
-                                        ap = pa.parse(html)
-                                        img_urls = ap.images[: int(prefill_limit)]
-                                    except Exception:
-                                        _, img_urls = parse_images_from_html(html, base_url=url_fetch, max_items=int(prefill_limit))
-                                else:
-                                    _, img_urls = parse_images_from_html(html, base_url=url_fetch, max_items=int(prefill_limit))
+                                img_urls = rec.image_urls
                         except Exception:
                             img_urls = []
                         if img_urls:
-                            try:
-                                img_urls = img_urls[: int(prefill_limit)]
-                            except Exception:
-                                pass
-                            dpaths = download_images(img_urls)
+                            with site_adapter.timed("download"):
+                                dpaths = download_images(pick_images(site_adapter.normalize_images(img_urls), int(prefill_limit), rank=rank_imgs), product=url_fetch)
                         else:
                             dpaths = []
                     if dpaths:
                         cur = st.session_state.get("images_fetched_paths") or []
-                        st.session_state["images_fetched_paths"] = cur + dpaths
+                        st.session_state["images_fetched_paths"] = list(dict.fromkeys(cur + dpaths))
                     # Prefill features: prefer overview lines > specification lines > description lines
                     if 'overview_lines' in locals() and overview_lines:
                         st.session_state["features_images_prefill"] = "\n".join(refine_features(overview_lines))
@@ -1724,24 +1347,18 @@ def main():
         if st.button("Fetch URL ➜ Run"):
             out_path = os.path.join(OUTPUT_DIR, out_name)
             # 1) Fetch HTML
-            html = None
+            rec = None
             parsed_title = None
             if url_fetch:
-                try:
-                    html = fetch_html_requests(url_fetch, timeout=int(fetch_timeout))
-                except Exception as e:
-                    if use_playwright:
-                        try:
-                            html = fetch_html_playwright(url_fetch, timeout=int(fetch_timeout), use_stealth=pw_stealth, mobile=pw_mobile, wait_state=pw_wait)
-                        except Exception as e2:
-                            st.error(f"Fetch failed: {e2}")
-                    else:
-                        st.error(f"Fetch failed: {e}")
-            if not html:
+                rec = fetch_product(url_fetch, site_sel, DEFAULT_CANDIDATES if rank_imgs else int(fetch_count), int(fetch_timeout), use_playwright,
+                                    pw_stealth, pw_mobile, pw_wait, use_cache=use_parse_cache,
+                                    cache_ttl_hours=float(parse_cache_ttl))
+            if rec is None:
                 st.error("No HTML fetched. Provide a valid URL or disable Playwright fallback.")
             else:
-                # 2) Parse images
+                # 2) Parse images (cached or parsed once; site + generic extractors share it)
                 desc_text = None
+                tt_title, tt_price, tt_feats = rec.title, rec.price_text, rec.features
                 if use_playwright and st.session_state.get("images_fetch_detail_only"):
                     try:
                         parsed_title, desc_text, img_urls, overview_lines = fetch_detail_only_playwright(
@@ -1753,8 +1370,7 @@ def main():
                         )
                     except Exception as e:
                         st.warning(f"Detail-only fetch failed, falling back: {e}")
-                        parsed_title, img_urls = parse_images_from_html(html, base_url=url_fetch, max_items=int(fetch_count))
-                        tt_title, tt_price, tt_feats = parse_product_text_from_html(html)
+                        parsed_title, img_urls = rec.title, rec.image_urls
                 elif use_playwright and deep_fetch:
                     try:
                         parsed_title, img_urls = fetch_images_playwright_deep(
@@ -1764,48 +1380,25 @@ def main():
                             mobile=pw_mobile,
                             wait_state=pw_wait,
                             scrolls=int(deep_scrolls),
+                            referer=site_adapter.referer,
                         )
                     except Exception as e:
                         st.warning(f"Deep fetch failed, falling back: {e}")
-                        parsed_title, img_urls = parse_images_from_html(html, base_url=url_fetch, max_items=int(fetch_count))
-                    tt_title, tt_price, tt_feats = parse_product_text_from_html(html)
+                        parsed_title, img_urls = rec.title, rec.image_urls
                 else:
-                    if site_sel == "coupang":
-                        try:
-                            import parser_coupang as pc
-                            cp = pc.parse(html)
-                            parsed_title = cp.title
-                            tt_price = cp.price
-                            tt_feats = cp.features
-                            img_urls = cp.images[: int(fetch_count)]
-                        except Exception:
-                            parsed_title, img_urls = parse_images_from_html(html, base_url=url_fetch, max_items=int(fetch_count))
-                            tt_title, tt_price, tt_feats = parse_product_text_from_html(html)
-                    elif site_sel == "aliexpress":
-                        try:
-                            import parser_aliexpress as pa
-                            ap = pa.parse(html)
-                            parsed_title = ap.title
-                            tt_price = ap.price
-                            tt_feats = ap.features
-                            img_urls = ap.images[: int(fetch_count)]
-                        except Exception:
-                            parsed_title, img_urls = parse_images_from_html(html, base_url=url_fetch, max_items=int(fetch_count))
-                            tt_title, tt_price, tt_feats = parse_product_text_from_html(html)
-                    else:
-                        parsed_title, img_urls = parse_images_from_html(html, base_url=url_fetch, max_items=int(fetch_count))
-                        tt_title, tt_price, tt_feats = parse_product_text_from_html(html)
+                    parsed_title, img_urls = rec.title, rec.image_urls
                 if not img_urls:
                     st.error("No images found from URL")
                 else:
                     # 3) Download images
                     if not deep_fetch and not st.session_state.get("images_fetch_detail_only"):
-                        img_urls = img_urls[: int(fetch_count)]
-                    dpaths = download_images(img_urls)
+                        img_urls = pick_images(site_adapter.normalize_images(img_urls), int(fetch_count), rank=rank_imgs)
+                    with site_adapter.timed("download"):
+                        dpaths = download_images(img_urls, product=url_fetch)
                     # Also add to fetched list for later review/editing
                     if dpaths:
                         cur = st.session_state.get("images_fetched_paths") or []
-                        st.session_state["images_fetched_paths"] = cur + dpaths
+                        st.session_state["images_fetched_paths"] = list(dict.fromkeys(cur + dpaths))
                     # Resolve images to run: respect selection when enabled
                     use_selected_only = st.session_state.get("images_use_selected_only", True)
                     selected_paths = st.session_state.get("images_selected_paths") or []
@@ -2014,6 +1607,7 @@ def main():
             ]
             st.download_button("slides_sample.json", data=json.dumps(sample, ensure_ascii=False, indent=2), file_name="slides_sample.json", mime="application/json")
 
+        images_ocr = st.checkbox("OCR images for features when none are entered (Tesseract kor+eng)", value=False, key="images_ocr")
         if st.button("Run from Images"):
             out_path = os.path.join(OUTPUT_DIR, out_name)
             cmd = [
@@ -2054,6 +1648,8 @@ def main():
                     line = line.strip()
                     if line:
                         cmd += ["--feature", line]
+            elif images_ocr:
+                cmd.append("--ocr")
             if no_tts:
                 cmd.append("--no_tts")
             cmd += ["--voice_rate", str(voice_rate)]
@@ -2078,7 +1674,8 @@ def main():
         st.subheader("PDF → MP4 (shorts_maker2.py)")
         pdf = st.file_uploader("Upload PDF", type=["pdf"], key="pdf_upload")
         max_pages = st.number_input("Max pages", 1, 30, 6, key="pdf_max_pages")
-        zoom = st.number_input("Render zoom", 1.0, 4.0, 2.0, 0.1, key="pdf_zoom")
+        zoom = st.number_input("Render zoom (max)", 1.0, 4.0, 2.0, 0.1, key="pdf_zoom",
+                               help="Pages are rendered at the smallest zoom that covers 1080x1920; this is the upper bound.")
         pdf_mode = st.selectbox("PDF mode", ["auto", "image", "page"], index=0, key="pdf_mode")
         colp1, colp2 = st.columns(2)
         with colp1:
@@ -2086,6 +1683,7 @@ def main():
         with colp2:
             crop_margin = st.slider("Crop margin ratio", 0.0, 0.1, 0.01, 0.005, key="pdf_crop_margin")
         max_extract = st.number_input("Max extracted images", 1, 200, 20, key="pdf_max_extract")
+        pdf_ocr = st.checkbox("OCR fallback for image-only pages (Tesseract kor+eng)", value=False, key="pdf_ocr")
         # Apply any pending PDF prefills before creating the widgets
         if st.session_state.get("pdf_prefill_pending"):
             if "title_pdf_prefill" in st.session_state:
@@ -2137,6 +1735,8 @@ def main():
             if slides_pdf_up is not None:
                 slides_path = save_uploaded_file(slides_pdf_up, subdir="slides")
                 cmd += ["--slides_json", slides_path]
+            if pdf_ocr:
+                cmd.append("--ocr")
             if title3:
                 cmd += ["--title", title3]
             if price3:
@@ -2399,6 +1999,54 @@ def main():
             img = make_template_preview_image(st.session_state.get("tpl_preview_caption", ""), st.session_state.get("tpl_preview_bg_path"))
             st.image(img, caption="Template 미리보기 (1080x1920)", width='stretch')
 
+    with tab4:
+        st.subheader("Batch URLs → products (→ MP4)")
+        st.caption("상품 URL 여러 개를 붙여넣으면 동시에 받아 파싱·이미지 다운로드 후, 준비된 상품부터 렌더링 대기열에 넣습니다.")
+        batch_text = st.text_area("Product URLs (한 줄에 하나)", key="batch_urls", height=180)
+        batch_urls = read_urls(batch_text)
+        colb1, colb2, colb3 = st.columns(3)
+        with colb1:
+            batch_images = st.number_input("Images per product", 2, 20, int(st.session_state.get("batch_images", 6)), key="batch_images")
+            batch_rank = st.checkbox("Rank images (probe sizes)", value=True, key="batch_rank")
+        with colb2:
+            batch_conc = st.number_input("Concurrent fetches", 1, 32, int(st.session_state.get("batch_conc", 8)), key="batch_conc")
+            batch_per_host = st.number_input("Per-domain limit", 1, 8, int(st.session_state.get("batch_per_host", 2)), key="batch_per_host")
+            batch_delay = st.number_input("Per-domain delay (s)", 0.0, 10.0, float(st.session_state.get("batch_delay", 1.0)), 0.5, key="batch_delay")
+        with colb3:
+            batch_render = st.checkbox("Render MP4 (queue)", value=False, key="batch_render")
+            batch_render_workers = st.number_input("Concurrent renders", 1, 4, 1, key="batch_render_workers")
+            batch_cache = st.checkbox("Parse cache", value=True, key="batch_cache")
+            batch_browser = st.checkbox("Browser escalation", value=False, key="batch_browser",
+                                        help="상품 정보가 부족한 페이지만 Playwright로 다시 받습니다.")
+        st.caption(f"{len(batch_urls)} URL(s)")
+        if st.button("Run batch", disabled=not batch_urls):
+            table = st.empty()
+            status = st.empty()
+
+            def show(items):
+                table.dataframe([it.row() for it in items], width='stretch', hide_index=True)
+                done = sum(it.status in ("done", "failed", "skipped") for it in items)
+                status.caption(f"{done}/{len(items)} finished")
+
+            render_opts = None
+            if batch_render:
+                render_opts = RenderOptions(duration=int(duration), min_slide=float(min_slide), max_slide=float(max_slide),
+                                            no_tts=bool(no_tts), cta=cta or "", font_path=font_path or "",
+                                            template_json=build_template_json_if_applied(apply_tpl) or "")
+            runner = BatchRunner(batch_urls, out_dir=os.path.join(OUTPUT_DIR, "batch"), max_images=int(batch_images),
+                                 concurrency=int(batch_conc), per_host=int(batch_per_host), delay=float(batch_delay),
+                                 timeout=int(st.session_state.get("images_fetch_timeout", 30)), rank=batch_rank,
+                                 render=render_opts, render_workers=int(batch_render_workers), use_cache=batch_cache, browser=batch_browser,
+                                 on_update=show)
+            t0 = time.time()
+            items = runner.run()
+            ok = sum(it.status == "done" for it in items)
+            st.success(f"{ok}/{len(items)} done in {time.time() - t0:.1f}s → {runner.out_dir}")
+            for it in items:
+                if it.out_path and os.path.exists(it.out_path):
+                    st.caption(it.title or it.url)
+                    st.video(it.out_path)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,136 @@
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+# Seconds between condition checks
+POLL = 0.1
+
+# ms since the last DOM mutation (installs one MutationObserver per document)
+JS_DOM_IDLE = """() => {
+  if (!window.__waitsMO) {
+    window.__waitsLast = performance.now();
+    window.__waitsMO = new MutationObserver(() => { window.__waitsLast = performance.now(); });
+    window.__waitsMO.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+  }
+  return performance.now() - window.__waitsLast;
+}"""
+# "<img count>:<loaded img count>" (changes while lazy images are being added/decoded)
+JS_IMAGES = """() => {
+  let done = 0;
+  for (const img of document.images) if (img.complete && img.naturalWidth) done++;
+  return document.images.length + ':' + done;
+}"""
+# ms since the last resource finished loading (resource timing entries)
+JS_NET_IDLE = """() => {
+  if (!window.__waitsNet) { window.__waitsNet = 1; performance.setResourceTimingBufferSize(5000); }
+  let last = 0;
+  for (const r of performance.getEntriesByType('resource')) last = Math.max(last, r.responseEnd);
+  return performance.now() - last;
+}"""
+JS_SELECTOR = "(sel) => document.querySelector(sel) !== null"
+
+
+@dataclass
+class WaitResult:
+    stage: str
+    condition: str
+    seconds: float
+    ceiling: float
+    met: bool  # False = the ceiling was reached first
+
+
+@dataclass
+class WaitLog:
+    """Per-stage wait timings; verbose prints one line per wait (for the CLI scripts)."""
+    results: List[WaitResult] = field(default_factory=list)
+    verbose: bool = False
+
+    def add(self, res: WaitResult) -> WaitResult:
+        self.results.append(res)
+        if self.verbose:
+            state = "ok" if res.met else "ceiling"
+            print(f"[wait] {res.stage}: {res.condition} {res.seconds:.2f}s ({state}, max {res.ceiling:g}s)")
+        return res
+
+    @property
+    def total(self) -> float:
+        return sum(r.seconds for r in self.results)
+
+    def summary(self) -> str:
+        saved = sum(r.ceiling - r.seconds for r in self.results)
+        return f"{len(self.results)} waits, {self.total:.1f}s waited (~{saved:.1f}s under the ceilings)"
+
+
+def _js(target, fn: str, arg=None):
+    """Evaluate a JS function on a Playwright page or a Selenium driver."""
+    if hasattr(target, "execute_script"):
+        return target.execute_script(f"return ({fn})(arguments[0]);", arg)
+    return target.evaluate(fn, arg)
+
+
+def _sleep(target, sec: float) -> None:
+    # Playwright: keep dispatching events (route handlers, responses) while waiting
+    if hasattr(target, "wait_for_timeout"):
+        target.wait_for_timeout(int(sec * 1000))
+    else:
+        time.sleep(sec)
+
+
+def _poll(target, check: Callable[[], bool], stage: str, condition: str, ceiling: float,
+          log: Optional[WaitLog]) -> WaitResult:
+    t0 = time.perf_counter()
+    met = False
+    while True:
+        try:
+            met = bool(check())
+        except Exception:
+            met = False  # navigation in progress / page not scriptable yet
+        elapsed = time.perf_counter() - t0
+        if met or elapsed >= ceiling:
+            break
+        _sleep(target, min(POLL, ceiling - elapsed))
+    res = WaitResult(stage, condition, time.perf_counter() - t0, ceiling, met)
+    return log.add(res) if log is not None else res
+
+
+def dom_quiet(target, quiet: float = 0.3, ceiling: float = 3.0, stage: str = "",
+              log: Optional[WaitLog] = None) -> WaitResult:
+    """Until no DOM mutation for `quiet` seconds (MutationObserver)."""
+    return _poll(target, lambda: _js(target, JS_DOM_IDLE) >= quiet * 1000, stage, "dom-quiet", ceiling, log)
+
+
+def network_idle(target, quiet: float = 0.5, ceiling: float = 5.0, stage: str = "",
+                 log: Optional[WaitLog] = None) -> WaitResult:
+    """Until no resource has finished loading for `quiet` seconds."""
+    return _poll(target, lambda: _js(target, JS_NET_IDLE) >= quiet * 1000, stage, "network-idle", ceiling, log)
+
+
+def images_stable(target, quiet: float = 0.4, ceiling: float = 3.0, stage: str = "",
+                  log: Optional[WaitLog] = None) -> WaitResult:
+    """Until the number of <img> elements and of loaded ones stays the same for `quiet` seconds."""
+    state = {"sig": None, "since": time.perf_counter()}
+
+    def check():
+        sig = _js(target, JS_IMAGES)
+        now = time.perf_counter()
+        if sig != state["sig"]:
+            state["sig"], state["since"] = sig, now
+            return False
+        return now - state["since"] >= quiet
+
+    return _poll(target, check, stage, "images-stable", ceiling, log)
+
+
+def selector(target, css: str, ceiling: float = 5.0, stage: str = "",
+             log: Optional[WaitLog] = None) -> WaitResult:
+    """Until an element matching `css` exists."""
+    return _poll(target, lambda: _js(target, JS_SELECTOR, css), stage, f"selector {css}", ceiling, log)
+
+
+def settle(target, stage: str, ceiling: float, kind: str = "dom", log: Optional[WaitLog] = None) -> WaitResult:
+    """Replacement for a fixed sleep of `ceiling` seconds: returns as soon as the page is settled.
+
+    kind: "dom" (mutations stopped), "images" (lazy images added/loaded), "network"
+    """
+    fn = {"dom": dom_quiet, "images": images_stable, "network": network_idle}[kind]
+    return fn(target, ceiling=ceiling, stage=stage, log=log)